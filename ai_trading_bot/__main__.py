@@ -0,0 +1,95 @@
+"""
+Point d'entrée unique du bot :
+
+    python -m ai_trading_bot run [--profile]      # Bot full-auto (entrainement_bot.py)
+    python -m ai_trading_bot semi                  # Bot semi-auto (semi_auto_bot/bot.py)
+    python -m ai_trading_bot scan                  # Un seul scan full-auto, puis sortie
+    python -m ai_trading_bot stats                 # Rapport de performance
+    python -m ai_trading_bot dashboard             # Tableau de bord Streamlit
+    python -m ai_trading_bot indicators AAPL [--graphique]
+
+Chaque commande n'importe que ce dont elle a besoin : `stats` ne charge ni pandas,
+ni yfinance, ni scikit-learn, ni openai (voir benchmarks/bench_import.py).
+Les fichiers du bot (portfolio.json, historique.db...) sont lus dans le dossier courant,
+ou dans --dossier.
+"""
+import os
+import re
+import sys
+import runpy
+import argparse
+import subprocess
+
+DOSSIER_BOT = os.path.dirname(os.path.abspath(__file__))
+BOT_SEMI = os.path.join(os.path.dirname(DOSSIER_BOT), "semi_auto_bot", "bot.py")
+
+# Module (ou script) principal chargé par chaque commande (mesuré par benchmarks/bench_import.py)
+MODULES_COMMANDES = {
+    "run": "entrainement_bot",
+    "semi": BOT_SEMI,
+    "scan": "entrainement_bot",
+    "stats": "portfolio_manager",
+    "dashboard": None,           # Processus streamlit séparé
+    "indicators": "indicateurs",
+}
+
+def commande_run(args):
+    sys.argv = [os.path.join(DOSSIER_BOT, "entrainement_bot.py")] + args.options
+    runpy.run_module("entrainement_bot", run_name="__main__", alter_sys=True)
+
+def commande_semi(args):
+    sys.argv = [BOT_SEMI] + args.options
+    runpy.run_path(BOT_SEMI, run_name="__main__")
+
+def commande_scan(args):
+    from entrainement_bot import execution_automatique
+    from telegram_bot import vider_envois
+    execution_automatique()
+    vider_envois() # Les alertes du scan partent avant la sortie
+
+def commande_stats(args):
+    from portfolio_manager import generer_rapport_performance, pnl_realise
+    # Le rapport est écrit pour Telegram (HTML) : on retire les balises pour la console
+    print(re.sub(r"</?[a-z]+>", "", generer_rapport_performance()))
+    print(f"💵 P&L réalisé : {pnl_realise():.2f}$")
+
+def commande_dashboard(args):
+    tableau = os.path.join(DOSSIER_BOT, "dashboard.py")
+    sys.exit(subprocess.call([sys.executable, "-m", "streamlit", "run", tableau] + args.options))
+
+def commande_indicators(args):
+    from indicateurs import get_clean_data, calculate_advanced_indicators, analyze_market_structure, tracer_structure
+    for ticker in args.tickers:
+        data = get_clean_data(ticker.upper(), period=args.period)
+        if data is None:
+            print(f"❌ Pas de données pour {ticker}")
+            continue
+        processed_data = calculate_advanced_indicators(data)
+        analyze_market_structure(processed_data)
+        if args.graphique: tracer_structure(ticker.upper(), processed_data)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ai_trading_bot", description="AI Trading Bot")
+    parser.add_argument("--dossier", help="Dossier des fichiers du bot (défaut : dossier courant)")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    for nom, aide in (("run", "Bot full-auto (options passées au bot, ex : --profile)"),
+                      ("semi", "Bot semi-auto (validation des achats sur Telegram)"),
+                      ("dashboard", "Tableau de bord Streamlit (options passées à streamlit)")):
+        sous = commandes.add_parser(nom, help=aide)
+        sous.add_argument("options", nargs=argparse.REMAINDER)
+    commandes.add_parser("scan", help="Un seul scan full-auto, puis sortie")
+    commandes.add_parser("stats", help="Rapport de performance")
+    indicateurs = commandes.add_parser("indicators", help="Analyse technique (bougies 1d)")
+    indicateurs.add_argument("tickers", nargs="+")
+    indicateurs.add_argument("--period", default="1y")
+    indicateurs.add_argument("--graphique", action="store_true", help="Affiche le graphique (matplotlib)")
+
+    args = parser.parse_args(argv)
+    if args.dossier: os.chdir(args.dossier)
+    # Les modules du bot s'importent entre eux à plat (from portfolio_manager import ...)
+    sys.path.insert(0, DOSSIER_BOT)
+    globals()[f"commande_{args.commande}"](args)
+
+if __name__ == "__main__":
+    main()
@@ -1,126 +1,201 @@
-import os
-import json
-from dotenv import load_dotenv
-from openai import OpenAI
-load_dotenv()
-client = OpenAI(api_key=os.getenv("XAI_API_KEY"), base_url="https://api.x.ai/v1")
-
-# ==============================================================================
-# AGENT 1 : ÉCLAIREUR (Grok)
-# ==============================================================================
-def agent_eclaireur():
-    print("\n🔭 [AGENT 1] Scan Grok (Mode : Volatilité & Volume)...")
-    prompt = """
-    Tu es un screener de marché professionnel. Donne-moi une liste de 8 à 10 actions (Stocks US) qui connaissent une forte volatilité ou un volume anormalement élevé AUJOURD'HUI.
-    
-    CRITÈRES :
-    1. Focus sur la "Hype" du moment, les "Breakouts" ou les résultats financiers récents.
-    2. PEU IMPORTE la taille (Large Cap acceptées si elles bougent fort).
-    3. Exclure uniquement les Penny Stocks (< 5$).
-    
-    Format JSON strict : { "liste_tickers": ["SYMBOLE1", "SYMBOLE2", ...] }
-    """
-    try:
-        response = client.chat.completions.create(
-            model="grok-3", messages=[{"role": "system", "content": prompt}], temperature=0.7
-        )
-        content = response.choices[0].message.content.replace("```json", "").replace("```", "").strip()
-        data = json.loads(content)
-        
-        # Gestion robuste des formats de réponse
-        if isinstance(data, dict):
-            for key in data:
-                if isinstance(data[key], list): return data[key]
-        elif isinstance(data, list): return data
-        return []
-    except Exception as e:
-        print(f"❌ Erreur Eclaireur : {e}")
-        return []
-
-# ==============================================================================
-# AGENT 2 : ANALYSTE (Grok)
-# ==============================================================================
-def agent_analyste(ticker):
-    prompt = f"""
-    Analyse tweets récents sur : ${ticker}.
-    1. Estime le VOLUME (0.1 à 1.0).
-    2. Analyse le SENTIMENT (-1.0 à 1.0).
-    3. Sépare le SPAM.
-    Format JSON :
-    {{
-        "spam_ratio": (float 0.0 à 1.0),
-        "sentiment_score": (float -1.0 à 1.0),
-        "volume_score": (float 0.1 à 1.0),
-        "sujet_principal": "Résumé court"
-    }}
-    """
-    try:
-        response = client.chat.completions.create(
-            model="grok-3", messages=[{"role": "user", "content": prompt}], temperature=0.2
-        )
-        return json.loads(response.choices[0].message.content.replace("```json", "").replace("```", "").strip())
-    except: return None
-
-# ==============================================================================
-# AGENT 3 : DÉTECTEUR HUMANITÉ (Grok)
-# ==============================================================================
-def agent_detecteur_organique(ticker, sujet):
-    prompt = f"""
-    Analyse tweets sur "${ticker}" (Sujet: {sujet}).
-    OBJECTIF : Déterminer si ce sont de VRAIS HUMAINS ou des BOTS.
-    Note sur 10 :
-    1. CHAOS LINGUISTIQUE (Humains = bordéliques/argot).
-    2. CONTEXTE PRÉCIS (Humains = détails techniques).
-    3. INTERACTION (Humains = réponses/débats).
-    Renvoie JSON :
-    {{
-        "note_chaos": (int 0-10),
-        "note_contexte": (int 0-10),
-        "note_interaction": (int 0-10),
-        "type_foule": ("Retail", "Bots", "Mixte"),
-        "explication": "Pourquoi"
-    }}
-    """
-    try:
-        response = client.chat.completions.create(
-            model="grok-3", messages=[{"role": "user", "content": prompt}], temperature=0.2
-        )
-        content = response.choices[0].message.content.replace("```json", "").replace("```", "").strip()
-        data = json.loads(content)
-        total = data['note_chaos'] + data['note_contexte'] + data['note_interaction']
-        data['authenticite_score'] = round(total / 30, 2)
-        return data
-    except: return None
-
-def agent_chasseur_diversification():
-    print("\n🌍 [AGENT 2] Scan Grok (Mode : Diversification & Valeur)...")
-    prompt = """
-    Tu es un expert en diversification de portefeuille. 
-    Le secteur Tech est saturé. Trouve-moi 5 actions intéressantes DANS D'AUTRES SECTEURS (Santé, Énergie, Industrie, Biens de consommation, Finance).
-    
-    CRITÈRES :
-    1. EXCLURE totalement le secteur Technologie / AI / Semi-conducteurs.
-    2. Chercher des configurations solides ou des actions sous-évaluées (Value Investing).
-    3. Entreprises rentables ou leaders de leur secteur (Ex: Coca-Cola, Pfizer, CAT, etc.).
-    
-    Format JSON strict : { "liste_tickers": ["SYMBOLE1", "SYMBOLE2", ...] }
-    """
-    try:
-        # Note: Assure-toi d'utiliser ton client OpenAI/Grok configuré comme dans l'autre fonction
-        # Je remets la structure standard ici, adapte si ton client a un nom différent
-        response = client.chat.completions.create(
-            model="grok-3", # ou ton modèle habituel
-            messages=[{"role": "system", "content": prompt}], 
-            temperature=0.6
-        )
-        content = response.choices[0].message.content.replace("```json", "").replace("```", "").strip()
-        data = json.loads(content)
-        
-        if isinstance(data, dict):
-            for key in data:
-                if isinstance(data[key], list): return data[key]
-        elif isinstance(data, list): return data
-        return []
-    except Exception as e:
-        print(f"❌ Erreur Chasseur Diversification : {e}")
+import os
+import json
+from dotenv import load_dotenv
+from cache_agents import lire_cache, ecrire_cache
+from metriques import instrumenter, mesurer, echec_si_vide
+load_dotenv()
+client = None # Créé au premier appel (openai est long à importer) ; remplaçable par un faux client
+
+def _client():
+    global client
+    if client is None:
+        from openai import OpenAI
+        client = OpenAI(api_key=os.getenv("XAI_API_KEY"), base_url="https://api.x.ai/v1")
+    return client
+
+def demander_grok(agent, ticker, prompt, role="user", temperature=0.2):
+    """Appel grok-3 -> texte JSON nettoyé, avec cache local (voir cache_agents.py)"""
+    contenu = lire_cache(agent, ticker, prompt)
+    if contenu is not None: return contenu
+
+    with mesurer("grok_api", ticker): # Appels réseau seulement (hors cache)
+        response = _client().chat.completions.create(
+            model="grok-3", messages=[{"role": role, "content": prompt}], temperature=temperature
+        )
+    contenu = response.choices[0].message.content.replace("```json", "").replace("```", "").strip()
+    json.loads(contenu) # On ne met en cache qu'une réponse exploitable
+    ecrire_cache(agent, ticker, prompt, contenu)
+    return contenu
+
+# ==============================================================================
+# AGENT 1 : ÉCLAIREUR (Grok)
+# ==============================================================================
+@instrumenter(est_echec=echec_si_vide)
+def agent_eclaireur():
+    print("\n🔭 [AGENT 1] Scan Grok (Mode : Volatilité & Volume)...")
+    prompt = """
+    Tu es un screener de marché professionnel. Donne-moi une liste de 8 à 10 actions (Stocks US) qui connaissent une forte volatilité ou un volume anormalement élevé AUJOURD'HUI.
+    
+    CRITÈRES :
+    1. Focus sur la "Hype" du moment, les "Breakouts" ou les résultats financiers récents.
+    2. PEU IMPORTE la taille (Large Cap acceptées si elles bougent fort).
+    3. Exclure uniquement les Penny Stocks (< 5$).
+    
+    Format JSON strict : { "liste_tickers": ["SYMBOLE1", "SYMBOLE2", ...] }
+    """
+    try:
+        content = demander_grok("agent_eclaireur", "", prompt, role="system", temperature=0.7)
+        data = json.loads(content)
+        
+        # Gestion robuste des formats de réponse
+        if isinstance(data, dict):
+            for key in data:
+                if isinstance(data[key], list): return data[key]
+        elif isinstance(data, list): return data
+        return []
+    except Exception as e:
+        print(f"❌ Erreur Eclaireur : {e}")
+        return []
+
+# ==============================================================================
+# AGENT 2 : ANALYSTE (Grok)
+# ==============================================================================
+@instrumenter(est_echec=echec_si_vide)
+def agent_analyste(ticker):
+    prompt = f"""
+    Analyse tweets récents sur : ${ticker}.
+    1. Estime le VOLUME (0.1 à 1.0).
+    2. Analyse le SENTIMENT (-1.0 à 1.0).
+    3. Sépare le SPAM.
+    Format JSON :
+    {{
+        "spam_ratio": (float 0.0 à 1.0),
+        "sentiment_score": (float -1.0 à 1.0),
+        "volume_score": (float 0.1 à 1.0),
+        "sujet_principal": "Résumé court"
+    }}
+    """
+    try:
+        return json.loads(demander_grok("agent_analyste", ticker, prompt))
+    except: return None
+
+# Schéma d'une analyse : clé -> (min, max). sujet_principal doit être un texte.
+SCHEMA_ANALYSE = {
+    "spam_ratio": (0.0, 1.0),
+    "sentiment_score": (-1.0, 1.0),
+    "volume_score": (0.0, 1.0),
+}
+
+def valider_analyse(data):
+    """Renvoie l'analyse nettoyée si elle respecte le schéma, sinon None"""
+    if not isinstance(data, dict) or not isinstance(data.get("sujet_principal"), str): return None
+    propre = {}
+    for cle, (mini, maxi) in SCHEMA_ANALYSE.items():
+        try: valeur = float(data[cle])
+        except (KeyError, TypeError, ValueError): return None
+        if not mini <= valeur <= maxi: return None
+        propre[cle] = valeur
+    propre["sujet_principal"] = data["sujet_principal"]
+    return propre
+
+@instrumenter(est_echec=echec_si_vide)
+def agent_analyste_batch(tickers, repli=True):
+    """
+    Analyse de sentiment de TOUTE la liste en un seul appel Grok.
+    Chaque entrée est validée ; les tickers absents ou mal formés repassent
+    par agent_analyste (si repli=True), sinon ils sont simplement omis.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers: return {}
+    print(f"\n🧠 [AGENT 2] Analyse sentiment batch ({len(tickers)} tickers)...")
+    liste = ", ".join(f"${t}" for t in tickers)
+    prompt = f"""
+    Analyse tweets récents sur CHACUNE de ces actions : {liste}.
+    Pour chaque action :
+    1. Estime le VOLUME (0.1 à 1.0).
+    2. Analyse le SENTIMENT (-1.0 à 1.0).
+    3. Sépare le SPAM.
+    Format JSON strict, une clé par symbole (sans le $) :
+    {{
+        "SYMBOLE": {{
+            "spam_ratio": (float 0.0 à 1.0),
+            "sentiment_score": (float -1.0 à 1.0),
+            "volume_score": (float 0.1 à 1.0),
+            "sujet_principal": "Résumé court"
+        }}
+    }}
+    """
+    try:
+        data = json.loads(demander_grok("agent_analyste_batch", ",".join(sorted(tickers)), prompt, temperature=0.2))
+        if not isinstance(data, dict): data = {}
+    except Exception as e:
+        print(f"❌ Erreur Analyste batch : {e}")
+        data = {}
+
+    # Grok renvoie parfois les clés en minuscules ou avec le $
+    data = {str(k).upper().lstrip("$"): v for k, v in data.items()}
+
+    resultats = {}
+    for ticker in tickers:
+        analyse = valider_analyse(data.get(ticker.upper()))
+        if analyse is None and repli:
+            analyse = agent_analyste(ticker) # Repli : appel individuel
+        if analyse is not None:
+            resultats[ticker] = analyse
+    return resultats
+
+# ==============================================================================
+# AGENT 3 : DÉTECTEUR HUMANITÉ (Grok)
+# ==============================================================================
+@instrumenter(est_echec=echec_si_vide)
+def agent_detecteur_organique(ticker, sujet):
+    prompt = f"""
+    Analyse tweets sur "${ticker}" (Sujet: {sujet}).
+    OBJECTIF : Déterminer si ce sont de VRAIS HUMAINS ou des BOTS.
+    Note sur 10 :
+    1. CHAOS LINGUISTIQUE (Humains = bordéliques/argot).
+    2. CONTEXTE PRÉCIS (Humains = détails techniques).
+    3. INTERACTION (Humains = réponses/débats).
+    Renvoie JSON :
+    {{
+        "note_chaos": (int 0-10),
+        "note_contexte": (int 0-10),
+        "note_interaction": (int 0-10),
+        "type_foule": ("Retail", "Bots", "Mixte"),
+        "explication": "Pourquoi"
+    }}
+    """
+    try:
+        content = demander_grok("agent_detecteur_organique", ticker, prompt)
+        data = json.loads(content)
+        total = data['note_chaos'] + data['note_contexte'] + data['note_interaction']
+        data['authenticite_score'] = round(total / 30, 2)
+        return data
+    except: return None
+
+@instrumenter(est_echec=echec_si_vide)
+def agent_chasseur_diversification():
+    print("\n🌍 [AGENT 2] Scan Grok (Mode : Diversification & Valeur)...")
+    prompt = """
+    Tu es un expert en diversification de portefeuille. 
+    Le secteur Tech est saturé. Trouve-moi 5 actions intéressantes DANS D'AUTRES SECTEURS (Santé, Énergie, Industrie, Biens de consommation, Finance).
+    
+    CRITÈRES :
+    1. EXCLURE totalement le secteur Technologie / AI / Semi-conducteurs.
+    2. Chercher des configurations solides ou des actions sous-évaluées (Value Investing).
+    3. Entreprises rentables ou leaders de leur secteur (Ex: Coca-Cola, Pfizer, CAT, etc.).
+    
+    Format JSON strict : { "liste_tickers": ["SYMBOLE1", "SYMBOLE2", ...] }
+    """
+    try:
+        content = demander_grok("agent_chasseur_diversification", "", prompt, role="system", temperature=0.6)
+        data = json.loads(content)
+        
+        if isinstance(data, dict):
+            for key in data:
+                if isinstance(data[key], list): return data[key]
+        elif isinstance(data, list): return data
+        return []
+    except Exception as e:
+        print(f"❌ Erreur Chasseur Diversification : {e}")
         return []
\ No newline at end of file
@@ -0,0 +1,185 @@
+import json
+import argparse
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from noyaux_indicateurs import PARAMS_H1, PARAMS_STRUCTURE, signaux_h1, signaux_structure, construire_panel, bougies_chauffe
+
+# ==============================================================================
+# BACKTEST VECTORISÉ DE LA STRATÉGIE HYBRIDE H1
+# ==============================================================================
+# Rejoue les règles de agent_financier_yahoo_pro (signaux_h1) sur les bougies en cache
+# (donnees_marche), pour N tickers à la fois :
+#   - Entrée : signal "ACHAT", "ACHAT FORT" ou "ACHAT (DIP)" à la clôture d'une bougie,
+#     une seule position par ticker (comme le bot : pas de doublon en portefeuille)
+#   - Sortie : première clôture >= Take Profit ou <= Stop Loss (moniteur_positions,
+#     le TP est prioritaire), SL/TP = Prix -/+ mult x ATR(High-Low) de la bougie d'entrée
+# Les signaux et les sorties sont des opérations sur tableaux : la seule boucle Python
+# porte sur les TRADES (recherche de la sortie par argmax), jamais sur les bougies.
+# Les lots de tickers sont répartis sur un pool de processus.
+# Limite : les indicateurs sont calculés UNE fois sur tout l'historique, alors que le bot
+# les recalcule à chaque scan sur une fenêtre glissante (periode_live_h1). La fenêtre live et
+# le préchauffage ci-dessous valent bougies_chauffe(params) bougies, ce qui rend l'amorce des EMA
+# négligeable sans l'annuler : l'écart restant entre le signal live et le signal rejoué est
+# mesuré par benchmarks/bench_coherence_live.py.
+# strategie="structure" rejoue de la même façon analyze_market_structure (bougies 1d) :
+# entrée quand le score atteint seuil_achat_fort, SL/TP = mult x ATR (True Range).
+
+CODES_ACHAT = (1, 2, 4)  # ACHAT, ACHAT FORT, ACHAT (DIP)
+TAILLE_LOT = 50          # Tickers par tâche du pool
+
+def construire_dates(frames, tickers, T):
+    """Dates des bougies, alignées à droite comme construire_panel (NaT à gauche)"""
+    dates = np.full((len(tickers), T), np.datetime64("NaT"), dtype="datetime64[m]")
+    for i, t in enumerate(tickers):
+        index = frames[t].index
+        if getattr(index, "tz", None) is not None: index = index.tz_localize(None)
+        dates[i, T - len(index):] = index.to_numpy(dtype="datetime64[m]")
+    return dates
+
+def _texte_date(d):
+    return str(d).replace("T", " ")[:16]  # Format de trades_history.json : "YYYY-MM-DD HH:MM"
+
+def trades_ticker(ticker, close, entrees, stop_loss, take_profit, dates=None):
+    """
+    Trades d'UN ticker à partir des masques d'entrée et des niveaux SL/TP de chaque bougie.
+    Une nouvelle entrée n'est possible qu'après la bougie de sortie du trade précédent.
+    Les trades encore ouverts à la fin de l'historique ne sont pas comptés.
+    """
+    trades = []
+    candidates = np.flatnonzero(entrees)
+    T = len(close)
+    i = 0
+    while i < len(candidates):
+        t = candidates[i]
+        suite = close[t + 1:]
+        tp, sl = take_profit[t], stop_loss[t]
+        with np.errstate(invalid="ignore"):
+            touche_tp = suite >= tp
+            touche_sl = suite <= sl
+        sortie = touche_tp | touche_sl
+        if not sortie.any(): break # Position toujours ouverte
+        k = int(np.argmax(sortie))
+        s = t + 1 + k
+
+        prix_entree, prix_sortie = float(close[t]), float(close[s])
+        trades.append({
+            "ticker": ticker,
+            "entry_price": prix_entree,
+            "exit_price": prix_sortie,
+            "profit_percent": round((prix_sortie - prix_entree) / prix_entree * 100, 2),
+            "date_entry": _texte_date(dates[t]) if dates is not None else int(t),
+            "date_exit": _texte_date(dates[s]) if dates is not None else int(s),
+            "reason": "TAKE PROFIT" if touche_tp[k] else "STOP LOSS",
+        })
+        if s >= T - 1: break
+        i = int(np.searchsorted(candidates, s, side="right"))
+    return trades
+
+def _filtrer_entrees(entrees, close, prechauffage):
+    entrees = entrees & ~np.isnan(close)
+    # Préchauffage : comptée à partir de la 1re bougie valide de chaque ticker
+    nb_valides = np.cumsum(~np.isnan(close), axis=1)
+    return entrees & (nb_valides > prechauffage)
+
+def niveaux_h1(high, low, close, params=None, cache=None):
+    """Masque d'entrée + Stop Loss / Take Profit à chaque bougie (N x T)"""
+    p = {**PARAMS_H1, **(params or {})}
+    code, _, atr_hl, _, _, _, _, _, _ = signaux_h1(high, low, close, p, cache)
+    a = np.where(np.isnan(atr_hl), close * 0.02, atr_hl) # Même repli que le bot : 2% du prix
+
+    # Préchauffage = historique demandé par le bot live : pas d'entrée tant que les EMA ne sont pas stabilisées
+    entrees = _filtrer_entrees(np.isin(code, CODES_ACHAT), close, bougies_chauffe(p))
+    return entrees, close - p["mult_sl"] * a, close + p["mult_tp"] * a
+
+def niveaux_structure(high, low, close, params=None, cache=None):
+    """Idem pour analyze_market_structure (pas d'entrée tant que l'ATR n'existe pas)"""
+    p = {**PARAMS_STRUCTURE, **(params or {})}
+    score, a = signaux_structure(high, low, close, p, cache)
+    entrees = _filtrer_entrees((score >= p["seuil_achat_fort"]) & ~np.isnan(a), close, 200)
+    return entrees, close - p["mult_sl"] * a, close + p["mult_tp"] * a
+
+STRATEGIES = {"h1": niveaux_h1, "structure": niveaux_structure}
+INTERVALLES = {"h1": "60m", "structure": "1d"}  # Bougies utilisées par chaque stratégie en live
+PERIODES = {"h1": "1y", "structure": "5y"}       # L'EMA 200 journalière demande un long historique
+
+def backtester_panel(tickers, high, low, close, params=None, dates=None, strategie="h1", cache=None):
+    """Backtest d'un panel déjà en mémoire -> liste de trades (schéma trades_history.json)"""
+    close = np.asarray(close, dtype=float)
+    entrees, stop_loss, take_profit = STRATEGIES[strategie](high, low, close, params, cache)
+    trades = []
+    for i, ticker in enumerate(tickers):
+        trades += trades_ticker(ticker, close[i], entrees[i], stop_loss[i], take_profit[i],
+                                dates[i] if dates is not None else None)
+    return trades
+
+def charger_panel(tickers, period="1y", interval="60m"):
+    """Bougies en cache (donnees_marche) -> (tickers, dates, high, low, close)"""
+    from donnees_marche import telecharger_ohlcv
+    frames = {}
+    for ticker in tickers:
+        try:
+            frames[ticker] = telecharger_ohlcv(ticker, period=period, interval=interval)
+        except Exception as e:
+            print(f"❌ Erreur données {ticker}: {e}")
+    noms, high, low, close = construire_panel(frames)
+    return noms, construire_dates(frames, noms, close.shape[1]), high, low, close
+
+def _backtester_lot(tickers, period, interval, params, strategie):
+    # Chaque processus lit lui-même ses bougies sur disque (rien de lourd à transmettre)
+    noms, dates, high, low, close = charger_panel(tickers, period, interval)
+    return backtester_panel(noms, high, low, close, params, dates, strategie)
+
+def backtester(tickers, period=None, interval=None, params=None, nb_processus=None, taille_lot=TAILLE_LOT, strategie="h1"):
+    """Backtest d'une stratégie sur toute une liste de tickers (pool de processus)"""
+    period, interval = period or PERIODES[strategie], interval or INTERVALLES[strategie]
+    tickers = list(dict.fromkeys(tickers))
+    lots = [tickers[i:i + taille_lot] for i in range(0, len(tickers), taille_lot)]
+    n = len(lots)
+    if n <= 1 or nb_processus == 1:
+        resultats = [_backtester_lot(lot, period, interval, params, strategie) for lot in lots]
+    else:
+        with ProcessPoolExecutor(max_workers=nb_processus) as pool:
+            resultats = list(pool.map(_backtester_lot, lots, [period] * n, [interval] * n,
+                                      [params] * n, [strategie] * n))
+    trades = [t for lot in resultats for t in lot]
+    return trier_trades(trades)
+
+def trier_trades(trades):
+    """Ordre de sortie (dates texte ou indices de bougie), comme l'historique du bot"""
+    return sorted(trades, key=lambda t: (t["date_exit"], t["ticker"]))
+
+def statistiques(trades):
+    """Performance d'une liste de trades (mêmes notions que generer_rapport_performance)"""
+    if not trades:
+        return {"nb_trades": 0, "win_rate": 0.0, "performance_cumulee": 0.0, "max_drawdown": 0.0}
+    profits = np.array([t["profit_percent"] for t in trades], dtype=float)
+    # Drawdown sur la courbe cumulée (trades dans l'ordre de sortie)
+    cumul = np.cumsum(profits)
+    drawdown = np.maximum.accumulate(np.concatenate([[0.0], cumul]))[1:] - cumul
+    return {
+        "nb_trades": int(len(profits)),
+        "win_rate": float((profits > 0).mean() * 100),
+        "performance_cumulee": float(cumul[-1]),
+        "max_drawdown": float(drawdown.max()),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest des stratégies du bot")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--strategie", choices=list(STRATEGIES), default="h1")
+    parser.add_argument("--period", default=None)
+    parser.add_argument("--interval", default=None)
+    parser.add_argument("--processus", type=int, default=None)
+    parser.add_argument("--sortie", default="backtest_trades.json")
+    args = parser.parse_args()
+
+    debut = time.time()
+    trades = backtester(args.tickers, args.period, args.interval, nb_processus=args.processus, strategie=args.strategie)
+    with open(args.sortie, "w") as f: json.dump(trades, f, indent=4)
+
+    stats = statistiques(trades)
+    print(f"\n📊 BACKTEST {args.strategie.upper()} ({len(args.tickers)} tickers, {time.time() - debut:.1f}s)")
+    print(f"   🔢 Trades : {stats['nb_trades']} | 🎯 Win Rate : {stats['win_rate']:.1f}%")
+    print(f"   📈 Performance cumulée : {stats['performance_cumulee']:.2f}% | 📉 Max Drawdown : {stats['max_drawdown']:.2f}%")
+    print(f"   💾 Trades exportés dans {args.sortie}")
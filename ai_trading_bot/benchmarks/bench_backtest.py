@@ -0,0 +1,42 @@
+"""
+Benchmark du backtest H1 : 1 an de bougies horaires pour N tickers (500 par défaut),
+objectif < 60 s sur une machine.
+
+Usage : python benchmarks/bench_backtest.py [nb_tickers] [nb_processus]
+Les bougies sont synthétiques et écrites dans un cache_marche temporaire,
+le backtest lit donc le disque exactement comme en vrai (aucun appel Yahoo).
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from marche_synthetique import generer_ohlcv, ecrire_cache, noms_tickers
+from backtest import backtester, statistiques
+
+BOUGIES_PAR_AN = 252 * 7  # Séances US de 7 bougies horaires
+
+def generer_cache(nb_tickers, rng):
+    tickers = noms_tickers(nb_tickers)
+    for ticker in tickers:
+        ecrire_cache(ticker, "60m", generer_ohlcv(BOUGIES_PAR_AN, rng, "60m"))
+    return tickers
+
+def main(nb_tickers=500, nb_processus=None):
+    os.chdir(tempfile.mkdtemp(prefix="bench_backtest_"))
+    tickers = generer_cache(nb_tickers, np.random.default_rng(0))
+
+    debut = time.perf_counter()
+    trades = backtester(tickers, period="1y", interval="60m", nb_processus=nb_processus)
+    duree = time.perf_counter() - debut
+
+    stats = statistiques(trades)
+    print(f"📊 Backtest H1 : {nb_tickers} tickers x {BOUGIES_PAR_AN} bougies")
+    print(f"   ⏱️ {duree:.2f} s ({'OK' if duree < 60 else 'TROP LENT'} / objectif 60 s)")
+    print(f"   🔢 {stats['nb_trades']} trades | 🎯 Win Rate {stats['win_rate']:.1f}%")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+         int(sys.argv[2]) if len(sys.argv) > 2 else None)
@@ -0,0 +1,73 @@
+"""
+Cohérence backtest / live de la stratégie H1 : à chaque bougie, le signal rejoué par
+backtest.py (indicateurs calculés une fois sur toute l'année) est comparé au signal que
+agent_financier_yahoo_pro aurait donné à la même heure (indicateurs recalculés sur la
+fenêtre live seule). Un écart vient de l'amorce des EMA en début de fenêtre.
+
+Usage : python benchmarks/bench_coherence_live.py [nb_tickers] [pas]
+Compare l'ancienne fenêtre fixe de 10 jours à periode_live_h1(params), pour plusieurs EMA lentes.
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from marche_synthetique import generer_ohlcv
+from backtest import CODES_ACHAT
+from donnees_marche import debut_periode
+from noyaux_indicateurs import PARAMS_H1, signaux_h1, scorer_h1_batch, construire_panel, bougies_chauffe, periode_live_h1
+
+BOUGIES_PAR_AN = 252 * 7
+EMA_LENTES = (50, 100, 150)
+
+def heures_de_bourse(nb_bougies):
+    """Index de nb_bougies horaires (9h30 -> 15h30, jours ouvrés) se terminant aujourd'hui"""
+    jours = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=nb_bougies // 7 + 1)
+    heures = [jour + pd.Timedelta(hours=9, minutes=30) + pd.Timedelta(hours=h) for jour in jours for h in range(7)]
+    return pd.DatetimeIndex(heures[-nb_bougies:])
+
+def marche(nb_tickers, rng):
+    index = heures_de_bourse(BOUGIES_PAR_AN)
+    frames = {}
+    for i in range(nb_tickers):
+        df = generer_ohlcv(BOUGIES_PAR_AN, rng, "60m", float(rng.uniform(10, 500)), float(rng.normal(0, 0.0005)))
+        frames[f"SYN{i}"] = df.set_index(index)
+    return frames
+
+def taux_ecart(frames, params, period, pas):
+    """% de bougies (après préchauffage du backtest) où le signal live diffère du signal rejoué"""
+    noms, high, low, close = construire_panel(frames)
+    achat_backtest = np.isin(signaux_h1(high, low, close, params)[0], CODES_ACHAT)
+    # Tous les tickers partagent le même index : début de la fenêtre live calculé comme
+    # telecharger_ohlcv, une fois par séance
+    index = frames[noms[0]].index
+    jours = index.normalize()
+    debuts = {jour: debut_periode(period, maintenant=jour) for jour in jours.unique()}
+    premiere = index.searchsorted([debuts[jour] for jour in jours])
+
+    ecarts = total = 0
+    for t in range(bougies_chauffe(params), len(index), pas):
+        a = premiere[t]
+        # Même appel que agent_financier_batch, sur les seules bougies de la fenêtre live
+        live = scorer_h1_batch(noms, high[:, a:t + 1], low[:, a:t + 1], close[:, a:t + 1], params)
+        for i, ticker in enumerate(noms):
+            ecarts += ("ACHAT" in live[ticker]["signal"]) != achat_backtest[i, t]
+            total += 1
+    return 100 * ecarts / max(total, 1)
+
+def main(nb_tickers=20, pas=2):
+    frames = marche(nb_tickers, np.random.default_rng(0))
+    print(f"🔬 Signal live vs backtest H1 : {nb_tickers} tickers x {BOUGIES_PAR_AN} bougies (1 bougie sur {pas})")
+    for ema_lente in EMA_LENTES:
+        params = {**PARAMS_H1, "ema_lente": ema_lente}
+        for period in ("10d", periode_live_h1(params)):
+            debut = time.perf_counter()
+            ecart = taux_ecart(frames, params, period, pas)
+            print(f"   • EMA lente {ema_lente:>3} | fenêtre {period:>4} : {ecart:5.1f}% de signaux différents"
+                  f" ({time.perf_counter() - debut:.1f} s)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 2)
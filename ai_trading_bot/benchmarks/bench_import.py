@@ -0,0 +1,83 @@
+"""
+Temps de démarrage de chaque commande de `python -m ai_trading_bot` : durée des imports
+de son module principal, mesurée dans un interpréteur neuf (rien en cache dans sys.modules),
+et liste des bibliothèques lourdes effectivement chargées.
+Mesure aussi `python -m ai_trading_bot stats` de bout en bout (démarrage de Python compris).
+
+Usage : python benchmarks/bench_import.py [--repetitions 5] [--sortie bench_import.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+import importlib.util
+
+DOSSIER_BOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOURDS = ("pandas", "numpy", "yfinance", "sklearn", "joblib", "openai", "requests", "matplotlib", "streamlit")
+OBJECTIF = 1.0  # secondes
+
+MESURE = """
+import sys, time, json, runpy
+debut = time.perf_counter()
+sys.path.insert(0, {dossier!r})
+cible = {cible!r}
+if cible.endswith(".py"): runpy.run_path(cible, run_name="bench_import")
+else: __import__(cible)
+duree = time.perf_counter() - debut
+print(json.dumps({{"duree": duree, "lourds": [m for m in {lourds!r} if m in sys.modules]}}))
+"""
+
+def charger_cli():
+    spec = importlib.util.spec_from_file_location("cli_bot", os.path.join(DOSSIER_BOT, "__main__.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def mesurer_import(cible, repetitions, dossier):
+    durees, lourds = [], []
+    code = MESURE.format(dossier=DOSSIER_BOT, cible=cible, lourds=LOURDS)
+    for _ in range(repetitions):
+        sortie = subprocess.run([sys.executable, "-c", code], cwd=dossier, capture_output=True, text=True, check=True)
+        resultat = json.loads(sortie.stdout.strip().splitlines()[-1])
+        durees.append(resultat["duree"])
+        lourds = resultat["lourds"]
+    return {"mediane": statistics.median(durees), "min": min(durees), "max": max(durees), "lourds": lourds}
+
+def mesurer_commande(argv, repetitions, dossier):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        subprocess.run([sys.executable, "-m", os.path.basename(DOSSIER_BOT)] + argv, cwd=os.path.dirname(DOSSIER_BOT),
+                       capture_output=True, check=True, env={**os.environ, "PYTHONIOENCODING": "utf-8"})
+        durees.append(time.perf_counter() - debut)
+    return {"mediane": statistics.median(durees), "min": min(durees), "max": max(durees)}
+
+def main(repetitions=5, sortie=None):
+    cli = charger_cli()
+    dossier = tempfile.mkdtemp(prefix="bench_import_") # Aucun fichier du bot : mesure des imports seuls
+    resultats = {}
+    print(f"📊 Imports par commande ({repetitions} interpréteurs neufs, médiane)")
+    for commande, cible in cli.MODULES_COMMANDES.items():
+        if cible is None: continue
+        r = resultats[commande] = mesurer_import(cible, repetitions, dossier)
+        print(f"   {commande:<11} {r['mediane'] * 1000:8.0f} ms | {', '.join(r['lourds']) or '-'}")
+
+    total = resultats["stats (bout en bout)"] = mesurer_commande(["--dossier", dossier, "stats"], repetitions, dossier)
+    etat = "OK" if total["mediane"] < OBJECTIF else "TROP LENT"
+    print(f"   python -m ai_trading_bot stats : {total['mediane'] * 1000:.0f} ms ({etat} / objectif {OBJECTIF:.0f} s)")
+
+    if sortie:
+        with open(sortie, "w") as f: json.dump(resultats, f, indent=4)
+        print(f"💾 Résultats : {sortie}")
+    return resultats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Temps d'import / de démarrage des commandes du bot")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--sortie", default=None)
+    args = parser.parse_args()
+    main(args.repetitions, args.sortie)
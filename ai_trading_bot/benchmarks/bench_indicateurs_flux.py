@@ -0,0 +1,78 @@
+"""
+Contrôle du moteur d'indicateurs en flux (indicateurs_flux.py) :
+  1. chaque colonne, bougie par bougie, est comparée à calculate_advanced_indicators (pandas),
+     avec une sauvegarde / restauration JSON de l'état au milieu de l'historique ;
+  2. le coût d'UNE nouvelle bougie est comparé au recalcul complet de l'historique.
+
+Usage : python benchmarks/bench_indicateurs_flux.py [nb_bougies]
+Code de sortie 1 si un écart dépasse la tolérance.
+"""
+import os
+import sys
+import json
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from marche_synthetique import generer_ohlcv
+from indicateurs import calculate_advanced_indicators
+from indicateurs_flux import MoteurIndicateurs
+
+TOLERANCE = 1e-9  # Relative (les prix synthétiques vont de 10 à 500 $)
+REPETITIONS = 20
+
+def reference(df):
+    """Colonnes pandas attendues, y compris celles du moteur absentes de calculate_advanced_indicators"""
+    ref = calculate_advanced_indicators(df.copy())
+    ref["EMA_20"] = df["Close"].ewm(span=20, adjust=False).mean()
+    ref["ATR_HL"] = (df["High"] - df["Low"]).rolling(window=14).mean()
+    return ref
+
+def valeurs_flux(df):
+    """Une ligne de valeurs par bougie ; l'état passe par JSON à mi-parcours (redémarrage du bot)"""
+    moteur, lignes = MoteurIndicateurs(), []
+    milieu = len(df) // 2
+    for t, (high, low, close) in enumerate(zip(df["High"], df["Low"], df["Close"])):
+        if t == milieu: moteur = MoteurIndicateurs().restaurer(json.loads(json.dumps(moteur.etat())))
+        lignes.append(moteur.mettre_a_jour(float(high), float(low), float(close)))
+    return lignes
+
+def ecarts(df):
+    """{colonne: écart relatif max} entre le moteur et pandas"""
+    ref, lignes = reference(df), valeurs_flux(df)
+    resultat = {}
+    for colonne in lignes[0]:
+        attendu = ref[colonne].to_numpy(dtype=float)
+        obtenu = np.array([ligne[colonne] for ligne in lignes], dtype=float)
+        if not np.array_equal(np.isnan(attendu), np.isnan(obtenu)):
+            resultat[colonne] = float("inf") # NaN pas aux mêmes bougies
+            continue
+        ok = ~np.isnan(attendu)
+        echelle = np.maximum(np.abs(attendu[ok]), 1.0)
+        resultat[colonne] = float(np.max(np.abs(obtenu[ok] - attendu[ok]) / echelle)) if ok.any() else 0.0
+    return resultat
+
+def main(nb_bougies=2000):
+    df = generer_ohlcv(nb_bougies, np.random.default_rng(0), "1d", prix_initial=120.0)
+    print(f"🔬 Indicateurs en flux vs pandas : {nb_bougies} bougies (état sauvegardé / rechargé à mi-parcours)")
+    resultat = ecarts(df)
+    for colonne, ecart in resultat.items():
+        print(f"   {'✅' if ecart <= TOLERANCE else '❌'} {colonne:<12} écart relatif max {ecart:.1e}")
+
+    # Coût d'une nouvelle bougie : mise à jour O(1) vs recalcul de tout l'historique
+    moteur = MoteurIndicateurs()
+    moteur.rechauffer(df.iloc[:-1])
+    derniere = df.iloc[-1]
+    debut = time.perf_counter()
+    for _ in range(REPETITIONS):
+        MoteurIndicateurs().restaurer(moteur.etat()).mettre_a_jour(float(derniere["High"]), float(derniere["Low"]), float(derniere["Close"]))
+    flux = (time.perf_counter() - debut) / REPETITIONS
+    debut = time.perf_counter()
+    for _ in range(REPETITIONS): calculate_advanced_indicators(df.copy())
+    complet = (time.perf_counter() - debut) / REPETITIONS
+    print(f"   ⏱️ Nouvelle bougie : {flux * 1e6:.0f} µs en flux (état compris) vs {complet * 1e3:.1f} ms de recalcul complet")
+
+    if max(resultat.values()) > TOLERANCE: sys.exit(1)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
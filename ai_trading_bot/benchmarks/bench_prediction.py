@@ -0,0 +1,70 @@
+"""
+Micro-benchmark de predire_succes : latence par appel AVANT (joblib.load à chaque appel)
+et APRÈS (modèle gardé en mémoire), puis predire_succes_batch sur un scan complet.
+
+Usage : python benchmarks/bench_prediction.py [nb_appels]
+Tout se passe dans un dossier temporaire (dataset et modèle synthétiques).
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+import joblib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ml_manager
+
+def features_aleatoires(rng):
+    return {
+        "sentiment": float(rng.uniform(-1, 1)),
+        "auth_score": float(rng.uniform(0, 1)),
+        "rsi": float(rng.uniform(10, 90)),
+        "score_tech": int(rng.integers(0, 6)),
+        "volatilite": float(rng.uniform(0.01, 0.1)),
+    }
+
+def ancien_predire_succes(features):
+    """Version d'origine : rechargement du modèle à chaque appel"""
+    if not os.path.exists(ml_manager.FICHIER_MODELE): return None
+    try:
+        model = joblib.load(ml_manager.FICHIER_MODELE)
+        df = pd.DataFrame([features])
+        return model.predict_proba(df)[0][1]
+    except: return None
+
+def chrono(fonction, nb):
+    debut = time.perf_counter()
+    for _ in range(nb): fonction()
+    return (time.perf_counter() - debut) / nb
+
+def main(nb_appels=50):
+    rng = np.random.default_rng(0)
+    os.chdir(tempfile.mkdtemp(prefix="bench_ml_"))
+
+    # Dataset synthétique + entraînement (publie modeles/cerveau_ia_v0001.pkl)
+    for i in range(200):
+        ml_manager.enregistrer_features(f"T{i}", features_aleatoires(rng))
+        ml_manager._ajouter_ligne(ml_manager.FICHIER_RESULTATS, ["ligne", "resultat"], {"ligne": i, "resultat": int(rng.integers(0, 2))})
+    ml_manager.entrainer_modele()
+    # L'ancien chemin lit le fichier unique cerveau_ia.pkl
+    joblib.dump(ml_manager.charger_modele(), ml_manager.FICHIER_MODELE)
+
+    features = features_aleatoires(rng)
+    scan = [features_aleatoires(rng) for _ in range(10)]
+
+    avant = chrono(lambda: ancien_predire_succes(features), nb_appels)
+    apres = chrono(lambda: ml_manager.predire_succes(features), nb_appels)
+    boucle = chrono(lambda: [ml_manager.predire_succes(f) for f in scan], nb_appels)
+    batch = chrono(lambda: ml_manager.predire_succes_batch(scan), nb_appels)
+
+    print(f"📊 predire_succes ({nb_appels} appels)")
+    print(f"   Avant (joblib.load à chaque appel) : {avant * 1000:8.2f} ms/appel")
+    print(f"   Après (modèle en mémoire)          : {apres * 1000:8.2f} ms/appel  (x{avant / apres:.1f})")
+    print(f"📊 Scan de {len(scan)} candidats")
+    print(f"   {len(scan)} x predire_succes            : {boucle * 1000:8.2f} ms")
+    print(f"   predire_succes_batch              : {batch * 1000:8.2f} ms  (x{boucle / batch:.1f})")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,288 @@
+"""
+Suite de benchmarks du bot, entièrement hors ligne :
+  - marché synthétique (marche_synthetique.py) écrit dans le cache disque de donnees_marche
+  - faux Grok (faux_openai.py) à la place de ai_agent.client, avec latence réglable
+  - faux serveur Telegram (faux_telegram.py)
+
+Scénarios chronométrés : indicateurs, agent_financier_yahoo_pro, scan complet
+execution_automatique (cache Grok vide puis chaud), surveiller_positions avec
+5 / 50 / 500 positions, délai cotation -> sortie via le flux de ticks, et lectures / écritures du portefeuille et de l'historique.
+
+Usage : python benchmarks/bench_suite.py [--sortie bench.json] [--comparer ancien.json]
+                                         [--repetitions 5] [--latence-grok 0.2] [--rapide]
+Les résultats (JSON) contiennent le commit, la machine et min / médiane / moyenne / max
+de chaque scénario : --comparer affiche l'écart des médianes avec un fichier précédent.
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+from contextlib import redirect_stdout
+import numpy as np
+
+DOSSIER_BOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOSSIER_BOT)
+os.environ.setdefault("XAI_API_KEY", "bench") # Le vrai client n'est jamais appelé
+
+from marche_synthetique import remplir_cache, noms_tickers
+from faux_openai import FauxOpenAI
+from faux_telegram import FauxTelegram
+import ai_agent
+import telegram_bot
+import cache_agents
+import metriques
+import portfolio_manager
+import entrainement_bot
+from indicateurs import calculate_advanced_indicators
+from donnees_marche import telecharger_ohlcv
+from finance_agents import agent_financier_yahoo_pro, agent_financier_batch
+from noyaux_indicateurs import scorer_h1, scorer_h1_batch, construire_panel, parametres_strategie
+from moniteur_positions import source_cotations_fixes, surveiller_flux
+from flux_cotations import ServeurTicks, FluxTCP
+from cascade_filtres import Cascade
+
+SEUIL_REGRESSION = 1.2  # Médiane 20 % plus lente que la référence = régression
+
+# ==============================================================================
+# OUTILS
+# ==============================================================================
+def chronometrer(fonction, repetitions, preparer=None):
+    """Durées (s) de `repetitions` appels ; preparer() remet l'état à zéro (non chronométré)"""
+    durees = []
+    for _ in range(repetitions):
+        if preparer: preparer()
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+def resumer(durees, **extra):
+    return {
+        "repetitions": len(durees),
+        "min": min(durees),
+        "mediane": statistics.median(durees),
+        "moyenne": statistics.fmean(durees),
+        "max": max(durees),
+        **extra,
+    }
+
+def etapes_mesurees():
+    """Détail par étape instrumentée (metriques.py) depuis le dernier reinitialiser()"""
+    return {e: {"nb": m["nb"], "erreurs": m["erreurs"], "total": m["somme"]}
+            for e, m in metriques.instantane().items()}
+
+def commit_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=DOSSIER_BOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+def effacer(*chemins):
+    for chemin in chemins:
+        if os.path.isdir(chemin): shutil.rmtree(chemin)
+        elif os.path.exists(chemin): os.remove(chemin)
+
+# ==============================================================================
+# SCÉNARIOS
+# ==============================================================================
+def scenario_indicateurs(tickers, repetitions):
+    horaires = {t: telecharger_ohlcv(t, period="1mo", interval="60m") for t in tickers}
+    journalieres = {t: telecharger_ohlcv(t, period="2y", interval="1d") for t in tickers}
+    params = parametres_strategie("h1")
+
+    def batch():
+        noms, high, low, close = construire_panel(horaires)
+        scorer_h1_batch(noms, high, low, close, params)
+
+    return {
+        "indicateurs.calculate_advanced_indicators": resumer(chronometrer(
+            lambda: [calculate_advanced_indicators(df.copy()) for df in journalieres.values()], repetitions),
+            nb_tickers=len(tickers)),
+        "indicateurs.scorer_h1": resumer(chronometrer(
+            lambda: [scorer_h1(df, params) for df in horaires.values()], repetitions), nb_tickers=len(tickers)),
+        "indicateurs.scorer_h1_batch": resumer(chronometrer(batch, repetitions), nb_tickers=len(tickers)),
+    }
+
+def scenario_agent_financier(tickers, repetitions):
+    metriques.reinitialiser()
+    unitaire = chronometrer(lambda: [agent_financier_yahoo_pro(t) for t in tickers], repetitions)
+    etapes = etapes_mesurees()
+    return {
+        "agent_financier_yahoo_pro": resumer(unitaire, nb_tickers=len(tickers), etapes=etapes),
+        "agent_financier_batch": resumer(chronometrer(lambda: agent_financier_batch(tickers), repetitions),
+                                         nb_tickers=len(tickers)),
+    }
+
+def _reinitialiser_scan(vider_grok):
+    def preparer():
+        effacer(portfolio_manager.FICHIER_PORTFOLIO)
+        entrainement_bot.TICKERS_DEJA_SIGNALES.clear()
+        if vider_grok: cache_agents.vider_cache()
+    return preparer
+
+def scenario_scan(faux_grok, repetitions):
+    resultats = {}
+    for nom, vider_grok in (("execution_automatique.cache_vide", True), ("execution_automatique.cache_chaud", False)):
+        if not vider_grok: _reinitialiser_scan(True)(); entrainement_bot.execution_automatique() # Remplit le cache
+        faux_grok.nb_appels.clear()
+        metriques.reinitialiser()
+        durees = chronometrer(entrainement_bot.execution_automatique, repetitions, _reinitialiser_scan(vider_grok))
+        resultats[nom] = resumer(durees, latence_grok=faux_grok.latence, appels_grok=dict(faux_grok.nb_appels),
+                                 etapes=etapes_mesurees(), filtres=Cascade("full_auto", []).statistiques())
+    return resultats
+
+def _portefeuille_synthetique(nb_positions, rng):
+    """nb_positions positions ; ~10 % touchent leur TP et ~10 % leur SL au prix fourni"""
+    portfolio, prix = {}, {}
+    for ticker in noms_tickers(nb_positions, "POS"):
+        entree = float(rng.uniform(10, 500))
+        portfolio[ticker] = {"entry_price": entree, "stop_loss": entree * 0.95,
+                             "take_profit": entree * 1.08, "date_entry": "2024-01-02 10:00"}
+        tirage = rng.random()
+        prix[ticker] = entree * (1.10 if tirage < 0.1 else 0.93 if tirage < 0.2 else 1.01)
+    return portfolio, prix
+
+def scenario_surveillance(tailles, repetitions, rng):
+    resultats = {}
+    for nb in tailles:
+        portfolio, prix = _portefeuille_synthetique(nb, rng)
+        source = source_cotations_fixes(prix)
+        preparer = lambda: portfolio_manager.ecrire_json_atomique(portfolio_manager.FICHIER_PORTFOLIO, portfolio)
+        metriques.reinitialiser()
+        durees = chronometrer(lambda: entrainement_bot.surveiller_positions(source=source), repetitions, preparer)
+        nb_sorties = sum(1 for t in portfolio if prix[t] >= portfolio[t]["take_profit"] or prix[t] <= portfolio[t]["stop_loss"])
+        resultats[f"surveiller_positions.{nb}"] = resumer(durees, nb_positions=nb, nb_sorties=nb_sorties,
+                                                          etapes=etapes_mesurees())
+    effacer(portfolio_manager.FICHIER_PORTFOLIO)
+    return resultats
+
+def scenario_flux(nb_positions, repetitions, rng):
+    """Délai entre la publication d'un tick qui touche le SL et la fin de la sortie (flux TCP local)"""
+    portfolio, _ = _portefeuille_synthetique(nb_positions, rng)
+    serveur = ServeurTicks().demarrer()
+    flux = FluxTCP(*serveur.adresse).demarrer()
+    durees = []
+    for ticker in list(portfolio)[:repetitions]:
+        portfolio_manager.ecrire_json_atomique(portfolio_manager.FICHIER_PORTFOLIO, portfolio)
+        flux.abonner(portfolio)
+        while serveur.nb_abonnes(ticker) == 0: time.sleep(0.01)
+        sorties = []
+        def cloturer(t, data, prix, raison):
+            entrainement_bot.cloturer_position(t, data, prix, raison)
+            sorties.append(time.perf_counter())
+        debut = time.perf_counter()
+        serveur.publier(ticker, portfolio[ticker]["stop_loss"] * 0.99)
+        surveiller_flux(flux, cloturer, 0.5)
+        durees.append(sorties[0] - debut)
+    flux.arreter()
+    serveur.arreter()
+    effacer(portfolio_manager.FICHIER_PORTFOLIO)
+    return {f"flux.cotation_vers_sortie.{nb_positions}": resumer(durees, nb_positions=nb_positions)}
+
+def scenario_portefeuille(nb_trades, repetitions):
+    tickers = noms_tickers(nb_trades, "IO")
+    trade = {"entry_price": 100.0, "stop_loss": 95.0, "take_profit": 108.0, "date_entry": "2024-01-02 10:00"}
+    operations = {
+        "sauvegarder_trade": lambda: [portfolio_manager.sauvegarder_trade(t, dict(trade)) for t in tickers],
+        "charger_portfolio": lambda: [portfolio_manager.charger_portfolio() for _ in tickers],
+        "archiver_trade_termine": lambda: [portfolio_manager.archiver_trade_termine(t, trade, 104.0, "TAKE PROFIT") for t in tickers],
+        "charger_historique": portfolio_manager.charger_historique,
+        "pnl_realise": portfolio_manager.pnl_realise,
+        "generer_rapport_performance": portfolio_manager.generer_rapport_performance,
+        "supprimer_trade": lambda: [portfolio_manager.supprimer_trade(t) for t in tickers],
+    }
+    durees = {nom: [] for nom in operations}
+    for _ in range(repetitions):
+        effacer(portfolio_manager.FICHIER_PORTFOLIO, portfolio_manager.FICHIER_BASE_HISTORIQUE)
+        for nom, operation in operations.items(): # Dans l'ordre : chaque étape part de l'état laissé par la précédente
+            durees[nom] += chronometrer(operation, 1)
+    return {f"portefeuille.{nom}": resumer(d, nb_trades=nb_trades) for nom, d in durees.items()}
+
+# ==============================================================================
+# COMPARAISON ENTRE DEUX EXÉCUTIONS
+# ==============================================================================
+def comparer(ancien, nouveau):
+    print(f"\n📊 Comparaison avec {ancien.get('commit') or '?'} ({ancien.get('date', '?')})")
+    for nom, resultat in nouveau["scenarios"].items():
+        reference = ancien.get("scenarios", {}).get(nom)
+        if not reference: continue
+        ratio = resultat["mediane"] / reference["mediane"] if reference["mediane"] else float("inf")
+        icone = "🔴" if ratio > SEUIL_REGRESSION else "🟢" if ratio < 1 / SEUIL_REGRESSION else "⚪"
+        print(f"   {icone} {nom:<48} {reference['mediane'] * 1000:10.1f} ms -> {resultat['mediane'] * 1000:10.1f} ms (x{ratio:.2f})")
+
+# ==============================================================================
+# LANCEMENT
+# ==============================================================================
+def main(sortie="bench_resultats.json", reference=None, repetitions=5, latence_grok=0.2, rapide=False):
+    sortie = os.path.abspath(sortie)
+    reference = os.path.abspath(reference) if reference else None
+    nb_tickers = 10 if rapide else 50
+    tailles = (5, 50) if rapide else (5, 50, 500)
+    rng = np.random.default_rng(0)
+
+    dossier = tempfile.mkdtemp(prefix="bench_suite_")
+    os.chdir(dossier)
+    tickers = remplir_cache(nb_tickers, rng, {"60m": 24 * 30, "1d": 2 * 260})
+
+    faux_grok = FauxOpenAI(tickers, latence=latence_grok)
+    ai_agent.client = faux_grok
+    serveur = FauxTelegram().demarrer()
+    telegram_bot.TELEGRAM_API_URL = serveur.url
+    telegram_bot.TELEGRAM_TOKEN, telegram_bot.TELEGRAM_CHAT_ID = "bench", "0"
+    telegram_bot.INTERVALLE_MIN_ENVOI = telegram_bot.DELAI_REGROUPEMENT = 0 # La file ne doit pas prendre de retard
+
+    print(f"🏁 Benchmarks ({nb_tickers} tickers, {repetitions} répétitions, latence Grok {latence_grok}s) dans {dossier}")
+    scenarios = {}
+    etapes = [
+        ("Indicateurs", lambda: scenario_indicateurs(tickers, repetitions)),
+        ("Agent financier", lambda: scenario_agent_financier(tickers, repetitions)),
+        ("Scan complet", lambda: scenario_scan(faux_grok, repetitions)),
+        ("Surveillance", lambda: scenario_surveillance(tailles, repetitions, rng)),
+        ("Flux de ticks", lambda: scenario_flux(tailles[-1], repetitions, rng)),
+        ("Portefeuille / historique", lambda: scenario_portefeuille(20 if rapide else 200, repetitions)),
+    ]
+    for titre, scenario in etapes:
+        with redirect_stdout(io.StringIO()): # Les prints du bot faussent les temps et noient le rapport
+            resultats = scenario()
+        scenarios.update(resultats)
+        for nom, r in resultats.items():
+            print(f"   ⏱️ {nom:<48} médiane {r['mediane'] * 1000:10.1f} ms (min {r['min'] * 1000:.1f} / max {r['max'] * 1000:.1f})")
+
+    telegram_bot.vider_envois()
+    resultat = {
+        "commit": commit_git(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "plateforme": platform.platform(), "cpu": os.cpu_count()},
+        "parametres": {"nb_tickers": nb_tickers, "repetitions": repetitions, "latence_grok": latence_grok,
+                       "tailles_portefeuille": list(tailles)},
+        "telegram": {"messages": len(serveur.messages), "nb_429": serveur.nb_429},
+        "scenarios": scenarios,
+    }
+    serveur.arreter()
+    os.chdir(DOSSIER_BOT)
+    shutil.rmtree(dossier, ignore_errors=True)
+
+    with open(sortie, "w") as f: json.dump(resultat, f, indent=4)
+    print(f"💾 Résultats : {sortie}")
+    if reference:
+        with open(reference) as f: comparer(json.load(f), resultat)
+    return resultat
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne du bot (marché, Grok et Telegram simulés)")
+    parser.add_argument("--sortie", default="bench_resultats.json")
+    parser.add_argument("--comparer", help="JSON d'une exécution précédente (ex : autre commit)")
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--latence-grok", type=float, default=0.2, help="Secondes par appel au faux Grok")
+    parser.add_argument("--rapide", action="store_true", help="Moins de tickers et pas de portefeuille à 500 positions")
+    args = parser.parse_args()
+    main(args.sortie, args.comparer, args.repetitions, args.latence_grok, args.rapide)
@@ -0,0 +1,72 @@
+"""
+Faux client OpenAI (API xAI / Grok) pour les benchmarks : remplace ai_agent.client
+et répond en JSON plausible à chaque agent, après une latence réglable.
+
+    faux = FauxOpenAI(tickers=["SYN0", "SYN1"], latence=0.5)
+    ai_agent.client = faux
+    ...
+    faux.nb_appels      # {"eclaireur": 1, "analyste_batch": 1, ...}
+
+Les réponses sont déterministes (dérivées du ticker) : deux exécutions du même
+scénario font exactement le même travail, ce qui rend les temps comparables.
+"""
+import re
+import json
+import time
+import zlib
+import threading
+from types import SimpleNamespace
+
+class FauxOpenAI:
+    def __init__(self, tickers, latence=0.0, taille_liste=10):
+        self.tickers = list(tickers)
+        self.latence = latence
+        self.taille_liste = taille_liste
+        self.nb_appels = {}
+        self._verrou = threading.Lock()
+        # Même forme que le vrai client : client.chat.completions.create(...)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    # --- Réponses de chaque agent ---
+    def _hasard(self, ticker, sel):
+        """Nombre dans [0, 1) stable pour un ticker donné"""
+        return (zlib.crc32(f"{ticker}|{sel}".encode()) % 10000) / 10000
+
+    def _analyse(self, ticker):
+        return {
+            "spam_ratio": round(self._hasard(ticker, "spam") * 0.5, 2),
+            "sentiment_score": round(self._hasard(ticker, "sentiment") * 1.6 - 0.6, 2),
+            "volume_score": round(0.1 + self._hasard(ticker, "volume") * 0.9, 2),
+            "sujet_principal": f"Actualité {ticker}",
+        }
+
+    def _detecteur(self, ticker):
+        return {
+            "note_chaos": int(self._hasard(ticker, "chaos") * 10),
+            "note_contexte": int(self._hasard(ticker, "contexte") * 10),
+            "note_interaction": int(self._hasard(ticker, "interaction") * 10),
+            "type_foule": "Retail",
+            "explication": "Réponse synthétique",
+        }
+
+    def _repondre(self, prompt):
+        if "liste_tickers" in prompt:
+            sel = "diversification" if "diversification" in prompt else "eclaireur"
+            ordre = sorted(self.tickers, key=lambda t: self._hasard(t, sel))
+            return sel, {"liste_tickers": ordre[:self.taille_liste]}
+        symboles = [s for s in re.findall(r"\$([A-Z0-9.\-^]+)", prompt) if s in self.tickers]
+        if "CHACUNE" in prompt:
+            return "analyste_batch", {t: self._analyse(t) for t in symboles}
+        if "note_chaos" in prompt:
+            return "detecteur_organique", self._detecteur(symboles[0] if symboles else "")
+        return "analyste", self._analyse(symboles[0] if symboles else "")
+
+    # --- API imitée ---
+    def create(self, model=None, messages=(), temperature=None, **kwargs):
+        prompt = " ".join(m.get("content", "") for m in messages)
+        agent, reponse = self._repondre(prompt)
+        with self._verrou: self.nb_appels[agent] = self.nb_appels.get(agent, 0) + 1
+        if self.latence: time.sleep(self.latence)
+        # Grok entoure souvent son JSON de ```json ... ``` : on le fait aussi
+        contenu = "```json\n" + json.dumps(reponse) + "\n```"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=contenu))])
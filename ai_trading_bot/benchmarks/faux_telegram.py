@@ -0,0 +1,109 @@
+"""
+Faux serveur Bot API Telegram (local) pour tester / mesurer telegram_bot sans réseau.
+
+    serveur = FauxTelegram().demarrer()
+    telegram_bot.TELEGRAM_API_URL = serveur.url
+    serveur.ajouter_update("STATS")         # Message "reçu" par le bot
+    ...
+    serveur.messages                         # Textes envoyés par le bot (sendMessage)
+    serveur.arreter()
+
+Gère sendMessage et getUpdates (long-polling), et peut simuler la limite de débit
+(réponse 429 + retry_after) et une latence réseau.
+"""
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+class FauxTelegram:
+    def __init__(self, latence=0.0, limite_par_seconde=None, retry_after=1):
+        self.latence = latence
+        self.limite_par_seconde = limite_par_seconde  # None = pas de 429
+        self.retry_after = retry_after
+        self.messages = []   # Textes reçus via sendMessage
+        self.requetes = []   # (méthode, horodatage) de chaque appel
+        self.nb_429 = 0
+        self._updates = []
+        self._prochain_id = 1
+        self._condition = threading.Condition()
+        self._envois = []    # Horodatages des sendMessage acceptés
+        self._serveur = None
+
+    # --- Côté test ---
+    def ajouter_update(self, texte):
+        with self._condition:
+            self._updates.append({"update_id": self._prochain_id, "message": {"text": texte}})
+            self._prochain_id += 1
+            self._condition.notify_all()
+
+    def demarrer(self):
+        faux = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args): pass
+
+            def _repondre(self, code, corps):
+                data = json.dumps(corps).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _traiter(self, params):
+                methode = urlparse(self.path).path.rsplit("/", 1)[-1]
+                faux.requetes.append((methode, time.time()))
+                if faux.latence: time.sleep(faux.latence)
+                if methode == "sendMessage": return faux._send_message(self, params)
+                if methode == "getUpdates": return faux._get_updates(self, params)
+                self._repondre(404, {"ok": False, "description": "Not Found"})
+
+            def do_GET(self):
+                self._traiter({k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()})
+
+            def do_POST(self):
+                corps = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+                self._traiter({k: v[0] for k, v in parse_qs(corps).items()})
+
+        self._serveur = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._serveur.daemon_threads = True
+        threading.Thread(target=self._serveur.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        hote, port = self._serveur.server_address
+        return f"http://{hote}:{port}"
+
+    def arreter(self):
+        if self._serveur:
+            with self._condition: self._condition.notify_all()
+            self._serveur.shutdown()
+            self._serveur.server_close()
+
+    # --- Bot API ---
+    def _send_message(self, handler, params):
+        with self._condition:
+            maintenant = time.time()
+            if self.limite_par_seconde:
+                self._envois = [t for t in self._envois if maintenant - t < 1]
+                if len(self._envois) >= self.limite_par_seconde:
+                    self.nb_429 += 1
+                    return handler._repondre(429, {"ok": False, "error_code": 429,
+                                                   "parameters": {"retry_after": self.retry_after}})
+            self._envois.append(maintenant)
+            self.messages.append(params.get("text", ""))
+        handler._repondre(200, {"ok": True, "result": {"message_id": len(self.messages)}})
+
+    def _get_updates(self, handler, params):
+        offset = int(params.get("offset", 0))
+        fin = time.time() + float(params.get("timeout", 0))
+        with self._condition:
+            while True:
+                resultat = [u for u in self._updates if u["update_id"] >= offset]
+                reste = fin - time.time()
+                if resultat or reste <= 0: break
+                self._condition.wait(min(reste, 0.5))
+        handler._repondre(200, {"ok": True, "result": resultat})
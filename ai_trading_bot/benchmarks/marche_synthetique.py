@@ -0,0 +1,69 @@
+"""
+Marché synthétique pour les benchmarks : bougies OHLCV aléatoires (marche géométrique)
+écrites directement dans le cache disque de donnees_marche, marquées fraîches.
+telecharger_ohlcv / telecharger_ohlcv_batch les relisent donc comme de vraies
+bougies Yahoo, sans aucun appel réseau.
+
+    rng = np.random.default_rng(0)
+    tickers = remplir_cache(nb_tickers=50, rng=rng, intervalles={"60m": 300, "1d": 260})
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import donnees_marche
+
+# Fréquence pandas de chaque intervalle Yahoo
+FREQUENCES = {"15m": "15min", "30m": "30min", "60m": "h", "1h": "h", "1d": "B", "1wk": "W-FRI"}
+# Volatilité par bougie (plus forte sur les grandes unités de temps)
+VOLATILITES = {"15m": 0.003, "30m": 0.004, "60m": 0.006, "1h": 0.006, "1d": 0.02, "1wk": 0.045}
+
+def noms_tickers(nb_tickers, prefixe="SYN"):
+    return [f"{prefixe}{i}" for i in range(nb_tickers)]
+
+def generer_ohlcv(nb_bougies, rng, interval="60m", prix_initial=50.0, derive=0.0):
+    """DataFrame Open/High/Low/Close/Volume de nb_bougies se terminant maintenant"""
+    freq = FREQUENCES.get(interval, "h")
+    vol = VOLATILITES.get(interval, 0.006)
+    index = pd.date_range(end=pd.Timestamp.now().floor("h"), periods=nb_bougies, freq=freq)
+
+    close = prix_initial * np.exp(np.cumsum(rng.normal(derive, vol, nb_bougies)))
+    ouverture = np.concatenate(([prix_initial], close[:-1]))
+    ecart = np.abs(rng.normal(0, vol * 0.7, nb_bougies))
+    return pd.DataFrame({
+        "Open": ouverture,
+        "High": np.maximum(ouverture, close) * (1 + ecart),
+        "Low": np.minimum(ouverture, close) * (1 - ecart),
+        "Close": close,
+        "Volume": rng.integers(1e4, 1e6, nb_bougies),
+    }, index=index)
+
+def ecrire_cache(ticker, interval, df):
+    """Range df dans le cache disque comme un téléchargement complet et récent"""
+    chemin_data, chemin_meta = donnees_marche._chemins(ticker, interval)
+    donnees_marche._ecrire_cache(chemin_data, chemin_meta, df, {"couvre_depuis": "max", "maj": time.time()})
+
+def remplir_cache(nb_tickers, rng, intervalles=None, prefixe="SYN"):
+    """
+    Génère nb_tickers tickers pour chaque {intervalle: nb_bougies} et les écrit dans le cache.
+    Renvoie la liste des tickers. Le dossier courant doit être un dossier de travail jetable.
+    """
+    intervalles = intervalles or {"60m": 300}
+    tickers = noms_tickers(nb_tickers, prefixe)
+    for ticker in tickers:
+        prix_initial = float(rng.uniform(10, 500))
+        derive = float(rng.normal(0, 0.0005))
+        for interval, nb_bougies in intervalles.items():
+            ecrire_cache(ticker, interval, generer_ohlcv(nb_bougies, rng, interval, prix_initial, derive))
+    return tickers
+
+def derniers_prix(tickers, interval="60m"):
+    """{ticker: dernier Close} lus dans le cache (pour construire des positions réalistes)"""
+    prix = {}
+    for ticker in tickers:
+        df, _ = donnees_marche._lire_cache(*donnees_marche._chemins(ticker, interval))
+        if df is not None and not df.empty: prix[ticker] = float(df["Close"].iloc[-1])
+    return prix
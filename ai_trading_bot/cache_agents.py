@@ -0,0 +1,95 @@
+import time
+import sqlite3
+import hashlib
+from contextlib import contextmanager
+
+# ==============================================================================
+# CACHE DES RÉPONSES GROK (SQLite, partagé entre les bots et les redémarrages)
+# ==============================================================================
+# Clé = agent + ticker + hash du prompt + tranche de temps (TTL de l'agent).
+# Une réponse est réutilisée tant qu'on reste dans la même tranche et que son TTL
+# n'est pas dépassé. Au-delà de TAILLE_MAX entrées, on supprime les moins utilisées (LRU).
+
+FICHIER_CACHE = "cache_grok.db"
+TAILLE_MAX = 2000
+
+# Durée de vie (secondes) par agent. 0 = pas de cache.
+TTL_AGENTS = {
+    "agent_eclaireur": 15 * 60,
+    "agent_chasseur_diversification": 60 * 60,
+    "agent_analyste": 20 * 60,
+    "agent_analyste_batch": 20 * 60,
+    "agent_detecteur_organique": 60 * 60,
+}
+TTL_DEFAUT = 15 * 60
+
+@contextmanager
+def _connexion():
+    """Connexion courte (WAL : plusieurs processus peuvent lire/écrire en même temps)"""
+    conn = sqlite3.connect(FICHIER_CACHE, timeout=10)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS reponses (
+            cle TEXT PRIMARY KEY, agent TEXT, ticker TEXT, contenu TEXT,
+            cree REAL, dernier_acces REAL)""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_acces ON reponses(dernier_acces)")
+        conn.execute("CREATE TABLE IF NOT EXISTS compteurs (agent TEXT PRIMARY KEY, hits INTEGER, misses INTEGER)")
+        with conn: yield conn
+    finally:
+        conn.close()
+
+def _cle(agent, ticker, prompt, ttl, maintenant):
+    tranche = int(maintenant // ttl)
+    empreinte = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+    return f"{agent}|{ticker}|{empreinte}|{tranche}"
+
+def _compter(conn, agent, colonne):
+    conn.execute("INSERT OR IGNORE INTO compteurs VALUES (?, 0, 0)", (agent,))
+    conn.execute(f"UPDATE compteurs SET {colonne} = {colonne} + 1 WHERE agent = ?", (agent,))
+
+def lire_cache(agent, ticker, prompt):
+    """Renvoie la réponse en cache (str) ou None"""
+    ttl = TTL_AGENTS.get(agent, TTL_DEFAUT)
+    if ttl <= 0: return None
+    maintenant = time.time()
+    cle = _cle(agent, ticker, prompt, ttl, maintenant)
+    try:
+        with _connexion() as conn:
+            ligne = conn.execute("SELECT contenu, cree FROM reponses WHERE cle = ?", (cle,)).fetchone()
+            if ligne and maintenant - ligne[1] < ttl:
+                conn.execute("UPDATE reponses SET dernier_acces = ? WHERE cle = ?", (maintenant, cle))
+                _compter(conn, agent, "hits")
+                return ligne[0]
+            _compter(conn, agent, "misses")
+    except sqlite3.Error as e:
+        print(f"⚠️ Cache Grok indisponible : {e}")
+    return None
+
+def ecrire_cache(agent, ticker, prompt, contenu):
+    ttl = TTL_AGENTS.get(agent, TTL_DEFAUT)
+    if ttl <= 0: return
+    maintenant = time.time()
+    try:
+        with _connexion() as conn:
+            conn.execute("INSERT OR REPLACE INTO reponses VALUES (?, ?, ?, ?, ?, ?)",
+                         (_cle(agent, ticker, prompt, ttl, maintenant), agent, ticker, contenu, maintenant, maintenant))
+            # Purge des réponses expirées de cet agent, puis limite de taille (LRU)
+            conn.execute("DELETE FROM reponses WHERE agent = ? AND cree < ?", (agent, maintenant - ttl))
+            conn.execute("""DELETE FROM reponses WHERE cle IN (
+                SELECT cle FROM reponses ORDER BY dernier_acces DESC LIMIT -1 OFFSET ?)""", (TAILLE_MAX,))
+    except sqlite3.Error as e:
+        print(f"⚠️ Cache Grok indisponible : {e}")
+
+def stats_cache():
+    """{agent: {"hits", "misses", "taux"}} depuis la création du cache"""
+    try:
+        with _connexion() as conn:
+            lignes = conn.execute("SELECT agent, hits, misses FROM compteurs").fetchall()
+    except sqlite3.Error:
+        return {}
+    return {a: {"hits": h, "misses": m, "taux": h / (h + m) if h + m else 0.0} for a, h, m in lignes}
+
+def vider_cache():
+    with _connexion() as conn:
+        conn.execute("DELETE FROM reponses")
+        conn.execute("DELETE FROM compteurs")
@@ -0,0 +1,151 @@
+import json
+import time
+from portfolio_manager import ecrire_json_atomique, verrou_fichier
+from pipeline_scan import lancer_en_parallele
+
+# ==============================================================================
+# CASCADE DE FILTRES ORDONNÉE PAR COÛT
+# ==============================================================================
+# Un scan = une suite de filtres (technique Yahoo, sentiment Grok, authenticité Grok...).
+# Un candidat doit TOUS les passer : l'ordre ne change pas le résultat, seulement le coût.
+# On applique donc d'abord le filtre au plus petit rang  coût / (1 - taux de passage) :
+# un filtre bon marché qui élimine beaucoup passe avant un appel Grok de 3 s.
+#   - chaque filtre est appliqué à TOUS les candidats restants (en lot si possible,
+#     sinon un appel par candidat en parallèle) ;
+#   - `apres` déclare les dépendances (ex : l'authenticité a besoin du sujet du sentiment) ;
+#   - le coût par candidat et le taux de passage observés sont sauvegardés dans
+#     FICHIER_SELECTIVITE : l'ordre s'adapte d'un scan (et d'un redémarrage) à l'autre.
+FICHIER_SELECTIVITE = "selectivite_filtres.json"
+FENETRE_OBSERVATIONS = 500  # Au-delà, les anciennes observations pèsent de moins en moins
+PASSAGE_A_PRIORI = 0.5      # Taux de passage supposé d'un filtre jamais observé...
+POIDS_A_PRIORI = 2          # ...qui compte pour 2 candidats
+PASSAGE_MAX = 0.99          # Évite la division par zéro d'un filtre qui laisse tout passer
+
+class Filtre:
+    """
+    garder(resultat, contexte) -> bool : le candidat continue-t-il ?
+    lot(tickers, contextes) -> {ticker: resultat}  : évaluation groupée (1 appel pour tous), ou
+    par_ticker(ticker, contexte) -> resultat       : un appel par candidat (lancé en parallèle).
+    cout : secondes par candidat supposées tant que le filtre n'a pas été mesuré.
+    """
+    def __init__(self, nom, garder, lot=None, par_ticker=None, cout=1.0, apres=()):
+        if (lot is None) == (par_ticker is None): raise ValueError(f"Filtre {nom} : lot OU par_ticker")
+        self.nom = nom
+        self.garder = garder
+        self.lot = lot
+        self.par_ticker = par_ticker
+        self.cout = cout
+        self.apres = tuple(apres)
+
+    def evaluer(self, tickers, contextes):
+        if self.lot is not None:
+            return self.lot(tickers, contextes) or {}
+        resultats = lancer_en_parallele(tickers, lambda ticker: self.par_ticker(ticker, contextes[ticker]))
+        return dict(zip(tickers, resultats))
+
+class Cascade:
+    def __init__(self, nom, filtres, fichier=FICHIER_SELECTIVITE):
+        self.nom = nom
+        self.filtres = {f.nom: f for f in filtres}
+        self.fichier = fichier
+        self.dernier_passage = []  # [(filtre, entrés, gardés, durée)] du dernier executer()
+        for f in filtres:
+            inconnus = set(f.apres) - set(self.filtres)
+            if inconnus: raise ValueError(f"Filtre {f.nom} : dépendances inconnues {inconnus}")
+
+    # --- Sélectivité observée (persistée) ---
+    def _lire(self):
+        try:
+            with open(self.fichier, "r") as f: return json.load(f)
+        except (OSError, ValueError): return {}
+
+    def statistiques(self):
+        return self._lire().get(self.nom, {})
+
+    def _enregistrer(self, observations):
+        with verrou_fichier(self.fichier): # Les deux bots partagent le fichier : lecture + écriture d'un bloc
+            tout = self._lire()
+            stats = tout.setdefault(self.nom, {})
+            for nom, (evalues, gardes, duree) in observations.items():
+                s = stats.setdefault(nom, {"evalues": 0, "gardes": 0, "duree": 0.0})
+                s["evalues"] += evalues
+                s["gardes"] += gardes
+                s["duree"] += duree
+                if s["evalues"] > FENETRE_OBSERVATIONS:
+                    facteur = FENETRE_OBSERVATIONS / s["evalues"]
+                    for cle in s: s[cle] *= facteur
+            ecrire_json_atomique(self.fichier, tout)
+
+    def cout_et_passage(self, filtre, stats=None):
+        s = (stats if stats is not None else self.statistiques()).get(filtre.nom, {})
+        evalues = s.get("evalues", 0)
+        cout = s["duree"] / evalues if evalues else filtre.cout
+        passage = (s.get("gardes", 0) + PASSAGE_A_PRIORI * POIDS_A_PRIORI) / (evalues + POIDS_A_PRIORI)
+        return cout, passage
+
+    def rang(self, filtre, stats=None):
+        cout, passage = self.cout_et_passage(filtre, stats)
+        return cout / (1 - min(passage, PASSAGE_MAX))
+
+    def ordre(self, stats=None):
+        """Ordre d'exécution : à chaque pas, le filtre disponible (dépendances faites) au plus petit rang"""
+        stats = self.statistiques() if stats is None else stats
+        faits, ordre = set(), []
+        while len(ordre) < len(self.filtres):
+            prets = [f for n, f in self.filtres.items() if n not in faits and set(f.apres) <= faits]
+            suivant = min(prets, key=lambda f: self.rang(f, stats))
+            ordre.append(suivant)
+            faits.add(suivant.nom)
+        return ordre
+
+    # --- Exécution ---
+    def executer(self, tickers, contextes=None):
+        """
+        Passe les tickers dans tous les filtres. Renvoie {ticker: contexte} des survivants,
+        contexte[nom_du_filtre] = résultat de ce filtre pour le ticker.
+        """
+        restants = list(dict.fromkeys(tickers))
+        contextes = contextes or {}
+        for t in restants: contextes.setdefault(t, {})
+        observations = {}
+        self.dernier_passage = []
+
+        for filtre in self.ordre():
+            if not restants: break
+            debut = time.perf_counter()
+            try:
+                resultats = filtre.evaluer(restants, {t: contextes[t] for t in restants})
+            except Exception as e:
+                print(f"      ❌ Filtre {filtre.nom} : {e}")
+                resultats = {}
+            duree = time.perf_counter() - debut
+
+            gardes = []
+            for ticker in restants:
+                resultat = resultats.get(ticker)
+                contextes[ticker][filtre.nom] = resultat
+                try: garde = resultat is not None and filtre.garder(resultat, contextes[ticker])
+                except (KeyError, TypeError, ValueError): garde = False
+                if garde: gardes.append(ticker)
+
+            rejetes = [t for t in restants if t not in gardes]
+            if rejetes: print(f"      🚫 [{filtre.nom}] {len(rejetes)} écarté(s) : {', '.join(rejetes)}")
+            observations[filtre.nom] = (len(restants), len(gardes), duree)
+            self.dernier_passage.append((filtre.nom, len(restants), len(gardes), duree))
+            restants = gardes
+
+        if observations: self._enregistrer(observations)
+        return {t: contextes[t] for t in restants}
+
+    def rapport(self):
+        stats = self.statistiques()
+        lignes = [f"🧮 Cascade '{self.nom}' (ordre actuel) :"]
+        for filtre in self.ordre(stats):
+            cout, passage = self.cout_et_passage(filtre, stats)
+            evalues = stats.get(filtre.nom, {}).get("evalues", 0)
+            lignes.append(f"   • {filtre.nom:<14} passage {passage * 100:5.1f}% | coût {cout * 1000:8.1f} ms/candidat"
+                          f" | rang {self.rang(filtre, stats):7.3f} | {evalues:.0f} observés")
+        if self.dernier_passage:
+            dernier = " -> ".join(f"{n} {e}→{g}" for n, e, g, _ in self.dernier_passage)
+            lignes.append(f"   Dernier scan : {dernier}")
+        return "\n".join(lignes)
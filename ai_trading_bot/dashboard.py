@@ -1,218 +1,252 @@
-import streamlit as st
-import pandas as pd
-import json
-import plotly.graph_objects as go
-import yfinance as yf
-from datetime import datetime, timedelta
-
-# --- CONFIGURATION ---
-st.set_page_config(page_title="🤖 Cockpit Trading Pro", layout="wide", page_icon="📈")
-
-# --- CSS : Forcer l'affichage des axes ---
-st.markdown("""
-    <style>
-    .js-plotly-plot .plotly .xaxislayer-above, .js-plotly-plot .plotly .yaxislayer-above {
-        opacity: 1 !important;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-# Titre
-col_title, col_btn = st.columns([3, 1])
-with col_title:
-    st.title("⚡ Mon Cockpit de Trading")
-with col_btn:
-    if st.button('🔄 Actualiser (Live)'):
-        st.rerun()
-
-# --- FONCTIONS ---
-def charger_json(filename):
-    try:
-        with open(filename, 'r') as f:
-            return json.load(f)
-    except:
-        return [] if 'history' in filename else {}
-
-def get_historical_data(ticker):
-    try:
-        # On télécharge 5 jours
-        df = yf.download(ticker, period="5d", interval="60m", progress=False)
-        return df
-    except:
-        return pd.DataFrame()
-
-# =========================================================
-# 1. CALCULS P&L
-# =========================================================
-history = charger_json('trades_history.json')
-portfolio = charger_json('portfolio.json')
-
-total_realise = 0
-if history:
-    for t in history:
-        entry_p = float(t.get('entry_price', 0))
-        exit_p = float(t.get('exit_price', 0))
-        if 'profit_loss_amount' in t:
-            total_realise += float(t['profit_loss_amount'])
-        elif entry_p > 0:
-            total_realise += (exit_p - entry_p)
-
-total_latent = 0
-if portfolio:
-    for ticker, data in portfolio.items():
-        info = yf.Ticker(ticker).fast_info
-        current_price = info.last_price if info.last_price else float(data['entry_price'])
-        total_latent += (current_price - float(data['entry_price']))
-
-total_pnl = total_realise + total_latent
-
-# =========================================================
-# 2. COURBE GLOBALE (EQUITY)
-# =========================================================
-st.markdown("### 🏆 Performance Globale")
-col1, col2, col3 = st.columns(3)
-col1.metric("💰 Gains Réalisés", f"{total_realise:.2f} $")
-col2.metric("⏳ Gains Latents", f"{total_latent:.2f} $")
-col3.metric("🚀 RÉSULTAT NET", f"{total_pnl:.2f} $")
-
-try:
-    df_equity = pd.read_csv('equity_log.csv')
-    if not df_equity.empty:
-        fig_eq = go.Figure()
-        fig_eq.add_trace(go.Scatter(
-            x=df_equity['Date'], y=df_equity['Total_PNL'],
-            fill='tozeroy', mode='lines+markers', marker=dict(size=6),
-            line=dict(color='#00CC96', width=3), name='Capital'
-        ))
-        fig_eq.update_layout(
-            height=350, margin=dict(l=20, r=20, t=20, b=30),
-            yaxis=dict(tickprefix="$", showgrid=True, automargin=True, showticklabels=True),
-            xaxis=dict(showgrid=False)
-        )
-        st.plotly_chart(fig_eq, use_container_width=True)
-    else:
-        st.info("La courbe se construit...")
-except:
-    st.warning("Fichier equity_log.csv manquant.")
-
-st.divider()
-
-# =========================================================
-# 3. POSITIONS ACTIVES (VERSION BLINDÉE 🛡️)
-# =========================================================
-st.markdown("### 🔭 Surveillance des Positions")
-
-if not portfolio:
-    st.info("Aucune position en cours.")
-else:
-    cols = st.columns(2)
-    for i, (ticker, data) in enumerate(portfolio.items()):
-        col = cols[i % 2]
-        with col:
-            with st.container(border=True):
-                # Récupération Données
-                df_ticker = get_historical_data(ticker)
-                
-                # --- A. PRÉPARATION DES DATES ET PRIX ---
-                now = datetime.now()
-                
-                if not df_ticker.empty:
-                    current_price = float(df_ticker['Close'].iloc[-1])
-                    # On prend les dates réelles du graphe
-                    last_date = df_ticker.index[-1]
-                    # Conversion timezone si nécessaire pour éviter les bugs de calcul
-                    if last_date.tzinfo is None:
-                        last_date = last_date.replace(tzinfo=None)
-                    else:
-                        last_date = last_date.replace(tzinfo=None) # On simplifie tout en "naïf"
-                        
-                else:
-                    current_price = float(data['entry_price'])
-                    last_date = now
-
-                # --- B. LE SECRET : ON FORCE UNE FENÊTRE DE TEMPS LARGE ---
-                # On crée artificiellement un début (il y a 4h) et une fin (dans 4h)
-                # Cela garantit que les lignes SL/TP feront au moins 8 heures de long sur l'écran
-                line_start = last_date - timedelta(hours=4)
-                line_end = last_date + timedelta(hours=4)
-
-                entry = float(data['entry_price'])
-                tp = float(data['take_profit'])
-                sl = float(data['stop_loss'])
-                
-                pct = ((current_price - entry) / entry) * 100
-                color_t = "green" if pct >= 0 else "red"
-                
-                st.markdown(f"**{ticker}** : <span style='color:{color_t}'>{pct:.2f}%</span> | Prix: **{current_price:.2f}$**", unsafe_allow_html=True)
-
-                # --- C. CONSTRUCTION DU GRAPHIQUE ---
-                fig = go.Figure()
-
-                # 1. Courbe du Prix (Historique)
-                if not df_ticker.empty:
-                    fig.add_trace(go.Scatter(
-                        x=df_ticker.index, y=df_ticker['Close'],
-                        mode='lines+markers', line=dict(color='blue', width=2),
-                        marker=dict(size=4), name='Prix'
-                    ))
-                
-                # 2. Point Actuel (Gros point)
-                fig.add_trace(go.Scatter(
-                    x=[last_date], y=[current_price],
-                    mode='markers', marker=dict(size=12, color='blue', line=dict(width=2, color='white')),
-                    showlegend=False
-                ))
-
-                # 3. TRACAGE DES LIGNES SUR LA FENÊTRE ÉLARGIE (Start -> End)
-                
-                # Take Profit (Vert)
-                fig.add_trace(go.Scatter(
-                    x=[line_start, line_end], y=[tp, tp],
-                    mode='lines', line=dict(color='#00CC96', width=2, dash='dash'), name='TP'
-                ))
-                
-                # Stop Loss (Rouge)
-                fig.add_trace(go.Scatter(
-                    x=[line_start, line_end], y=[sl, sl],
-                    mode='lines', line=dict(color='#EF553B', width=2, dash='dash'), name='SL'
-                ))
-                
-                # Entrée (Gris)
-                fig.add_trace(go.Scatter(
-                    x=[line_start, line_end], y=[entry, entry],
-                    mode='lines', line=dict(color='gray', width=1, dash='dot'), name='Entrée'
-                ))
-
-                # --- D. MISE EN PAGE AXES ---
-                vals = [current_price, sl, tp, entry]
-                y_min, y_max = min(vals), max(vals)
-                padding = (y_max - y_min) * 0.2 # 20% de marge
-
-                fig.update_layout(
-                    height=300,
-                    margin=dict(l=10, r=10, t=30, b=20),
-                    showlegend=False,
-                    # On force la vue sur notre fenêtre élargie en X
-                    xaxis=dict(
-                        range=[line_start, line_end], 
-                        showgrid=False
-                    ),
-                    # On force la vue en Y pour voir les SL/TP
-                    yaxis=dict(
-                        range=[y_min - padding, y_max + padding],
-                        tickprefix="$",
-                        tickformat=".2f",
-                        showticklabels=True,
-                        automargin=True, # Empêche de couper les prix
-                        showline=True,
-                        linecolor="black",
-                        ticks="outside",
-                        fixedrange=False
-                    )
-                )
-                
-                # Annotations Texte
-                fig.add_annotation(x=line_end, y=tp, text="TP", xanchor="right", yshift=10, showarrow=False, font=dict(color="#00CC96"))
-                fig.add_annotation(x=line_end, y=sl, text="SL", xanchor="right", yshift=-10, showarrow=False, font=dict(color="#EF553B"))
-                
-                st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from concurrent.futures import ThreadPoolExecutor
+from donnees_marche import telecharger_ohlcv_batch
+from moniteur_positions import source_cotations_yahoo
+from portfolio_manager import charger_portfolio, pnl_realise
+from serie_equity import LecteurEquity, reduire
+from datetime import datetime, timedelta
+
+# Données marché mémorisées entre les reruns ET les sessions (st.cache_data) :
+# une actualisation ne refait une requête Yahoo qu'après expiration du TTL.
+TTL_COTATIONS = 30    # Prix live des positions (secondes)
+TTL_BOUGIES = 300     # Bougies H1 des graphiques
+
+# --- CONFIGURATION ---
+st.set_page_config(page_title="🤖 Cockpit Trading Pro", layout="wide", page_icon="📈")
+
+# --- CSS : Forcer l'affichage des axes ---
+st.markdown("""
+    <style>
+    .js-plotly-plot .plotly .xaxislayer-above, .js-plotly-plot .plotly .yaxislayer-above {
+        opacity: 1 !important;
+    }
+    </style>
+""", unsafe_allow_html=True)
+
+# Titre
+col_title, col_btn = st.columns([3, 1])
+with col_title:
+    st.title("⚡ Mon Cockpit de Trading")
+with col_btn:
+    if st.button('🔄 Actualiser (Live)'):
+        st.rerun()
+
+# --- FONCTIONS ---
+@st.cache_data(ttl=TTL_COTATIONS, show_spinner=False)
+def get_cotations(tickers):
+    """Dernier prix de toutes les positions en UNE requête"""
+    try:
+        return source_cotations_yahoo(list(tickers))
+    except:
+        return {}
+
+@st.cache_data(ttl=TTL_BOUGIES, show_spinner=False)
+def get_historical_data(tickers):
+    """5 jours de bougies H1 de toutes les positions (cache disque partagé avec les bots, 1 requête groupée)"""
+    try:
+        return telecharger_ohlcv_batch(list(tickers), period="5d", interval="60m")
+    except:
+        return {}
+
+def construire_carte(ticker, data, df_ticker, prix_live):
+    """Titre + graphique d'une position (calcul pur, sans appel Streamlit : exécutable en parallèle)"""
+    # --- A. PRÉPARATION DES DATES ET PRIX ---
+    now = datetime.now()
+    
+    if not df_ticker.empty:
+        current_price = prix_live or float(df_ticker['Close'].iloc[-1])
+        # On prend les dates réelles du graphe
+        last_date = df_ticker.index[-1]
+        # Conversion timezone si nécessaire pour éviter les bugs de calcul
+        if last_date.tzinfo is None:
+            last_date = last_date.replace(tzinfo=None)
+        else:
+            last_date = last_date.replace(tzinfo=None) # On simplifie tout en "naïf"
+            
+    else:
+        current_price = prix_live or float(data['entry_price'])
+        last_date = now
+
+    # --- B. LE SECRET : ON FORCE UNE FENÊTRE DE TEMPS LARGE ---
+    # On crée artificiellement un début (il y a 4h) et une fin (dans 4h)
+    # Cela garantit que les lignes SL/TP feront au moins 8 heures de long sur l'écran
+    line_start = last_date - timedelta(hours=4)
+    line_end = last_date + timedelta(hours=4)
+
+    entry = float(data['entry_price'])
+    tp = float(data['take_profit'])
+    sl = float(data['stop_loss'])
+    
+    pct = ((current_price - entry) / entry) * 100
+    color_t = "green" if pct >= 0 else "red"
+    
+    titre = f"**{ticker}** : <span style='color:{color_t}'>{pct:.2f}%</span> | Prix: **{current_price:.2f}$**"
+
+    # --- C. CONSTRUCTION DU GRAPHIQUE ---
+    fig = go.Figure()
+
+    # 1. Courbe du Prix (Historique)
+    if not df_ticker.empty:
+        fig.add_trace(go.Scatter(
+            x=df_ticker.index, y=df_ticker['Close'],
+            mode='lines+markers', line=dict(color='blue', width=2),
+            marker=dict(size=4), name='Prix'
+        ))
+    
+    # 2. Point Actuel (Gros point)
+    fig.add_trace(go.Scatter(
+        x=[last_date], y=[current_price],
+        mode='markers', marker=dict(size=12, color='blue', line=dict(width=2, color='white')),
+        showlegend=False
+    ))
+
+    # 3. TRACAGE DES LIGNES SUR LA FENÊTRE ÉLARGIE (Start -> End)
+    
+    # Take Profit (Vert)
+    fig.add_trace(go.Scatter(
+        x=[line_start, line_end], y=[tp, tp],
+        mode='lines', line=dict(color='#00CC96', width=2, dash='dash'), name='TP'
+    ))
+    
+    # Stop Loss (Rouge)
+    fig.add_trace(go.Scatter(
+        x=[line_start, line_end], y=[sl, sl],
+        mode='lines', line=dict(color='#EF553B', width=2, dash='dash'), name='SL'
+    ))
+    
+    # Entrée (Gris)
+    fig.add_trace(go.Scatter(
+        x=[line_start, line_end], y=[entry, entry],
+        mode='lines', line=dict(color='gray', width=1, dash='dot'), name='Entrée'
+    ))
+
+    # --- D. MISE EN PAGE AXES ---
+    vals = [current_price, sl, tp, entry]
+    y_min, y_max = min(vals), max(vals)
+    padding = (y_max - y_min) * 0.2 # 20% de marge
+
+    fig.update_layout(
+        height=300,
+        margin=dict(l=10, r=10, t=30, b=20),
+        showlegend=False,
+        # On force la vue sur notre fenêtre élargie en X
+        xaxis=dict(
+            range=[line_start, line_end], 
+            showgrid=False
+        ),
+        # On force la vue en Y pour voir les SL/TP
+        yaxis=dict(
+            range=[y_min - padding, y_max + padding],
+            tickprefix="$",
+            tickformat=".2f",
+            showticklabels=True,
+            automargin=True, # Empêche de couper les prix
+            showline=True,
+            linecolor="black",
+            ticks="outside",
+            fixedrange=False
+        )
+    )
+    
+    # Annotations Texte
+    fig.add_annotation(x=line_end, y=tp, text="TP", xanchor="right", yshift=10, showarrow=False, font=dict(color="#00CC96"))
+    fig.add_annotation(x=line_end, y=sl, text="SL", xanchor="right", yshift=-10, showarrow=False, font=dict(color="#EF553B"))
+    return titre, fig
+
+# =========================================================
+# 1. CALCULS P&L
+# =========================================================
+portfolio = charger_portfolio()
+
+# Agrégat tenu à jour à chaque vente : pas de relecture de tout l'historique
+total_realise = pnl_realise()
+
+# Clé de cache triée : même entrée quel que soit l'ordre du portefeuille
+tickers_positions = tuple(sorted(portfolio))
+cotations = get_cotations(tickers_positions) if portfolio else {}
+
+total_latent = 0
+if portfolio:
+    for ticker, data in portfolio.items():
+        current_price = cotations.get(ticker) or float(data['entry_price'])
+        total_latent += (current_price - float(data['entry_price']))
+
+total_pnl = total_realise + total_latent
+
+# =========================================================
+# 2. COURBE GLOBALE (EQUITY)
+# =========================================================
+st.markdown("### 🏆 Performance Globale")
+col1, col2, col3 = st.columns(3)
+col1.metric("💰 Gains Réalisés", f"{total_realise:.2f} $")
+col2.metric("⏳ Gains Latents", f"{total_latent:.2f} $")
+col3.metric("🚀 RÉSULTAT NET", f"{total_pnl:.2f} $")
+
+# Fenêtre affichée : au-delà de POINTS_MAX_COURBE points, la courbe est réduite (LTTB)
+# en gardant sa forme ; une fenêtre courte reste donc en pleine résolution.
+PERIODES_COURBE = {"24h": timedelta(days=1), "7j": timedelta(days=7), "30j": timedelta(days=30),
+                   "90j": timedelta(days=90), "Tout": None}
+POINTS_MAX_COURBE = 1500
+
+@st.cache_resource
+def get_lecteur_equity():
+    """Un seul lecteur pour toutes les sessions : il ne lit que les nouveaux points"""
+    return LecteurEquity()
+
+try:
+    df_equity = get_lecteur_equity().lire()
+    if not df_equity.empty:
+        choix = st.radio("Période", list(PERIODES_COURBE), index=len(PERIODES_COURBE) - 1,
+                         horizontal=True, label_visibility="collapsed")
+        if PERIODES_COURBE[choix] is not None:
+            df_equity = df_equity[df_equity['Date'] >= df_equity['Date'].iloc[-1] - PERIODES_COURBE[choix]]
+        df_affiche = reduire(df_equity, POINTS_MAX_COURBE)
+
+        fig_eq = go.Figure()
+        fig_eq.add_trace(go.Scatter(
+            x=df_affiche['Date'], y=df_affiche['Total_PNL'],
+            fill='tozeroy', mode='lines+markers' if len(df_affiche) <= 200 else 'lines', marker=dict(size=6),
+            line=dict(color='#00CC96', width=3), name='Capital'
+        ))
+        fig_eq.update_layout(
+            height=350, margin=dict(l=20, r=20, t=20, b=30),
+            yaxis=dict(tickprefix="$", showgrid=True, automargin=True, showticklabels=True),
+            xaxis=dict(showgrid=False)
+        )
+        st.plotly_chart(fig_eq, use_container_width=True)
+        if len(df_affiche) < len(df_equity):
+            st.caption(f"{len(df_affiche)} points affichés sur {len(df_equity)} (réduisez la période pour la pleine résolution)")
+    else:
+        st.info("La courbe se construit...")
+except:
+    st.warning("Courbe de performance indisponible.")
+
+st.divider()
+
+# =========================================================
+# 3. POSITIONS ACTIVES (VERSION BLINDÉE 🛡️)
+# =========================================================
+st.markdown("### 🔭 Surveillance des Positions")
+
+if not portfolio:
+    st.info("Aucune position en cours.")
+else:
+    # Récupération Données : bougies de toutes les positions en une fois (mémorisées)
+    bougies = get_historical_data(tickers_positions)
+    positions = list(portfolio.items())
+
+    # Les graphiques sont construits en parallèle, puis affichés dans l'ordre
+    with ThreadPoolExecutor(max_workers=min(8, len(positions))) as pool:
+        cartes = list(pool.map(
+            lambda p: construire_carte(p[0], p[1], bougies.get(p[0], pd.DataFrame()), cotations.get(p[0])),
+            positions))
+
+    cols = st.columns(2)
+    for i, (titre, fig) in enumerate(cartes):
+        col = cols[i % 2]
+        with col:
+            with st.container(border=True):
+                st.markdown(titre, unsafe_allow_html=True)
+                st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import threading
+import pandas as pd
+
+# ==============================================================================
+# CACHE DISQUE OHLCV (Un seul point d'entrée pour toutes les bougies Yahoo)
+# ==============================================================================
+# Les bougies sont stockées par (ticker, intervalle) dans DOSSIER_CACHE.
+# À chaque appel :
+#   1. Cache frais (moins vieux que le TTL de l'intervalle) -> lecture disque seule
+#   2. Cache périmé -> on ne télécharge que la QUEUE manquante
+#   3. Pas de cache (ou période demandée plus longue) -> téléchargement complet
+
+DOSSIER_CACHE = "cache_marche"
+
+# Fraîcheur en secondes, par intervalle de bougie
+TTL_INTERVALLES = {
+    "1m": 30,
+    "5m": 120,
+    "15m": 300,
+    "30m": 600,
+    "60m": 900,
+    "1h": 900,
+    "1d": 3600,
+    "1wk": 6 * 3600,
+    "1mo": 24 * 3600,
+}
+TTL_DEFAUT = 900
+
+# Stockage en colonnes (Parquet) si pyarrow est installé, sinon pickle
+try:
+    import pyarrow  # noqa: F401
+    FORMAT_STOCKAGE = "parquet"
+except ImportError:
+    FORMAT_STOCKAGE = "pkl"
+
+_VERROU_GLOBAL = threading.Lock()
+_VERROUS = {}
+
+# --- OUTILS ---
+def aplatir_colonnes(df):
+    """Correction Bug Yahoo (Multi-index) : une seule fois, ici"""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    return df
+
+def _verrou(cle):
+    with _VERROU_GLOBAL:
+        if cle not in _VERROUS: _VERROUS[cle] = threading.Lock()
+        return _VERROUS[cle]
+
+def _chemins(ticker, interval):
+    nom = f"{ticker.replace('/', '_').replace('^', '_')}_{interval}"
+    base = os.path.join(DOSSIER_CACHE, nom)
+    return f"{base}.{FORMAT_STOCKAGE}", f"{base}.json"
+
+def debut_periode(period, tz=None, maintenant=None):
+    """Date de début équivalente à un 'period' Yahoo (10d, 2y, 1mo...), comptée depuis maintenant (ou l'heure donnée)"""
+    if period == "max": return None
+    n = int("".join(c for c in period if c.isdigit()) or 1)
+    unite = "".join(c for c in period if c.isalpha())
+
+    if unite == "d": decalage = pd.offsets.BDay(n)  # Yahoo compte en jours de bourse
+    elif unite == "wk": decalage = pd.DateOffset(weeks=n)
+    elif unite == "mo": decalage = pd.DateOffset(months=n)
+    elif unite == "y": decalage = pd.DateOffset(years=n)
+    else: raise ValueError(f"Période inconnue : {period}")
+
+    if maintenant is None: maintenant = pd.Timestamp.now(tz=tz)
+    return (maintenant - decalage).normalize()
+
+def _lire_cache(chemin_data, chemin_meta):
+    if not (os.path.exists(chemin_data) and os.path.exists(chemin_meta)): return None, None
+    try:
+        with open(chemin_meta, "r") as f: meta = json.load(f)
+        if FORMAT_STOCKAGE == "parquet": df = pd.read_parquet(chemin_data)
+        else: df = pd.read_pickle(chemin_data)
+        return df, meta
+    except Exception:
+        return None, None
+
+def _ecrire_cache(chemin_data, chemin_meta, df, meta):
+    """Écriture atomique (fichier temporaire + rename) pour ne jamais laisser un cache à moitié écrit"""
+    os.makedirs(DOSSIER_CACHE, exist_ok=True)
+    # Un nom par écrivain : bots, dashboard et threads Yahoo peuvent écrire le même (ticker, intervalle)
+    suffixe = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp = chemin_data + suffixe
+    if FORMAT_STOCKAGE == "parquet": df.to_parquet(tmp)
+    else: df.to_pickle(tmp)
+    os.replace(tmp, chemin_data)
+
+    with open(chemin_meta + suffixe, "w") as f: json.dump(meta, f)
+    os.replace(chemin_meta + suffixe, chemin_meta)
+
+def _yahoo(ticker, interval, **kwargs):
+    import yfinance as yf # Importé seulement si le cache ne suffit pas (démarrage rapide)
+    df = yf.download(ticker, interval=interval, progress=False, threads=False, **kwargs)
+    if df is None: return pd.DataFrame()
+    return aplatir_colonnes(df)
+
+def _decouper(df, debut):
+    if debut is None: return df.copy()
+    if df.index.tz is not None and debut.tz is None: debut = debut.tz_localize(df.index.tz)
+    elif df.index.tz is None and debut.tz is not None: debut = debut.tz_localize(None)
+    return df[df.index >= debut].copy()
+
+def _couvre(meta, debut):
+    """Le cache remonte-t-il assez loin pour la période demandée ?"""
+    couvre = meta.get("couvre_depuis")
+    return couvre == "max" or (debut is not None and couvre is not None and pd.Timestamp(couvre) <= debut)
+
+def _lire_si_frais(ticker, period, interval):
+    """Bougies en cache si elles sont fraîches et couvrent la période, sinon None (jamais de réseau)"""
+    chemin_data, chemin_meta = _chemins(ticker, interval)
+    with _verrou(chemin_data):
+        df, meta = _lire_cache(chemin_data, chemin_meta)
+        if df is None or df.empty: return None
+        debut = debut_periode(period, df.index.tz)
+        if _couvre(meta, debut) and time.time() - meta.get("maj", 0) < TTL_INTERVALLES.get(interval, TTL_DEFAUT):
+            return _decouper(df, debut)
+    return None
+
+def _fusionner_cache(ticker, interval, period, nouveau):
+    """Ajoute des bougies téléchargées au cache existant (sans perdre un historique plus long)"""
+    chemin_data, chemin_meta = _chemins(ticker, interval)
+    debut = debut_periode(period, nouveau.index.tz)
+    couvre_depuis = "max" if debut is None else debut.isoformat()
+    with _verrou(chemin_data):
+        df, meta = _lire_cache(chemin_data, chemin_meta)
+        # Les anciennes bougies ne sont gardées que si elles rejoignent les nouvelles : sinon le
+        # cache aurait un trou tout en annonçant couvrir l'ancienne période (EMA et backtests faussés)
+        if df is not None and not df.empty and df.index[-1] >= nouveau.index[0]:
+            if meta.get("couvre_depuis") == "max" or (couvre_depuis != "max" and pd.Timestamp(meta["couvre_depuis"]) < debut):
+                couvre_depuis = meta["couvre_depuis"]
+            nouveau = pd.concat([df, nouveau[df.columns.intersection(nouveau.columns)]])
+            nouveau = nouveau[~nouveau.index.duplicated(keep="last")].sort_index()
+        _ecrire_cache(chemin_data, chemin_meta, nouveau, {"couvre_depuis": couvre_depuis, "maj": time.time()})
+    return _decouper(nouveau, debut)
+
+# ==============================================================================
+# API PUBLIQUE
+# ==============================================================================
+def telecharger_ohlcv(ticker, period="1y", interval="1d"):
+    """
+    Remplace yf.download(ticker, period=..., interval=...) avec cache disque.
+    Renvoie toujours un DataFrame (vide si Yahoo n'a rien) à colonnes aplaties.
+    """
+    chemin_data, chemin_meta = _chemins(ticker, interval)
+    ttl = TTL_INTERVALLES.get(interval, TTL_DEFAUT)
+
+    with _verrou(chemin_data):
+        df, meta = _lire_cache(chemin_data, chemin_meta)
+        tz = df.index.tz if df is not None and not df.empty else None
+        debut = debut_periode(period, tz)
+
+        if df is not None and not df.empty:
+            if _couvre(meta, debut):
+
+                # 1. CACHE FRAIS : aucune requête réseau
+                if time.time() - meta.get("maj", 0) < ttl:
+                    return _decouper(df, debut)
+
+                # 2. CACHE PÉRIMÉ : on ne récupère que la queue (depuis la dernière bougie)
+                try:
+                    queue = _yahoo(ticker, interval, start=df.index[-1].strftime("%Y-%m-%d"))
+                    if not queue.empty:
+                        df = pd.concat([df, queue[df.columns.intersection(queue.columns)]])
+                        df = df[~df.index.duplicated(keep="last")].sort_index()
+                    meta["maj"] = time.time()
+                    _ecrire_cache(chemin_data, chemin_meta, df, meta)
+                except Exception as e:
+                    # Mode dégradé : mieux vaut des bougies un peu vieilles que rien
+                    print(f"⚠️ Cache {ticker} {interval} non rafraîchi : {e}")
+                return _decouper(df, debut)
+
+        # 3. PAS DE CACHE UTILISABLE : téléchargement complet
+        df = _yahoo(ticker, interval, period=period)
+        if df.empty: return df
+
+        debut = debut_periode(period, df.index.tz)
+        meta = {"couvre_depuis": "max" if debut is None else debut.isoformat(), "maj": time.time()}
+        _ecrire_cache(chemin_data, chemin_meta, df, meta)
+        return _decouper(df, debut)
+
+def vider_cache():
+    """Supprime toutes les bougies stockées"""
+    if not os.path.isdir(DOSSIER_CACHE): return
+    for nom in os.listdir(DOSSIER_CACHE):
+        os.remove(os.path.join(DOSSIER_CACHE, nom))
+
+def telecharger_ohlcv_batch(tickers, period="1y", interval="1d"):
+    """
+    {ticker: DataFrame} comme telecharger_ohlcv, mais tous les tickers dont le cache
+    n'est pas frais sont téléchargés en UNE seule requête Yahoo (au lieu de N).
+    Un ticker absent de la réponse groupée repasse par telecharger_ohlcv (cache périmé, etc.).
+    """
+    tickers = list(dict.fromkeys(tickers))
+    resultats, manquants = {}, []
+    for ticker in tickers:
+        df = _lire_si_frais(ticker, period, interval)
+        if df is not None: resultats[ticker] = df
+        else: manquants.append(ticker)
+
+    brut = None
+    if manquants:
+        try:
+            import yfinance as yf
+            brut = yf.download(manquants, period=period, interval=interval, group_by="ticker",
+                               progress=False, threads=True)
+        except Exception as e:
+            print(f"⚠️ Téléchargement groupé impossible : {e}")
+
+    for ticker in manquants:
+        df = pd.DataFrame()
+        if brut is not None and not brut.empty:
+            if isinstance(brut.columns, pd.MultiIndex):
+                if ticker in brut.columns.get_level_values(0): df = brut[ticker].copy()
+            elif len(manquants) == 1:
+                df = brut.copy()
+            # Les dates sont communes à tous les tickers : on retire les lignes vides du ticker
+            df = df.dropna(how="all")
+        try:
+            resultats[ticker] = _fusionner_cache(ticker, interval, period, df) if not df.empty else telecharger_ohlcv(ticker, period, interval)
+        except Exception as e:
+            print(f"❌ Erreur données {ticker}: {e}")
+            resultats[ticker] = pd.DataFrame()
+    return resultats
@@ -1,319 +1,280 @@
-import sys
-sys.stdout.reconfigure(encoding='utf-8')
-import time
-from datetime import datetime
-import yfinance as yf
-import os       
-import csv
-import json 
-# Imports des modules existants
-from ai_agent import agent_eclaireur, agent_analyste, agent_detecteur_organique, agent_chasseur_diversification
-from finance_agents import agent_financier_yahoo_pro, analyse_moyen_terme
-from telegram_bot import envoyer_alerte_telegram, lire_ordres_telegram
-from portfolio_manager import charger_portfolio, sauvegarder_trade, supprimer_trade, archiver_trade_termine, generer_rapport_performance
-from ml_manager import enregistrer_features, update_resultat_ia, predire_succes
-
-# === CONFIGURATION DU ROBOT ===
-MAX_POSITIONS = 5          # Limite de sécurité : pas plus de 5 actions en même temps
-TICKERS_DEJA_SIGNALES = [] # Mémoire tampon pour la session
-INTERVALLE_SCAN = 1800     # Scan toutes les 30 minutes
-
-# ------------------------------------------------------
-# FONCTION 1 : LE GARDIEN (Vérifie SL et TP)
-# ------------------------------------------------------
-def surveiller_positions():
-    portfolio = charger_portfolio()
-    if not portfolio: return
-
-    print(".", end="", flush=True)
-
-    for ticker, data in list(portfolio.items()):
-        try:
-            # Vérification rapide du prix
-            ticker_obj = yf.Ticker(ticker)
-            hist = ticker_obj.history(period="1d", interval="15m")
-            if hist.empty: continue
-            current_price = hist['Close'].iloc[-1]
-            
-            # --- SCÉNARIO 1 : TAKE PROFIT (GAIN) ---
-            if current_price >= data['take_profit']:
-                profit = ((current_price - data['entry_price']) / data['entry_price']) * 100
-                
-                # 1. Enregistrement ML (Victoire = 1)
-                update_resultat_ia(ticker, 1)
-                
-                # 2. Archivage
-                archiver_trade_termine(ticker, data, current_price, "TAKE PROFIT")
-                
-                # 3. Notification
-                envoyer_alerte_telegram(
-                    f"💰 <b>AUTO-VENTE : {ticker}</b>\n"
-                    f"💵 Prix : {current_price:.2f}$\n"
-                    f"📈 Gain : +{profit:.2f}%\n"
-                    f"✅ Objectif atteint."
-                )
-                supprimer_trade(ticker)
-
-            # --- SCÉNARIO 2 : STOP LOSS (PROTECTION) ---
-            elif current_price <= data['stop_loss']:
-                perte = ((current_price - data['entry_price']) / data['entry_price']) * 100
-                
-                # 1. Enregistrement ML (Défaite = 0)
-                update_resultat_ia(ticker, 0)
-                
-                # 2. Archivage
-                archiver_trade_termine(ticker, data, current_price, "STOP LOSS")
-                
-                # 3. Notification
-                envoyer_alerte_telegram(
-                    f"🛡️ <b>AUTO-VENTE : {ticker}</b>\n"
-                    f"🩸 Prix : {current_price:.2f}$\n"
-                    f"📉 Perte : {perte:.2f}%\n"
-                    f"❌ Stop Loss touché."
-                )
-                supprimer_trade(ticker)
-                
-        except Exception: pass
-
-# ------------------------------------------------------
-# FONCTION 2 : LE CHASSEUR AUTOMATIQUE
-# ------------------------------------------------------
-def execution_automatique():
-    global TICKERS_DEJA_SIGNALES
-    
-    # 1. VÉRIFICATION ET CHOIX DU MODE
-    portfolio = charger_portfolio()
-    nb_positions = len(portfolio)
-    
-    # --- AIGUILLAGE ---
-    if nb_positions >= MAX_POSITIONS:
-        MODE_OBSERVATEUR = True
-        print(f"\n🚫 Portefeuille plein ({nb_positions}/{MAX_POSITIONS}). Passage en MODE OBSERVATION 🔭.")
-        # On lance le nouveau chasseur (Diversification)
-        cibles = agent_chasseur_diversification()
-    else:
-        MODE_OBSERVATEUR = False
-        print(f"\n🚀 Portefeuille ouvert ({nb_positions}/{MAX_POSITIONS}). Passage en MODE CHASSEUR 🔫.")
-        # On lance le chasseur classique (Ta logique d'origine)
-        cibles = agent_eclaireur()
-
-    if not cibles: return
-
-    for ticker in cibles:
-        # 2. VÉRIFICATION DE SÉCURITÉ (Uniquement en mode Chasseur)
-        # Si on est là pour acheter, on doit vérifier qu'on n'a pas rempli le bag entre temps
-        if not MODE_OBSERVATEUR:
-            portfolio_a_jour = charger_portfolio()
-            if len(portfolio_a_jour) >= MAX_POSITIONS:
-                print(f"   ⛔ Limite atteinte ({len(portfolio_a_jour)}/{MAX_POSITIONS}). Stop Achats.")
-                break # <--- TA SÉCURITÉ ABSOLUE EST ICI (Conservée)
-        
-        # 3. VÉRIFICATION DES DOUBLONS (Conservée et valable pour les 2 modes)
-        # (On utilise portfolio_a_jour si dispo, sinon portfolio, pour être sûr)
-        current_pf = portfolio_a_jour if not MODE_OBSERVATEUR else portfolio
-        if ticker in TICKERS_DEJA_SIGNALES or ticker in current_pf: 
-            continue
-        
-        print(f"\n⚡ Analyse ({'OBS' if MODE_OBSERVATEUR else 'AUTO'}) : {ticker}")
-        
-        # A. GROK (Conservé)
-        analyse = agent_analyste(ticker)
-        if not analyse or abs(analyse['sentiment_score']) < 0.1: continue
-        
-        # B. VERIF ORGANIQUE (Conservée mais assouplie en mode Observation pour voir les grosses caps)
-        if not MODE_OBSERVATEUR:
-            verif = agent_detecteur_organique(ticker, analyse['sujet_principal'])
-            if not verif or verif['authenticite_score'] < 0.45: continue
-        
-        # C. YAHOO (Conservé)
-        tech = agent_financier_yahoo_pro(ticker)
-        if not tech or not tech['success']: continue
-
-        # D. IA FEATURES (Conservé)
-        features_ia = {
-            "sentiment": analyse['sentiment_score'],
-            "auth_score": 0.8 if MODE_OBSERVATEUR else verif['authenticite_score'], # Valeur par défaut en Obs
-            "rsi": tech['rsi'],
-            "score_tech": tech['score'],
-            "volatilite": (tech['take_profit'] - tech['prix']) / tech['prix']
-        }
-        
-        proba_succes = predire_succes(features_ia)
-        
-        # --- DÉCISION FINALE ---
-        if "ACHAT" in tech['signal']:
-            
-            # CAS 1 : MODE OBSERVATEUR (On est plein, on regarde juste)
-            if MODE_OBSERVATEUR:
-                msg = (
-                    f"👀 <b>IDÉE DIVERSIFICATION : {ticker}</b>\n"
-                    f"🏢 Secteur : Hors-Tech\n"
-                    f"💵 Prix : {tech['prix']:.2f}$\n"
-                    f"🗣️ <b>Grok Score : {analyse['sentiment_score']:.2f}</b>\n"
-                    f"📊 Signal : {tech['signal']}\n"
-                    f"💡 <i>Le portefeuille est plein, mais surveille ça !</i>"
-                )
-                envoyer_alerte_telegram(msg)
-                print(f"      👀 Idée envoyée sur Telegram.")
-                TICKERS_DEJA_SIGNALES.append(ticker)
-            
-            # CAS 2 : MODE CHASSEUR (On achète) -> TON CODE EXACT EST ICI
-            else:
-                # FILTRE IA (Ta logique d'origine)
-                if proba_succes is not None and proba_succes < 0.30:
-                    print(f"      ⛔ Veto IA (Confiance {proba_succes*100:.0f}% trop faible).")
-                    continue 
-                
-                # EXÉCUTION (Ta logique d'origine)
-                print(f"      ✅ ACHAT AUTOMATIQUE DÉCLENCHÉ !")
-                
-                data_trade = {
-                    "entry_price": tech['prix'],
-                    "stop_loss": tech['stop_loss'],
-                    "take_profit": tech['take_profit'],
-                    "date_entry": datetime.now().strftime("%Y-%m-%d %H:%M")
-                }
-                sauvegarder_trade(ticker, data_trade)
-                enregistrer_features(ticker, features_ia)
-                
-                conf_str = f"{proba_succes*100:.0f}%" if proba_succes is not None else "N/A"
-                msg = (f"🤖 <b>ACHAT AUTO : {ticker}</b>\n"
-                       f"💵 Prix : {tech['prix']:.2f}$\n"
-                       f"🗣️ <b>Grok Score : {analyse['sentiment_score']:.2f}</b>\n"
-                       f"🧠 Confiance IA : {conf_str}")
-                envoyer_alerte_telegram(msg)
-                
-                TICKERS_DEJA_SIGNALES.append(ticker)
-
-
-def update_equity_curve():
-    """
-    Calcule le P&L Total (Argent gagné + Argent latent) et l'enregistre pour le graphique.
-    """
-    try:
-        # 1. Calcul des gains RÉALISÉS (Historique)
-        try:
-            with open('trades_history.json', 'r') as f:
-                history = json.load(f)
-        except:
-            history = []
-            
-        total_realise = 0
-        if history:
-            for t in history:
-                # On gère les différents formats possibles de ton historique
-                gain = t.get('profit_loss_amount', 0)
-                if gain == 0 and 'exit_price' in t:
-                    gain = t['exit_price'] - t['entry_price']
-                total_realise += gain
-
-        # 2. Calcul des gains LATENTS (Positions en cours)
-        try:
-            with open('portfolio.json', 'r') as f:
-                portfolio = json.load(f)
-        except:
-            portfolio = {}
-            
-        total_latent = 0
-        if portfolio:
-            tickers = list(portfolio.keys())
-            if tickers:
-                try:
-                    # Téléchargement rapide des prix
-                    data = yf.download(tickers, period="1d", progress=False)['Close'].iloc[-1]
-                    
-                    # Petit hack car yfinance réagit différemment avec 1 seul ticker
-                    if len(tickers) == 1:
-                        current_prices = {tickers[0]: float(data)}
-                    else:
-                        current_prices = data.to_dict()
-
-                    for ticker, info in portfolio.items():
-                        # On compare le prix actuel au prix d'entrée
-                        prix_actuel = current_prices.get(ticker, info['entry_price'])
-                        total_latent += (prix_actuel - info['entry_price'])
-                except Exception as e:
-                    print(f"⚠️ Erreur prix latent : {e}")
-
-        # 3. Total Global
-        total_equity = total_realise + total_latent
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        # 4. Enregistrement dans le CSV
-        file_exists = os.path.isfile('equity_log.csv')
-        
-        with open('equity_log.csv', 'a', newline='') as f:
-            writer = csv.writer(f)
-            # Si le fichier est nouveau, on écrit les titres des colonnes
-            if not file_exists:
-                writer.writerow(['Date', 'Total_PNL', 'Realise', 'Latent']) 
-            
-            # On écrit les données
-            writer.writerow([timestamp, total_equity, total_realise, total_latent])
-            
-    except Exception as e:
-        print(f"❌ Erreur Log Equity: {e}")
-
-
-# ------------------------------------------------------
-# FONCTION 3 : GESTION COMMANDES (STATS)
-# ------------------------------------------------------
-def ecouter_commandes():
-    """Permet juste de demander 'STATS' sur Telegram"""
-    msgs = lire_ordres_telegram()
-    for msg in msgs:
-        if msg in ["STATS", "BILAN"]:
-            envoyer_alerte_telegram(generer_rapport_performance())
-
-# ------------------------------------------------------
-# BOUCLE PRINCIPALE
-# ------------------------------------------------------
-if __name__ == "__main__":
-    print("🤖 BOT FULL-AUTO ACTIVÉ 🚀")
-    envoyer_alerte_telegram("🤖 <b>Mode 100% Autonome Activé.</b> Je gère tout.")
-    
-    # --- 1. INITIALISATION IMMÉDIATE DU GRAPHIQUE ---
-    # On force la création du fichier CSV tout de suite pour que le Dashboard marche
-    print("   📈 Initialisation de la courbe de performance...")
-    try:
-        update_equity_curve()
-    except Exception as e:
-        print(f"⚠️ Erreur Init Graphique : {e}")
-    # ------------------------------------------------
-    
-    dernier_scan = 0
-    
-    while True:
-        try:
-            # 1. Gestion des positions (Priorité absolue)
-            # C'est ici que le bot surveille les Stop Loss / Take Profit en temps réel
-            surveiller_positions()
-            
-            # 2. Écoute si tu demandes les stats sur Telegram
-            ecouter_commandes()
-            
-            # 3. Scan & Achat Auto + Mise à jour Graphique
-            now = time.time()
-            
-            # Si le délai d'attente est écoulé (ex: 15 min), on lance le scan
-            if now - dernier_scan > INTERVALLE_SCAN:
-                
-                # A. On met à jour la courbe de performance (Equity Curve)
-                print("   📈 Enregistrement de la performance...")
-                update_equity_curve()
-                
-                # B. On lance le chasseur (Grok + Yahoo)
-                execution_automatique()
-                
-                # On réinitialise le chronomètre
-                dernier_scan = now
-                print(f"\n💤 Repos ({INTERVALLE_SCAN/60}min)...")
-            
-            time.sleep(10) # Petite pause de 10s pour ne pas surchauffer le processeur
-            
-        except KeyboardInterrupt:
-            print("\n🛑 Arrêt manuel.")
-            break
-        except Exception as e:
-            print(f"\n❌ Erreur dans la boucle principale : {e}")
-            time.sleep(60) # En cas de crash, on attend 1 minute avant de réessayer
\ No newline at end of file
+import sys
+sys.stdout.reconfigure(encoding='utf-8')
+from datetime import datetime
+# Imports des modules existants
+from ai_agent import agent_eclaireur, agent_analyste, agent_analyste_batch, agent_detecteur_organique, agent_chasseur_diversification
+from finance_agents import agent_financier_batch, analyse_moyen_terme
+from telegram_bot import envoyer_alerte_telegram, lire_ordres_telegram
+from portfolio_manager import charger_portfolio, sauvegarder_trade, supprimer_trade, archiver_trade_termine, generer_rapport_performance, pnl_realise
+from ml_manager import enregistrer_features, update_resultat_ia, predire_succes_batch
+from moniteur_positions import surveiller_positions_batch, surveiller_flux, source_cotations_yahoo
+from flux_cotations import creer_flux
+from pipeline_scan import lancer_en_parallele, etape, VERROU_PORTEFEUILLE
+from cascade_filtres import Cascade, Filtre
+from planificateur import Planificateur
+from serie_equity import enregistrer_point
+from metriques import profiler, ecrire_fichier_prometheus, demarrer_serveur_metriques, INTERVALLE_EXPORT
+
+# === CONFIGURATION DU ROBOT ===
+MAX_POSITIONS = 5          # Limite de sécurité : pas plus de 5 actions en même temps
+TICKERS_DEJA_SIGNALES = [] # Mémoire tampon pour la session
+INTERVALLE_SCAN = 1800     # Scan toutes les 30 minutes
+INTERVALLE_SURVEILLANCE = 10 # Vérification SL/TP toutes les 10s (mode interrogation, simulation)
+INTERVALLE_FLUX = 15         # Tranche d'écoute du flux de cotations (relancée aussitôt)
+INTERVALLE_TELEGRAM = 2      # Lecture des commandes Telegram (file locale, instantané)
+INTERVALLE_EQUITY = 1800     # Point de la courbe de performance
+
+# ------------------------------------------------------
+# FONCTION 1 : LE GARDIEN (Vérifie SL et TP)
+# ------------------------------------------------------
+def cloturer_position(ticker, data, current_price, raison):
+    """Sortie d'une position (appelée par le gardien batch pour chaque SL/TP touché)"""
+    variation = ((current_price - data['entry_price']) / data['entry_price']) * 100
+
+    # --- SCÉNARIO 1 : TAKE PROFIT (GAIN) ---
+    if raison == "TAKE PROFIT":
+        # 1. Enregistrement ML (Victoire = 1)
+        update_resultat_ia(ticker, 1)
+        
+        # 2. Archivage
+        archiver_trade_termine(ticker, data, current_price, "TAKE PROFIT")
+        
+        # 3. Notification
+        envoyer_alerte_telegram(
+            f"💰 <b>AUTO-VENTE : {ticker}</b>\n"
+            f"💵 Prix : {current_price:.2f}$\n"
+            f"📈 Gain : +{variation:.2f}%\n"
+            f"✅ Objectif atteint."
+        )
+
+    # --- SCÉNARIO 2 : STOP LOSS (PROTECTION) ---
+    else:
+        # 1. Enregistrement ML (Défaite = 0)
+        update_resultat_ia(ticker, 0)
+        
+        # 2. Archivage
+        archiver_trade_termine(ticker, data, current_price, "STOP LOSS")
+        
+        # 3. Notification
+        envoyer_alerte_telegram(
+            f"🛡️ <b>AUTO-VENTE : {ticker}</b>\n"
+            f"🩸 Prix : {current_price:.2f}$\n"
+            f"📉 Perte : {variation:.2f}%\n"
+            f"❌ Stop Loss touché."
+        )
+    supprimer_trade(ticker)
+
+def surveiller_positions(source=source_cotations_yahoo):
+    # Une seule requête pour tout le portefeuille + vérification SL/TP vectorisée
+    portfolio = charger_portfolio()
+    if not portfolio: return
+
+    print(".", end="", flush=True)
+    surveiller_positions_batch(cloturer_position, source=source, portfolio=portfolio)
+
+# ------------------------------------------------------
+# FONCTION 2 : LE CHASSEUR AUTOMATIQUE
+# ------------------------------------------------------
+def execution_automatique():
+    # 1. VÉRIFICATION ET CHOIX DU MODE
+    portfolio = charger_portfolio()
+    nb_positions = len(portfolio)
+    
+    # --- AIGUILLAGE ---
+    if nb_positions >= MAX_POSITIONS:
+        MODE_OBSERVATEUR = True
+        print(f"\n🚫 Portefeuille plein ({nb_positions}/{MAX_POSITIONS}). Passage en MODE OBSERVATION 🔭.")
+        # On lance le nouveau chasseur (Diversification)
+        cibles = agent_chasseur_diversification()
+    else:
+        MODE_OBSERVATEUR = False
+        print(f"\n🚀 Portefeuille ouvert ({nb_positions}/{MAX_POSITIONS}). Passage en MODE CHASSEUR 🔫.")
+        # On lance le chasseur classique (Ta logique d'origine)
+        cibles = agent_eclaireur()
+
+    if not cibles: return
+
+    # 2. VÉRIFICATION DES DOUBLONS (valable pour les 2 modes)
+    a_analyser = [t for t in cibles if t not in TICKERS_DEJA_SIGNALES and t not in portfolio]
+    if not a_analyser: return
+    print(f"\n⚡ Analyse ({'OBS' if MODE_OBSERVATEUR else 'AUTO'}) : {', '.join(a_analyser)}")
+
+    # 3. CASCADE : les filtres bon marché (technique, en cache) d'abord, Grok pour les survivants
+    cascade = Cascade("full_auto", filtres_scan(MODE_OBSERVATEUR))
+    survivants = cascade.executer(a_analyser)
+    print(cascade.rapport())
+    candidats = [construire_candidat(ticker, contexte, MODE_OBSERVATEUR) for ticker, contexte in survivants.items()]
+    if not candidats: return
+
+    # E. AVIS IA : un seul predict_proba pour tous les survivants du scan
+    probas = predire_succes_batch([c['features_ia'] for c in candidats])
+    for candidat, proba_succes in zip(candidats, probas):
+        prendre_decision(candidat, proba_succes, MODE_OBSERVATEUR)
+
+def analyser_sentiments(tickers, contextes=None):
+    """Sentiment de tous les tickers en UN appel Grok (repli individuel pour les absents du batch)"""
+    analyses = etape("grok", agent_analyste_batch, tickers, False) or {}
+    manquants = [t for t in tickers if not analyses.get(t)]
+    for ticker, analyse in zip(manquants, lancer_en_parallele(manquants, lambda t: etape("grok", agent_analyste, t))):
+        analyses[ticker] = analyse
+    return analyses
+
+def filtres_scan(MODE_OBSERVATEUR):
+    """Filtres du scan, sans ordre imposé : la cascade les trie par coût et taux de rejet observés"""
+    filtres = [
+        # C. YAHOO : une requête groupée, souvent servie par le cache. Sans signal ACHAT, pas de décision possible
+        Filtre("technique", lambda tech, c: tech['success'] and "ACHAT" in tech['signal'],
+               lot=lambda tickers, c: etape("yahoo", agent_financier_batch, tickers), cout=0.05),
+        # A. GROK (Sentiment)
+        Filtre("sentiment", lambda analyse, c: abs(analyse['sentiment_score']) >= 0.1,
+               lot=analyser_sentiments, cout=0.5),
+    ]
+    # B. VERIF ORGANIQUE (Conservée mais assouplie en mode Observation pour voir les grosses caps)
+    if not MODE_OBSERVATEUR:
+        filtres.append(Filtre("authenticite", lambda verif, c: verif['authenticite_score'] >= 0.45,
+                              par_ticker=lambda ticker, c: etape("grok", agent_detecteur_organique, ticker, c['sentiment']['sujet_principal']),
+                              cout=3.0, apres=("sentiment",)))
+    return filtres
+
+def construire_candidat(ticker, contexte, MODE_OBSERVATEUR):
+    """Candidat retenu par la cascade -> {"ticker", "analyse", "tech", "features_ia"}"""
+    analyse, tech = contexte['sentiment'], contexte['technique']
+
+    # D. IA FEATURES (Conservé)
+    features_ia = {
+        "sentiment": analyse['sentiment_score'],
+        "auth_score": 0.8 if MODE_OBSERVATEUR else contexte['authenticite']['authenticite_score'], # Valeur par défaut en Obs
+        "rsi": tech['rsi'],
+        "score_tech": tech['score'],
+        "volatilite": (tech['take_profit'] - tech['prix']) / tech['prix']
+    }
+    
+    return {"ticker": ticker, "analyse": analyse, "tech": tech, "features_ia": features_ia}
+
+def prendre_decision(candidat, proba_succes, MODE_OBSERVATEUR):
+    ticker, analyse, tech, features_ia = candidat['ticker'], candidat['analyse'], candidat['tech'], candidat['features_ia']
+    
+    # --- DÉCISION FINALE ---
+    if "ACHAT" in tech['signal']:
+        
+        # CAS 1 : MODE OBSERVATEUR (On est plein, on regarde juste)
+        if MODE_OBSERVATEUR:
+            with VERROU_PORTEFEUILLE:
+                if ticker in TICKERS_DEJA_SIGNALES: return
+                TICKERS_DEJA_SIGNALES.append(ticker)
+            msg = (
+                f"👀 <b>IDÉE DIVERSIFICATION : {ticker}</b>\n"
+                f"🏢 Secteur : Hors-Tech\n"
+                f"💵 Prix : {tech['prix']:.2f}$\n"
+                f"🗣️ <b>Grok Score : {analyse['sentiment_score']:.2f}</b>\n"
+                f"📊 Signal : {tech['signal']}\n"
+                f"💡 <i>Le portefeuille est plein, mais surveille ça !</i>"
+            )
+            envoyer_alerte_telegram(msg)
+            print(f"      👀 Idée {ticker} envoyée sur Telegram.")
+        
+        # CAS 2 : MODE CHASSEUR (On achète) -> TON CODE EXACT EST ICI
+        else:
+            # FILTRE IA (Ta logique d'origine)
+            if proba_succes is not None and proba_succes < 0.30:
+                print(f"      ⛔ Veto IA sur {ticker} (Confiance {proba_succes*100:.0f}% trop faible).")
+                return
+            
+            # EXÉCUTION SOUS VERROU : le contrôle "plein ?" et l'écriture sont atomiques,
+            # deux candidats ne peuvent donc pas dépasser MAX_POSITIONS ensemble
+            with VERROU_PORTEFEUILLE:
+                portfolio_a_jour = charger_portfolio()
+                if len(portfolio_a_jour) >= MAX_POSITIONS:
+                    print(f"   ⛔ Limite atteinte ({len(portfolio_a_jour)}/{MAX_POSITIONS}). Stop Achats.")
+                    return # <--- TA SÉCURITÉ ABSOLUE EST ICI (Conservée)
+                if ticker in TICKERS_DEJA_SIGNALES or ticker in portfolio_a_jour: return
+
+                print(f"      ✅ ACHAT AUTOMATIQUE DÉCLENCHÉ ({ticker}) !")
+                
+                data_trade = {
+                    "entry_price": tech['prix'],
+                    "stop_loss": tech['stop_loss'],
+                    "take_profit": tech['take_profit'],
+                    "date_entry": datetime.now().strftime("%Y-%m-%d %H:%M")
+                }
+                sauvegarder_trade(ticker, data_trade)
+                enregistrer_features(ticker, features_ia)
+                TICKERS_DEJA_SIGNALES.append(ticker)
+            
+            conf_str = f"{proba_succes*100:.0f}%" if proba_succes is not None else "N/A"
+            msg = (f"🤖 <b>ACHAT AUTO : {ticker}</b>\n"
+                   f"💵 Prix : {tech['prix']:.2f}$\n"
+                   f"🗣️ <b>Grok Score : {analyse['sentiment_score']:.2f}</b>\n"
+                   f"🧠 Confiance IA : {conf_str}")
+            envoyer_alerte_telegram(msg)
+
+
+def update_equity_curve():
+    """
+    Calcule le P&L Total (Argent gagné + Argent latent) et l'enregistre pour le graphique.
+    """
+    try:
+        # 1. Gains RÉALISÉS : agrégat tenu à jour à chaque vente (pas de relecture de l'historique)
+        try:
+            total_realise = pnl_realise()
+        except Exception:
+            total_realise = 0
+
+        # 2. Calcul des gains LATENTS (Positions en cours)
+        portfolio = charger_portfolio()
+            
+        total_latent = 0
+        if portfolio:
+            try:
+                # Prix de toutes les positions en une requête
+                current_prices = source_cotations_yahoo(list(portfolio))
+                for ticker, info in portfolio.items():
+                    # On compare le prix actuel au prix d'entrée
+                    prix_actuel = current_prices.get(ticker, info['entry_price'])
+                    total_latent += (prix_actuel - info['entry_price'])
+            except Exception as e:
+                print(f"⚠️ Erreur prix latent : {e}")
+
+        # 3. Total Global + enregistrement dans la série temporelle (historique.db)
+        total_equity = total_realise + total_latent
+        enregistrer_point(total_equity, total_realise, total_latent)
+            
+    except Exception as e:
+        print(f"❌ Erreur Log Equity: {e}")
+
+
+# ------------------------------------------------------
+# FONCTION 3 : GESTION COMMANDES (STATS)
+# ------------------------------------------------------
+def ecouter_commandes():
+    """Permet juste de demander 'STATS' sur Telegram"""
+    msgs = lire_ordres_telegram()
+    for msg in msgs:
+        if msg in ["STATS", "BILAN"]:
+            envoyer_alerte_telegram(generer_rapport_performance())
+
+# ------------------------------------------------------
+# BOUCLE PRINCIPALE (TÂCHES INDÉPENDANTES)
+# ------------------------------------------------------
+if __name__ == "__main__":
+    print("🤖 BOT FULL-AUTO ACTIVÉ 🚀")
+    envoyer_alerte_telegram("🤖 <b>Mode 100% Autonome Activé.</b> Je gère tout.")
+    demarrer_serveur_metriques() # Seulement si METRIQUES_PORT est défini
+    
+    # Chaque tâche a son propre rythme : un scan long ne bloque plus la surveillance SL/TP.
+    # La courbe de performance est enregistrée dès le démarrage (pour que le Dashboard marche).
+    planificateur = Planificateur()
+    # 1. Gestion des positions (Priorité absolue) : Stop Loss / Take Profit vérifiés à chaque tick
+    #    (FLUX_COTATIONS : "yahoo" = interrogation groupée, ou "tcp://hote:port" = serveur de ticks)
+    flux = creer_flux()
+    planificateur.ajouter("surveillance", lambda: surveiller_flux(flux, cloturer_position, INTERVALLE_FLUX),
+                          INTERVALLE_FLUX, delai_max=INTERVALLE_FLUX + 30)
+    # 2. Écoute si tu demandes les stats sur Telegram
+    planificateur.ajouter("telegram", ecouter_commandes, INTERVALLE_TELEGRAM, delai_max=30)
+    # 3. Scan & Achat Auto (Grok + Yahoo)
+    planificateur.ajouter("scan", profiler("scan", execution_automatique), INTERVALLE_SCAN, delai_max=900)
+    # 4. Courbe de performance (Equity Curve)
+    planificateur.ajouter("equity", update_equity_curve, INTERVALLE_EQUITY, delai_max=120)
+    # 5. Export des métriques (durées / erreurs par étape) pour Prometheus
+    planificateur.ajouter("metriques", ecrire_fichier_prometheus, INTERVALLE_EXPORT, delai_max=10)
+    planificateur.lancer()
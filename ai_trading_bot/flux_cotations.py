@@ -0,0 +1,258 @@
+import os
+import json
+import time
+import queue
+import socket
+import asyncio
+import argparse
+import threading
+from collections import namedtuple
+
+# ==============================================================================
+# FLUX DE COTATIONS (ABONNEMENT, TICK PAR TICK)
+# ==============================================================================
+# Le gardien ne demande plus les prix toutes les 10 s : il s'abonne aux tickers du
+# portefeuille et reçoit un tick (ticker, prix, horodatage) à chaque CHANGEMENT de prix.
+#   - FluxYahoo : adaptateur par interrogation (1 requête groupée par intervalle),
+#                 seuls les prix qui ont bougé sont transmis ;
+#   - FluxTCP   : client d'un serveur de ticks (une ligne JSON par tick), réactif à la ms ;
+#   - ServeurTicks : serveur de ticks local (asyncio) pour les tests et les replays.
+# Protocole TCP (lignes JSON) :
+#   client -> serveur : {"abonner": ["AAPL", "MSFT"]}   (remplace l'abonnement précédent)
+#   serveur -> client : {"ticker": "AAPL", "prix": 187.2, "ts": 1718000000.123}
+FLUX_COTATIONS = os.getenv("FLUX_COTATIONS", "yahoo")  # "yahoo" ou "tcp://hote:port"
+INTERVALLE_YAHOO = 10   # secondes entre deux interrogations Yahoo
+DELAI_RECONNEXION = 2   # secondes avant de se reconnecter au serveur de ticks
+
+Tick = namedtuple("Tick", "ticker prix horodatage")
+
+class FluxCotations:
+    """Base des flux : abonnement, file de ticks, filtrage des prix inchangés"""
+    def __init__(self):
+        self._ticks = queue.Queue()
+        self._verrou = threading.Lock()
+        self._tickers = frozenset()
+        self._derniers = {}   # ticker -> dernier prix transmis
+        self._arret = threading.Event()
+        self._thread = None
+
+    def abonner(self, tickers):
+        """Remplace la liste des tickers suivis"""
+        tickers = frozenset(tickers)
+        with self._verrou:
+            if tickers == self._tickers: return False
+            self._tickers = tickers
+            # Un ticker qui revient doit re-émettre son prix, même inchangé
+            self._derniers = {t: p for t, p in self._derniers.items() if t in tickers}
+        self._abonnement_change(tickers)
+        return True
+
+    @property
+    def tickers(self):
+        return self._tickers
+
+    def publier(self, ticker, prix, horodatage=None):
+        """Ajoute un tick s'il concerne un ticker suivi ET que son prix a changé"""
+        with self._verrou:
+            if ticker not in self._tickers or self._derniers.get(ticker) == prix: return False
+            self._derniers[ticker] = prix
+        self._ticks.put(Tick(ticker, float(prix), horodatage or time.time()))
+        return True
+
+    def prochain_tick(self, timeout=None):
+        """Tick suivant, ou None si rien n'arrive pendant timeout secondes"""
+        try: return self._ticks.get(timeout=timeout)
+        except queue.Empty: return None
+
+    def demarrer(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._arret.clear()
+            self._thread = threading.Thread(target=self._boucle, name=type(self).__name__, daemon=True)
+            self._thread.start()
+        return self
+
+    def arreter(self):
+        self._arret.set()
+
+    # À définir par les adaptateurs
+    def _boucle(self): raise NotImplementedError
+    def _abonnement_change(self, tickers): pass
+
+class FluxYahoo(FluxCotations):
+    """Interrogation périodique d'une source {ticker: prix} (Yahoo par défaut)"""
+    def __init__(self, source=None, intervalle=INTERVALLE_YAHOO):
+        super().__init__()
+        if source is None:
+            from moniteur_positions import source_cotations_yahoo as source
+        self.source = source
+        self.intervalle = intervalle
+
+    def _boucle(self):
+        while not self._arret.is_set():
+            debut = time.monotonic()
+            tickers = self._tickers
+            if tickers:
+                try:
+                    for ticker, prix in self.source(list(tickers)).items(): self.publier(ticker, prix)
+                except Exception as e:
+                    print(f"\n⚠️ Erreur cotations : {e}")
+            self._arret.wait(max(0.0, self.intervalle - (time.monotonic() - debut)))
+
+class FluxTCP(FluxCotations):
+    """Client d'un serveur de ticks (ServeurTicks ou tout serveur parlant le même protocole)"""
+    def __init__(self, hote="127.0.0.1", port=8765):
+        super().__init__()
+        self.adresse = (hote, port)
+        self._socket = None
+        self._verrou_envoi = threading.Lock()
+
+    def _envoyer_abonnement(self, tickers):
+        with self._verrou_envoi:
+            if self._socket is None: return
+            try: self._socket.sendall((json.dumps({"abonner": sorted(tickers)}) + "\n").encode())
+            except OSError: pass # La boucle de lecture verra la coupure et se reconnectera
+
+    def _abonnement_change(self, tickers):
+        self._envoyer_abonnement(tickers)
+
+    def _boucle(self):
+        while not self._arret.is_set():
+            try:
+                with socket.create_connection(self.adresse, timeout=5) as sock:
+                    sock.settimeout(1)
+                    with self._verrou_envoi: self._socket = sock
+                    self._envoyer_abonnement(self._tickers)
+                    tampon = b""
+                    while not self._arret.is_set():
+                        try: morceau = sock.recv(65536)
+                        except socket.timeout: continue
+                        if not morceau: break # Serveur fermé
+                        tampon += morceau
+                        *lignes, tampon = tampon.split(b"\n")
+                        for ligne in lignes:
+                            if not ligne.strip(): continue
+                            tick = json.loads(ligne)
+                            self.publier(tick["ticker"], tick["prix"], tick.get("ts"))
+            except (OSError, ValueError) as e:
+                if not self._arret.is_set(): print(f"\n⚠️ Flux de ticks {self.adresse} : {e}")
+            finally:
+                with self._verrou_envoi: self._socket = None
+            self._arret.wait(DELAI_RECONNEXION)
+
+    def arreter(self):
+        super().arreter()
+        with self._verrou_envoi:
+            if self._socket is not None:
+                try: self._socket.shutdown(socket.SHUT_RDWR)
+                except OSError: pass
+
+def creer_flux(description=None):
+    """FLUX_COTATIONS="yahoo" (défaut) ou "tcp://hote:port" -> flux démarré"""
+    description = description or FLUX_COTATIONS
+    if description.startswith("tcp://"):
+        hote, _, port = description[len("tcp://"):].rpartition(":")
+        return FluxTCP(hote or "127.0.0.1", int(port)).demarrer()
+    return FluxYahoo().demarrer()
+
+# ==============================================================================
+# SERVEUR DE TICKS LOCAL (TESTS / REPLAYS)
+# ==============================================================================
+class ServeurTicks:
+    """
+    serveur = ServeurTicks().demarrer()        # port libre choisi par le système
+    flux = FluxTCP(*serveur.adresse).demarrer()
+    serveur.publier("AAPL", 187.2)            # depuis n'importe quel thread
+    """
+    def __init__(self, hote="127.0.0.1", port=0):
+        self.hote, self.port = hote, port
+        self._clients = {}   # writer -> tickers abonnés
+        self._boucle = None
+        self._serveur = None
+        self._pret = threading.Event()
+
+    @property
+    def adresse(self):
+        return self._serveur.sockets[0].getsockname()[:2]
+
+    async def _client(self, reader, writer):
+        self._clients[writer] = frozenset()
+        try:
+            while ligne := await reader.readline():
+                try: message = json.loads(ligne)
+                except ValueError: continue
+                if "abonner" in message: self._clients[writer] = frozenset(message["abonner"])
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+    async def _diffuser(self, ticker, prix, horodatage):
+        ligne = (json.dumps({"ticker": ticker, "prix": prix, "ts": horodatage}) + "\n").encode()
+        for writer, tickers in list(self._clients.items()):
+            if ticker in tickers:
+                writer.write(ligne)
+                try: await writer.drain()
+                except ConnectionError: self._clients.pop(writer, None)
+
+    def publier(self, ticker, prix, horodatage=None):
+        asyncio.run_coroutine_threadsafe(
+            self._diffuser(ticker, float(prix), horodatage or time.time()), self._boucle).result()
+
+    def nb_abonnes(self, ticker=None):
+        return sum(1 for tickers in list(self._clients.values()) if ticker is None or ticker in tickers)
+
+    def rejouer(self, ticks, vitesse=None):
+        """Publie une suite de (horodatage, ticker, prix) ; vitesse=60 -> 1 minute rejouée par seconde"""
+        precedent = None
+        for horodatage, ticker, prix in ticks:
+            if vitesse and precedent is not None and horodatage > precedent:
+                time.sleep((horodatage - precedent) / vitesse)
+            precedent = horodatage
+            self.publier(ticker, prix)
+
+    def demarrer(self):
+        def executer():
+            self._boucle = asyncio.new_event_loop()
+            self._serveur = self._boucle.run_until_complete(asyncio.start_server(self._client, self.hote, self.port))
+            self._pret.set()
+            self._boucle.run_forever()
+        threading.Thread(target=executer, name="serveur_ticks", daemon=True).start()
+        self._pret.wait()
+        return self
+
+    def arreter(self):
+        async def fermer():
+            self._serveur.close()
+            for writer in list(self._clients): writer.close()
+            await self._serveur.wait_closed()
+        asyncio.run_coroutine_threadsafe(fermer(), self._boucle).result()
+        self._boucle.call_soon_threadsafe(self._boucle.stop)
+
+def ticks_depuis_bougies(frames):
+    """{ticker: DataFrame OHLC} -> ticks (horodatage, ticker, Close) dans l'ordre chronologique"""
+    ticks = []
+    for ticker, df in frames.items():
+        secondes = df.index.map(lambda d: d.timestamp())
+        ticks += zip(secondes, [ticker] * len(df), df["Close"].astype(float))
+    return sorted(ticks, key=lambda t: t[0])
+
+if __name__ == "__main__":
+    # Replay de bougies en cache comme un flux de ticks : FLUX_COTATIONS=tcp://127.0.0.1:8765 côté bot
+    parser = argparse.ArgumentParser(description="Serveur de ticks local (replay de bougies en cache)")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--period", default="5d")
+    parser.add_argument("--interval", default="15m")
+    parser.add_argument("--vitesse", type=float, default=60, help="Secondes de marché rejouées par seconde")
+    args = parser.parse_args()
+
+    from donnees_marche import telecharger_ohlcv
+    frames = {t: telecharger_ohlcv(t, period=args.period, interval=args.interval) for t in args.tickers}
+    serveur = ServeurTicks(port=args.port).demarrer()
+    print(f"📡 Serveur de ticks sur tcp://{serveur.hote}:{serveur.adresse[1]} ({len(args.tickers)} tickers)")
+    try:
+        serveur.rejouer(ticks_depuis_bougies(frames), args.vitesse)
+    except KeyboardInterrupt:
+        pass
+    serveur.arreter()
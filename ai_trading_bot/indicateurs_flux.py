@@ -0,0 +1,216 @@
+import json
+import math
+from collections import deque
+
+# ==============================================================================
+# INDICATEURS EN FLUX (1 bougie à la fois, coût O(1))
+# ==============================================================================
+# Mêmes formules que la version pandas de indicateurs.py / finance_agents.py :
+#   EMA  -> ewm(span=..., adjust=False)
+#   RSI  -> ewm(alpha=1/14, adjust=False) sur gains / pertes (RSI de Wilder)
+#   ATR  -> rolling(14).mean() du True Range (ou de High-Low)
+#   BB   -> rolling(20).mean() / rolling(20).std()
+# Chaque indicateur sait exporter son état (etat) et le recharger (restaurer),
+# pour garder les tickers "chauds" entre deux scans ou deux redémarrages.
+# Les bots n'appellent pas encore ce moteur (le scan recalcule via noyaux_indicateurs) ;
+# l'égalité avec pandas et le gain par bougie sont vérifiés par benchmarks/bench_indicateurs_flux.py.
+
+NAN = float("nan")
+
+class EMA:
+    def __init__(self, span=None, alpha=None):
+        self.alpha = alpha if alpha is not None else 2 / (span + 1)
+        self.valeur = None
+
+    def mettre_a_jour(self, x):
+        if x is None or math.isnan(x): return self.valeur
+        if self.valeur is None: self.valeur = x
+        else: self.valeur = (1 - self.alpha) * self.valeur + self.alpha * x
+        return self.valeur
+
+    def etat(self):
+        return {"alpha": self.alpha, "valeur": self.valeur}
+
+    def restaurer(self, etat):
+        self.alpha, self.valeur = etat["alpha"], etat["valeur"]
+        return self
+
+class MoyenneGlissante:
+    """rolling(n).mean() / .std() : la fenêtre est bornée, donc coût constant"""
+    def __init__(self, n):
+        self.n = n
+        self.fenetre = deque(maxlen=n)
+
+    def mettre_a_jour(self, x):
+        self.fenetre.append(x)
+        return self.moyenne()
+
+    def moyenne(self):
+        if len(self.fenetre) < self.n: return NAN
+        return sum(self.fenetre) / self.n
+
+    def ecart_type(self):
+        if len(self.fenetre) < self.n: return NAN
+        m = sum(self.fenetre) / self.n
+        return math.sqrt(sum((v - m) ** 2 for v in self.fenetre) / (self.n - 1))
+
+    def etat(self):
+        return {"n": self.n, "fenetre": list(self.fenetre)}
+
+    def restaurer(self, etat):
+        self.n = etat["n"]
+        self.fenetre = deque(etat["fenetre"], maxlen=self.n)
+        return self
+
+class RSIWilder:
+    def __init__(self, periode=14):
+        self.gain = EMA(alpha=1 / periode)
+        self.perte = EMA(alpha=1 / periode)
+        self.prev_close = None
+
+    def mettre_a_jour(self, close):
+        # 1ère bougie : delta inconnu -> 0 (comme delta.where(delta > 0, 0) en pandas)
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+        g = self.gain.mettre_a_jour(max(delta, 0.0))
+        p = self.perte.mettre_a_jour(max(-delta, 0.0))
+        return self.valeur(g, p)
+
+    @staticmethod
+    def valeur(g, p):
+        if p == 0: return NAN if g == 0 else 100.0
+        return 100 - (100 / (1 + g / p))
+
+    def etat(self):
+        return {"gain": self.gain.etat(), "perte": self.perte.etat(), "prev_close": self.prev_close}
+
+    def restaurer(self, etat):
+        self.gain.restaurer(etat["gain"])
+        self.perte.restaurer(etat["perte"])
+        self.prev_close = etat["prev_close"]
+        return self
+
+class ATR:
+    """vrai_range=True : True Range (indicateurs.py) / False : High-Low (finance_agents.py)"""
+    def __init__(self, periode=14, vrai_range=True):
+        self.vrai_range = vrai_range
+        self.moyenne = MoyenneGlissante(periode)
+        self.prev_close = None
+
+    def mettre_a_jour(self, high, low, close):
+        tr = high - low
+        if self.vrai_range and self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        return self.moyenne.mettre_a_jour(tr)
+
+    def etat(self):
+        return {"vrai_range": self.vrai_range, "moyenne": self.moyenne.etat(), "prev_close": self.prev_close}
+
+    def restaurer(self, etat):
+        self.vrai_range = etat["vrai_range"]
+        self.moyenne.restaurer(etat["moyenne"])
+        self.prev_close = etat["prev_close"]
+        return self
+
+class MACD:
+    def __init__(self, rapide=12, lente=26, signal=9):
+        self.rapide, self.lente, self.signal = EMA(span=rapide), EMA(span=lente), EMA(span=signal)
+
+    def mettre_a_jour(self, close):
+        macd = self.rapide.mettre_a_jour(close) - self.lente.mettre_a_jour(close)
+        return macd, self.signal.mettre_a_jour(macd)
+
+    def etat(self):
+        return {"rapide": self.rapide.etat(), "lente": self.lente.etat(), "signal": self.signal.etat()}
+
+    def restaurer(self, etat):
+        for nom in ("rapide", "lente", "signal"): getattr(self, nom).restaurer(etat[nom])
+        return self
+
+class Bollinger:
+    def __init__(self, periode=20, nb_ecarts=2):
+        self.nb_ecarts = nb_ecarts
+        self.moyenne = MoyenneGlissante(periode)
+
+    def mettre_a_jour(self, close):
+        sma = self.moyenne.mettre_a_jour(close)
+        std = self.moyenne.ecart_type()
+        return sma, std, sma + std * self.nb_ecarts, sma - std * self.nb_ecarts
+
+    def etat(self):
+        return {"nb_ecarts": self.nb_ecarts, "moyenne": self.moyenne.etat()}
+
+    def restaurer(self, etat):
+        self.nb_ecarts = etat["nb_ecarts"]
+        self.moyenne.restaurer(etat["moyenne"])
+        return self
+
+# ==============================================================================
+# MOTEUR COMPLET PAR TICKER (mêmes colonnes que calculate_advanced_indicators)
+# ==============================================================================
+class MoteurIndicateurs:
+    def __init__(self):
+        self.ema = {span: EMA(span=span) for span in (20, 50, 200)}
+        self.rsi = RSIWilder(14)
+        self.macd = MACD(12, 26, 9)
+        self.bollinger = Bollinger(20, 2)
+        self.atr = ATR(14, vrai_range=True)
+        self.atr_hl = ATR(14, vrai_range=False)
+        self.derniers = {}
+
+    def mettre_a_jour(self, high, low, close):
+        """Ajoute UNE bougie et renvoie toutes les valeurs à jour"""
+        v = {"Close": close}
+        for span, ema in self.ema.items(): v[f"EMA_{span}"] = ema.mettre_a_jour(close)
+        v["RSI"] = self.rsi.mettre_a_jour(close)
+        v["MACD"], v["MACD_signal"] = self.macd.mettre_a_jour(close)
+        v["SMA_20"], v["STD_20"], v["BB_Upper"], v["BB_Lower"] = self.bollinger.mettre_a_jour(close)
+        v["ATR"] = self.atr.mettre_a_jour(high, low, close)
+        v["ATR_HL"] = self.atr_hl.mettre_a_jour(high, low, close)
+        self.derniers = v
+        return v
+
+    def rechauffer(self, df):
+        """Rejoue un historique (DataFrame OHLC) pour amorcer les indicateurs"""
+        for high, low, close in zip(df['High'], df['Low'], df['Close']):
+            self.mettre_a_jour(float(high), float(low), float(close))
+        return self.derniers
+
+    def etat(self):
+        return {
+            "ema": {str(k): e.etat() for k, e in self.ema.items()},
+            "rsi": self.rsi.etat(), "macd": self.macd.etat(), "bollinger": self.bollinger.etat(),
+            "atr": self.atr.etat(), "atr_hl": self.atr_hl.etat(), "derniers": self.derniers,
+        }
+
+    def restaurer(self, etat):
+        for k, e in etat["ema"].items(): self.ema[int(k)].restaurer(e)
+        self.rsi.restaurer(etat["rsi"])
+        self.macd.restaurer(etat["macd"])
+        self.bollinger.restaurer(etat["bollinger"])
+        self.atr.restaurer(etat["atr"])
+        self.atr_hl.restaurer(etat["atr_hl"])
+        self.derniers = etat.get("derniers", {})
+        return self
+
+# ==============================================================================
+# SUIVI DES TICKERS "CHAUDS" (Boucle live)
+# ==============================================================================
+FICHIER_ETATS = "indicateurs_etats.json"
+MOTEURS = {}
+
+def mettre_a_jour_ticker(ticker, high, low, close):
+    if ticker not in MOTEURS: MOTEURS[ticker] = MoteurIndicateurs()
+    return MOTEURS[ticker].mettre_a_jour(high, low, close)
+
+def sauvegarder_etats(fichier=FICHIER_ETATS):
+    with open(fichier, "w") as f:
+        json.dump({t: m.etat() for t, m in MOTEURS.items()}, f)
+
+def charger_etats(fichier=FICHIER_ETATS):
+    try:
+        with open(fichier, "r") as f: etats = json.load(f)
+    except (OSError, ValueError): return
+    for ticker, etat in etats.items():
+        MOTEURS[ticker] = MoteurIndicateurs().restaurer(etat)
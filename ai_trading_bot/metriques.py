@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import time
+import bisect
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# ==============================================================================
+# MÉTRIQUES : DURÉE, DÉBIT ET ERREURS PAR ÉTAPE (ET PAR TICKER)
+# ==============================================================================
+# Chaque étape instrumentée (agents Grok / Yahoo, prédiction IA, Telegram, fichiers
+# du portefeuille) enregistre sa durée dans un histogramme, son nombre d'appels et
+# ses erreurs. Export au format texte Prometheus :
+#   - fichier metriques.prom (collecteur "textfile" de node_exporter), réécrit par les bots
+#   - endpoint HTTP /metrics si METRIQUES_PORT est défini
+# Mode --profile : chaque scan affiche (et sauvegarde dans profils/) où son temps est passé.
+
+FICHIER_METRIQUES = os.getenv("METRIQUES_FICHIER", "metriques.prom")
+PORT_METRIQUES = int(os.getenv("METRIQUES_PORT", "0"))  # 0 = pas de serveur HTTP
+INTERVALLE_EXPORT = 15  # secondes entre deux réécritures du fichier
+DOSSIER_PROFILS = "profils"
+MODE_PROFIL = "--profile" in sys.argv
+
+# Bornes des seaux de l'histogramme (secondes)
+SEAUX = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_VERROU = threading.Lock()
+_ETAPES = {}    # etape -> {"nb", "erreurs", "somme", "seaux"}
+_TICKERS = {}   # (etape, ticker) -> {"nb", "erreurs", "somme"}
+_PROFILS = []   # Profils en cours (listes d'événements)
+_DEBUT = time.time()
+
+def enregistrer(etape, duree, ticker=None, erreur=False):
+    """Ajoute une mesure (appelé par mesurer / instrumenter, ou directement)"""
+    with _VERROU:
+        m = _ETAPES.get(etape)
+        if m is None:
+            m = _ETAPES[etape] = {"nb": 0, "erreurs": 0, "somme": 0.0, "seaux": [0] * (len(SEAUX) + 1)}
+        m["nb"] += 1
+        m["erreurs"] += bool(erreur)
+        m["somme"] += duree
+        m["seaux"][bisect.bisect_left(SEAUX, duree)] += 1
+        if ticker:
+            t = _TICKERS.setdefault((etape, ticker), {"nb": 0, "erreurs": 0, "somme": 0.0})
+            t["nb"] += 1
+            t["erreurs"] += bool(erreur)
+            t["somme"] += duree
+        for profil in _PROFILS:
+            profil.append((etape, ticker, duree, bool(erreur)))
+
+@contextmanager
+def mesurer(etape, ticker=None):
+    """with mesurer("portfolio_ecriture"): ...  (une exception compte comme une erreur)"""
+    debut = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        enregistrer(etape, time.perf_counter() - debut, ticker, erreur=True)
+        raise
+    enregistrer(etape, time.perf_counter() - debut, ticker)
+
+def instrumenter(etape=None, est_echec=None):
+    """
+    Décorateur : mesure chaque appel de la fonction.
+    Le ticker est le 1er argument s'il s'agit d'un texte. est_echec(resultat) permet de
+    compter comme erreur un résultat "raté" (les agents renvoient None au lieu de lever).
+    """
+    def decorateur(fonction):
+        nom = etape or fonction.__name__
+        @wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            ticker = args[0] if args and isinstance(args[0], str) else None
+            debut = time.perf_counter()
+            try:
+                resultat = fonction(*args, **kwargs)
+            except BaseException:
+                enregistrer(nom, time.perf_counter() - debut, ticker, erreur=True)
+                raise
+            enregistrer(nom, time.perf_counter() - debut, ticker, erreur=bool(est_echec and est_echec(resultat)))
+            return resultat
+        return enveloppe
+    return decorateur
+
+def echec_si_vide(resultat):
+    return not resultat
+
+# --- LECTURE / EXPORT ---
+def instantane():
+    """Copie des compteurs {etape: {...}} (+ débit en appels/s depuis le démarrage)"""
+    with _VERROU:
+        duree = max(time.time() - _DEBUT, 1e-9)
+        return {e: {**m, "seaux": list(m["seaux"]), "debit": m["nb"] / duree} for e, m in _ETAPES.items()}
+
+def reinitialiser():
+    global _DEBUT
+    with _VERROU:
+        _ETAPES.clear()
+        _TICKERS.clear()
+        _DEBUT = time.time()
+
+def _etiquette(valeur):
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"')
+
+def texte_prometheus():
+    """Toutes les métriques au format d'exposition texte de Prometheus"""
+    with _VERROU:
+        etapes = {e: dict(m, seaux=list(m["seaux"])) for e, m in _ETAPES.items()}
+        tickers = {k: dict(m) for k, m in _TICKERS.items()}
+    lignes = [
+        "# HELP bot_etape_duree_secondes Durée des étapes du bot",
+        "# TYPE bot_etape_duree_secondes histogram",
+    ]
+    for etape, m in sorted(etapes.items()):
+        e = _etiquette(etape)
+        cumul = 0
+        for borne, n in zip(SEAUX + ("+Inf",), m["seaux"]):
+            cumul += n
+            lignes.append(f'bot_etape_duree_secondes_bucket{{etape="{e}",le="{borne}"}} {cumul}')
+        lignes.append(f'bot_etape_duree_secondes_sum{{etape="{e}"}} {m["somme"]:.6f}')
+        lignes.append(f'bot_etape_duree_secondes_count{{etape="{e}"}} {m["nb"]}')
+    lignes += ["# HELP bot_etape_erreurs_total Appels en erreur par étape", "# TYPE bot_etape_erreurs_total counter"]
+    lignes += [f'bot_etape_erreurs_total{{etape="{_etiquette(e)}"}} {m["erreurs"]}' for e, m in sorted(etapes.items())]
+
+    lignes += ["# HELP bot_ticker_duree_secondes Durée cumulée par étape et par ticker", "# TYPE bot_ticker_duree_secondes summary"]
+    for (etape, ticker), m in sorted(tickers.items()):
+        labels = f'etape="{_etiquette(etape)}",ticker="{_etiquette(ticker)}"'
+        lignes.append(f"bot_ticker_duree_secondes_sum{{{labels}}} {m['somme']:.6f}")
+        lignes.append(f"bot_ticker_duree_secondes_count{{{labels}}} {m['nb']}")
+    lignes += ["# HELP bot_ticker_erreurs_total Appels en erreur par étape et par ticker", "# TYPE bot_ticker_erreurs_total counter"]
+    for (etape, ticker), m in sorted(tickers.items()):
+        lignes.append(f'bot_ticker_erreurs_total{{etape="{_etiquette(etape)}",ticker="{_etiquette(ticker)}"}} {m["erreurs"]}')
+    return "\n".join(lignes) + "\n"
+
+def ecrire_fichier_prometheus(chemin=None):
+    """Réécrit le fichier de métriques (atomique : jamais lu à moitié par le collecteur)"""
+    chemin = chemin or FICHIER_METRIQUES
+    with open(chemin + ".tmp", "w", encoding="utf-8") as f: f.write(texte_prometheus())
+    os.replace(chemin + ".tmp", chemin)
+
+def demarrer_serveur_metriques(port=None):
+    """Sert /metrics en HTTP dans un thread (Prometheus vient le lire)"""
+    port = port or PORT_METRIQUES
+    if not port: return None
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args): pass
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            corps = texte_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corps)))
+            self.end_headers()
+            self.wfile.write(corps)
+
+    serveur = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    serveur.daemon_threads = True
+    threading.Thread(target=serveur.serve_forever, name="metriques", daemon=True).start()
+    print(f"📡 Métriques Prometheus sur http://localhost:{port}/metrics")
+    return serveur
+
+# --- PROFIL D'UN SCAN (--profile) ---
+@contextmanager
+def profil(nom):
+    """Collecte toutes les mesures faites pendant le bloc, puis affiche et sauvegarde le détail"""
+    evenements = []
+    with _VERROU: _PROFILS.append(evenements)
+    debut = time.perf_counter()
+    try:
+        yield evenements
+    finally:
+        duree = time.perf_counter() - debut
+        with _VERROU: _PROFILS.remove(evenements)
+        afficher_profil(nom, duree, evenements)
+
+def resumer_profil(duree, evenements):
+    etapes, tickers = {}, {}
+    for etape, ticker, d, erreur in evenements:
+        m = etapes.setdefault(etape, {"nb": 0, "erreurs": 0, "total": 0.0, "max": 0.0})
+        m["nb"] += 1
+        m["erreurs"] += erreur
+        m["total"] += d
+        m["max"] = max(m["max"], d)
+        if ticker: tickers[ticker] = tickers.get(ticker, 0.0) + d
+    for m in etapes.values(): m["moyenne"] = m["total"] / m["nb"]
+    return {"duree_totale": duree, "etapes": etapes, "tickers": tickers}
+
+def afficher_profil(nom, duree, evenements):
+    resume = resumer_profil(duree, evenements)
+    print(f"\n⏱️ PROFIL {nom.upper()} : {duree:.1f}s au total (les étapes parallèles se chevauchent)")
+    for etape, m in sorted(resume["etapes"].items(), key=lambda x: -x[1]["total"]):
+        print(f"   {etape:<32} {m['nb']:4d} appels | total {m['total']:7.2f}s | moy {m['moyenne']:6.2f}s"
+              f" | max {m['max']:6.2f}s | ❌ {m['erreurs']}")
+    if resume["tickers"]:
+        lents = sorted(resume["tickers"].items(), key=lambda x: -x[1])[:5]
+        print("   🐢 Tickers les plus coûteux : " + ", ".join(f"{t} ({d:.1f}s)" for t, d in lents))
+
+    os.makedirs(DOSSIER_PROFILS, exist_ok=True)
+    chemin = os.path.join(DOSSIER_PROFILS, f"{nom}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(chemin, "w") as f: json.dump(resume, f, indent=4)
+
+def profiler(nom, fonction):
+    """Enveloppe fonction() dans profil(nom) si le bot tourne avec --profile"""
+    if not MODE_PROFIL: return fonction
+    @wraps(fonction)
+    def enveloppe(*args, **kwargs):
+        with profil(nom):
+            return fonction(*args, **kwargs)
+    return enveloppe
@@ -1,60 +1,254 @@
-import pandas as pd
-import os
-import joblib
-from sklearn.ensemble import RandomForestClassifier
-from datetime import datetime
-
-FICHIER_DATASET = "ml_dataset.csv"
-FICHIER_MODELE = "cerveau_ia.pkl"
-
-def enregistrer_features(ticker, features):
-    """Enregistre le contexte (Météo) avant l'achat"""
-    data = features.copy()
-    data['ticker'] = ticker
-    data['date'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-    data['resultat'] = None 
-    
-    if os.path.exists(FICHIER_DATASET):
-        df = pd.read_csv(FICHIER_DATASET)
-        df = pd.concat([df, pd.DataFrame([data])], ignore_index=True)
-    else:
-        df = pd.DataFrame([data])
-    df.to_csv(FICHIER_DATASET, index=False)
-
-def update_resultat_ia(ticker, resultat):
-    """Note la copie (1=Gagné, 0=Perdu) après la vente"""
-    if not os.path.exists(FICHIER_DATASET): return
-    df = pd.read_csv(FICHIER_DATASET)
-    
-    # On cherche la dernière occurrence sans résultat
-    for i in range(len(df) - 1, -1, -1):
-        if df.at[i, 'ticker'] == ticker and pd.isna(df.at[i, 'resultat']):
-            df.at[i, 'resultat'] = int(resultat)
-            df.to_csv(FICHIER_DATASET, index=False)
-            entrainer_modele() # On révise la leçon immédiatement
-            return
-
-def entrainer_modele():
-    """L'IA apprend des erreurs passées"""
-    if not os.path.exists(FICHIER_DATASET): return
-    df = pd.read_csv(FICHIER_DATASET)
-    df_clean = df.dropna(subset=['resultat'])
-    
-    if len(df_clean) < 10: return # Pas assez d'expérience
-
-    X = df_clean.drop(columns=['ticker', 'date', 'resultat'], errors='ignore')
-    y = df_clean['resultat'].astype(int)
-    
-    try:
-        model = RandomForestClassifier(n_estimators=100, max_depth=5, random_state=42)
-        model.fit(X, y)
-        joblib.dump(model, FICHIER_MODELE)
-    except: pass
-
-def predire_succes(features):
-    """Donne un avis sur un nouveau trade (Probabilité de gain)"""
-    if not os.path.exists(FICHIER_MODELE): return None
-    try:
-        model = joblib.load(FICHIER_MODELE)
-        return model.predict_proba(pd.DataFrame([features]))[0][1]
-    except: return None
\ No newline at end of file
+import pandas as pd
+import os
+import csv
+import json
+import time
+import threading
+from datetime import datetime
+from metriques import instrumenter
+from portfolio_manager import verrou_fichier
+
+FICHIER_DATASET = "ml_dataset.csv"
+FICHIER_RESULTATS = "ml_resultats.csv"  # Étiquettes (ligne du dataset -> résultat), en ajout seul
+FICHIER_MODELE = "cerveau_ia.pkl"
+
+# --- STOCKAGE EN AJOUT SEUL ---
+# enregistrer_features ajoute UNE ligne au CSV (pas de relecture / réécriture).
+# update_resultat_ia ajoute UNE ligne dans ml_resultats.csv et retire la position de
+# l'index des trades "en attente" {ticker: [lignes sans résultat]}, gardé en mémoire.
+# L'index n'est reconstruit (1 lecture complète) qu'au 1er accès ou si un autre
+# processus a modifié les fichiers.
+# Les étiquettes désignent un NUMÉRO de ligne : ajout, relecture de l'index et étiquetage
+# se font sous verrou_fichier(FICHIER_DATASET), sinon deux bots pourraient viser la même ligne.
+_VERROU = threading.Lock()
+_INDEX = {"signature": None, "en_attente": {}, "nb_lignes": 0, "colonnes": None}
+
+def _signature():
+    signature = []
+    for f in (FICHIER_DATASET, FICHIER_RESULTATS):
+        try:
+            st = os.stat(f)
+            signature.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        except OSError: signature.append(None)
+    return tuple(signature)
+
+def _lire_resultats():
+    if not os.path.exists(FICHIER_RESULTATS): return {}
+    resultats = {}
+    with open(FICHIER_RESULTATS, "r", newline="") as f:
+        for ligne in csv.DictReader(f): resultats[int(ligne['ligne'])] = int(ligne['resultat'])
+    return resultats
+
+def _index():
+    """Index des lignes en attente de résultat (reconstruit seulement si besoin)"""
+    if _INDEX["signature"] == _signature(): return _INDEX
+    en_attente, nb_lignes, colonnes = {}, 0, None
+    if os.path.exists(FICHIER_DATASET):
+        resultats = _lire_resultats()
+        with open(FICHIER_DATASET, "r", newline="") as f:
+            lecteur = csv.DictReader(f)
+            colonnes = lecteur.fieldnames
+            for i, ligne in enumerate(lecteur):
+                nb_lignes = i + 1
+                if ligne.get('resultat', '') == '' and i not in resultats:
+                    en_attente.setdefault(ligne['ticker'], []).append(i)
+    _INDEX.update(signature=_signature(), en_attente=en_attente, nb_lignes=nb_lignes, colonnes=colonnes)
+    return _INDEX
+
+def _ajouter_ligne(fichier, colonnes, valeurs):
+    nouveau = not os.path.exists(fichier)
+    with open(fichier, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=colonnes, extrasaction="ignore")
+        if nouveau: writer.writeheader()
+        writer.writerow(valeurs)
+
+def charger_dataset():
+    """Dataset complet avec les résultats connus (pour l'entraînement)"""
+    if not os.path.exists(FICHIER_DATASET): return pd.DataFrame()
+    df = pd.read_csv(FICHIER_DATASET)
+    resultats = _lire_resultats()
+    if resultats:
+        lignes = [i for i in resultats if i < len(df)]
+        df.loc[lignes, 'resultat'] = [resultats[i] for i in lignes]
+    return df
+
+def enregistrer_features(ticker, features):
+    """Enregistre le contexte (Météo) avant l'achat"""
+    data = features.copy()
+    data['ticker'] = ticker
+    data['date'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+    data['resultat'] = None 
+    
+    with _VERROU, verrou_fichier(FICHIER_DATASET):
+        index = _index() # Relu sous le verrou : nb_lignes tient compte des ajouts des autres bots
+        colonnes = index["colonnes"] or list(data.keys())
+        _ajouter_ligne(FICHIER_DATASET, colonnes, data)
+        index["en_attente"].setdefault(ticker, []).append(index["nb_lignes"])
+        index["nb_lignes"] += 1
+        index["colonnes"] = colonnes
+        index["signature"] = _signature()
+
+def update_resultat_ia(ticker, resultat):
+    """Note la copie (1=Gagné, 0=Perdu) après la vente"""
+    with _VERROU, verrou_fichier(FICHIER_DATASET):
+        index = _index()
+        # On prend la dernière occurrence sans résultat
+        lignes = index["en_attente"].get(ticker)
+        if not lignes: return
+        ligne = lignes.pop()
+        _ajouter_ligne(FICHIER_RESULTATS, ["ligne", "resultat"], {"ligne": ligne, "resultat": int(resultat)})
+        index["signature"] = _signature()
+    demander_entrainement() # Révision de la leçon en arrière-plan (ne bloque pas la sortie)
+
+# --- REGISTRE DE MODÈLES VERSIONNÉS ---
+# Chaque entraînement produit modeles/cerveau_ia_vNNNN.pkl + .json (métadonnées).
+# Le modèle utilisé par predire_succes est désigné par modeles/actif.json,
+# remplacé atomiquement (rename) : un prédicteur voit l'ancienne OU la nouvelle version.
+DOSSIER_MODELES = "modeles"
+FICHIER_ACTIF = os.path.join(DOSSIER_MODELES, "actif.json")
+GARDER_VERSIONS = 5
+
+def modele_actif():
+    """Métadonnées du modèle actif (ou None)"""
+    try:
+        with open(FICHIER_ACTIF, "r") as f: return json.load(f)
+    except (OSError, ValueError): return None
+
+def chemin_modele_actif():
+    actif = modele_actif()
+    if actif: return os.path.join(DOSSIER_MODELES, actif['fichier'])
+    return FICHIER_MODELE if os.path.exists(FICHIER_MODELE) else None # Ancien modèle unique
+
+def _publier_modele(model, meta):
+    os.makedirs(DOSSIER_MODELES, exist_ok=True)
+    # Lecture du numéro + publication d'un bloc : deux bots ne peuvent pas prendre la même version
+    with verrou_fichier(FICHIER_ACTIF):
+        actif = modele_actif()
+        version = (actif['version'] if actif else 0) + 1
+        nom = f"cerveau_ia_v{version:04d}"
+        meta = {"version": version, "fichier": nom + ".pkl", **meta}
+
+        import joblib
+        joblib.dump(model, os.path.join(DOSSIER_MODELES, nom + ".pkl.tmp"))
+        os.replace(os.path.join(DOSSIER_MODELES, nom + ".pkl.tmp"), os.path.join(DOSSIER_MODELES, nom + ".pkl"))
+        with open(os.path.join(DOSSIER_MODELES, nom + ".json"), "w") as f: json.dump(meta, f, indent=4)
+
+        # Bascule atomique vers la nouvelle version
+        with open(FICHIER_ACTIF + ".tmp", "w") as f: json.dump(meta, f, indent=4)
+        os.replace(FICHIER_ACTIF + ".tmp", FICHIER_ACTIF)
+
+        # Ménage : on garde les GARDER_VERSIONS dernières
+        for ancienne in range(1, version - GARDER_VERSIONS + 1):
+            for ext in (".pkl", ".json"):
+                chemin = os.path.join(DOSSIER_MODELES, f"cerveau_ia_v{ancienne:04d}{ext}")
+                if os.path.exists(chemin): os.remove(chemin)
+    return meta
+
+def entrainer_modele():
+    """L'IA apprend des erreurs passées"""
+    df = charger_dataset()
+    if df.empty: return
+    df_clean = df.dropna(subset=['resultat'])
+    
+    if len(df_clean) < 10: return # Pas assez d'expérience
+
+    X = df_clean.drop(columns=['ticker', 'date', 'resultat'], errors='ignore')
+    y = df_clean['resultat'].astype(int)
+    
+    try:
+        # scikit-learn (~1 s à importer) n'est chargé que pour entraîner
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import cross_val_score
+        debut = time.time()
+        model = RandomForestClassifier(n_estimators=100, max_depth=5, random_state=42)
+        # Score de validation (validation croisée) si chaque classe a au moins 2 exemples
+        plis = min(5, int(y.value_counts().min())) if y.nunique() > 1 else 0
+        score = float(cross_val_score(model, X, y, cv=plis).mean()) if plis >= 2 else None
+        model.fit(X, y)
+        meta = _publier_modele(model, {
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "taille_dataset": int(len(df_clean)),
+            "duree_entrainement": round(time.time() - debut, 3),
+            "score_validation": score,
+            "features": list(X.columns),
+        })
+        print(f"\n🧠 Modèle IA v{meta['version']} entraîné ({meta['taille_dataset']} trades, validation: {score})")
+        return meta
+    except Exception as e:
+        print(f"\n⚠️ Erreur entraînement IA : {e}")
+
+# --- RÉ-ENTRAÎNEMENT EN ARRIÈRE-PLAN ---
+# update_resultat_ia ne bloque plus la boucle de sortie : il demande un entraînement
+# et un thread le lance quand aucune nouvelle demande n'est arrivée depuis DELAI_DEBOUNCE.
+# Une rafale de ventes = un seul fit.
+DELAI_DEBOUNCE = 30 # secondes
+
+_CONDITION = threading.Condition()
+_DEMANDE = {"derniere": None, "thread": None}
+
+def _boucle_entrainement():
+    while True:
+        with _CONDITION:
+            while _DEMANDE["derniere"] is None: _CONDITION.wait()
+            # On attend le calme : chaque nouvelle demande repousse l'échéance
+            while True:
+                reste = _DEMANDE["derniere"] + DELAI_DEBOUNCE - time.time()
+                if reste <= 0: break
+                _CONDITION.wait(reste)
+            _DEMANDE["derniere"] = None
+        entrainer_modele()
+
+def demander_entrainement():
+    with _CONDITION:
+        if _DEMANDE["thread"] is None:
+            _DEMANDE["thread"] = threading.Thread(target=_boucle_entrainement, name="entrainement_ia", daemon=True)
+            _DEMANDE["thread"].start()
+        _DEMANDE["derniere"] = time.time()
+        _CONDITION.notify()
+
+# --- PRÉDICTION (MODÈLE GARDÉ EN MÉMOIRE) ---
+# Le modèle n'est rechargé que si actif.json (ou l'ancien cerveau_ia.pkl) a changé sur disque.
+_MODELE = [None, None]  # [signature, modèle]
+
+def _signature_modele():
+    for chemin in (FICHIER_ACTIF, FICHIER_MODELE):
+        try:
+            st = os.stat(chemin)
+            return (chemin, st.st_ino, st.st_size, st.st_mtime_ns)
+        except OSError: continue
+    return None
+
+def charger_modele():
+    signature = _signature_modele()
+    if signature is None: return None
+    cache_signature, model = _MODELE
+    if signature != cache_signature:
+        import joblib
+        model = joblib.load(chemin_modele_actif())
+        _MODELE[:] = [signature, model]
+    return model
+
+def _preparer(model, lignes):
+    X = pd.DataFrame(lignes)
+    # Mêmes colonnes, même ordre qu'à l'entraînement
+    if hasattr(model, "feature_names_in_"): X = X[list(model.feature_names_in_)]
+    return X
+
+@instrumenter()
+def predire_succes(features):
+    """Donne un avis sur un nouveau trade (Probabilité de gain)"""
+    try:
+        model = charger_modele()
+        if model is None: return None
+        return model.predict_proba(_preparer(model, [features]))[0][1]
+    except: return None
+
+@instrumenter()
+def predire_succes_batch(liste_features):
+    """Probabilité de gain pour TOUS les candidats d'un scan en un seul predict_proba"""
+    if not liste_features: return []
+    try:
+        model = charger_modele()
+        if model is None: return [None] * len(liste_features)
+        return [float(p) for p in model.predict_proba(_preparer(model, liste_features))[:, 1]]
+    except: return [None] * len(liste_features)
@@ -0,0 +1,145 @@
+import time
+import numpy as np
+import pandas as pd
+from portfolio_manager import charger_portfolio, _signature, FICHIER_PORTFOLIO
+from metriques import enregistrer
+
+# ==============================================================================
+# SOURCES DE COTATIONS (Interchangeables)
+# ==============================================================================
+# Une source = une fonction qui reçoit une liste de tickers et renvoie {ticker: prix}.
+# On peut donc brancher Yahoo en prod, ou un faux flux local pour les tests / replays.
+
+def source_cotations_yahoo(tickers):
+    """Dernier prix de TOUS les tickers en UNE seule requête Yahoo (au lieu de N)"""
+    tickers = list(tickers)
+    if not tickers: return {}
+
+    import yfinance as yf # Importé au premier appel (démarrage rapide des commandes sans Yahoo)
+    df = yf.download(tickers, period="1d", interval="15m", progress=False, group_by="column")
+    if df is None or df.empty: return {}
+
+    closes = df['Close']
+    # Avec 1 seul ticker, certaines versions de yfinance renvoient une Series
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(name=tickers[0])
+
+    derniers = closes.ffill().iloc[-1]
+    return {t: float(p) for t, p in derniers.items() if pd.notna(p)}
+
+def source_cotations_fixes(prix):
+    """Faux flux local : renvoie les prix d'un dict (tests, replays)"""
+    def source(tickers):
+        return {t: float(prix[t]) for t in tickers if t in prix}
+    return source
+
+# ==============================================================================
+# DÉTECTION VECTORISÉE DES SORTIES (SL / TP)
+# ==============================================================================
+def detecter_sorties(portfolio, prix):
+    """
+    Compare tous les prix aux Stop Loss / Take Profit en une seule passe NumPy.
+    Renvoie une liste de (ticker, prix_sortie, raison).
+    """
+    tickers = [t for t in portfolio if t in prix]
+    if not tickers: return []
+
+    courant = np.array([prix[t] for t in tickers], dtype=float)
+    tp = np.array([portfolio[t]['take_profit'] for t in tickers], dtype=float)
+    sl = np.array([portfolio[t]['stop_loss'] for t in tickers], dtype=float)
+
+    # Le Take Profit est prioritaire (même ordre que l'ancienne boucle if/elif)
+    touche_tp = courant >= tp
+    touche_sl = ~touche_tp & (courant <= sl)
+
+    sorties = []
+    for i in np.flatnonzero(touche_tp | touche_sl):
+        raison = "TAKE PROFIT" if touche_tp[i] else "STOP LOSS"
+        sorties.append((tickers[i], float(courant[i]), raison))
+    return sorties
+
+# ==============================================================================
+# LE GARDIEN EN MODE BATCH
+# ==============================================================================
+def surveiller_positions_batch(cloturer_position, source=source_cotations_yahoo, portfolio=None):
+    """
+    1 requête pour tout le portefeuille, puis vérification SL/TP vectorisée.
+    `cloturer_position(ticker, data, prix, raison)` est appelée pour chaque sortie
+    (c'est elle qui passe par archiver_trade_termine / supprimer_trade).
+    """
+    if portfolio is None: portfolio = charger_portfolio()
+    if not portfolio: return []
+
+    try:
+        prix = source(list(portfolio.keys()))
+    except Exception as e:
+        print(f"\n⚠️ Erreur cotations : {e}")
+        return []
+
+    sorties = detecter_sorties(portfolio, prix)
+    for ticker, prix_sortie, raison in sorties:
+        try:
+            cloturer_position(ticker, portfolio[ticker], prix_sortie, raison)
+        except Exception as e:
+            print(f"\n❌ Erreur clôture {ticker} : {e}")
+    return sorties
+
+# ==============================================================================
+# LE GARDIEN EN MODE FLUX (UN TICK = UNE VÉRIFICATION)
+# ==============================================================================
+DELAI_ABONNEMENT = 1  # secondes max avant de prendre en compte une position ouverte / fermée
+
+_A_RETENTER = set()  # Tickers dont la clôture a échoué (ex : base verrouillée), retentés à prix frais
+_JAMAIS_LU = object()
+
+def _cloturer_sorties(cloturer_position, portfolio, prix, horodatage=None):
+    """Clôture les positions dont le prix touche le SL/TP. Renvoie les sorties réussies"""
+    sorties = []
+    for ticker, prix_sortie, raison in detecter_sorties(portfolio, prix):
+        try:
+            cloturer_position(ticker, portfolio[ticker], prix_sortie, raison)
+            sorties.append((ticker, prix_sortie, raison))
+            _A_RETENTER.discard(ticker)
+        except Exception as e:
+            print(f"\n❌ Erreur clôture {ticker} : {e}")
+            _A_RETENTER.add(ticker)
+        # Délai entre la cotation et la fin de la sortie (archivée, supprimée)
+        if horodatage is not None: enregistrer("sortie_latence", time.time() - horodatage, ticker)
+    return sorties
+
+def _retenter_clotures(cloturer_position, portfolio, source):
+    """Le flux ne renvoie pas un prix inchangé : les clôtures échouées sont retentées sur une cotation fraîche"""
+    _A_RETENTER.intersection_update(portfolio) # Fermées entre temps (ex : par l'autre bot)
+    if not _A_RETENTER: return []
+    try:
+        prix = source(sorted(_A_RETENTER))
+    except Exception as e:
+        print(f"\n⚠️ Erreur cotations : {e}")
+        return []
+    return _cloturer_sorties(cloturer_position, {t: portfolio[t] for t in _A_RETENTER}, prix)
+
+def surveiller_flux(flux, cloturer_position, duree, charger=charger_portfolio,
+                    signature=lambda: _signature(FICHIER_PORTFOLIO), source=source_cotations_yahoo):
+    """
+    Écoute le flux de cotations (flux_cotations.py) pendant `duree` secondes :
+    chaque tick est comparé au SL/TP de sa position dès son arrivée, et l'abonnement
+    suit le portefeuille (relu seulement quand le fichier change).
+    Renvoie la liste des sorties (ticker, prix, raison).
+    """
+    fin = time.monotonic() + duree
+    sorties = []
+    vue, portfolio = _JAMAIS_LU, {}
+    while True:
+        signature_actuelle = signature()
+        if signature_actuelle != vue: # Position ouverte / fermée (par ce bot ou par l'autre)
+            vue, portfolio = signature_actuelle, charger()
+            flux.abonner(portfolio)
+        reste = fin - time.monotonic()
+        if reste <= 0: break
+
+        tick = flux.prochain_tick(timeout=min(reste, DELAI_ABONNEMENT))
+        if tick is None or tick.ticker not in portfolio: continue
+        sorties += _cloturer_sorties(cloturer_position, {tick.ticker: portfolio[tick.ticker]},
+                                     {tick.ticker: tick.prix}, tick.horodatage)
+
+    return sorties + _retenter_clotures(cloturer_position, charger(), source)
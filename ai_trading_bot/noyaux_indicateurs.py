@@ -0,0 +1,319 @@
+import os
+import json
+import numpy as np
+
+# ==============================================================================
+# NOYAUX NUMPY "CROSS-SECTIONNELS" (N tickers x T bougies en une passe)
+# ==============================================================================
+# Toutes les fonctions prennent des tableaux 2D (une ligne par ticker, une colonne
+# par bougie, NaN à gauche pour les historiques plus courts) et renvoient des 2D.
+# Les formules sont celles de pandas utilisées jusqu'ici :
+#   ewm(span=..., adjust=False), ewm(alpha=1/14, adjust=False), rolling(n).mean/std
+# -> c'est désormais l'UNIQUE implémentation du RSI de Wilder du projet.
+
+# Règles de la stratégie H1 (agent_financier_yahoo_pro) : valeurs historiques
+PARAMS_H1 = {
+    "ema_rapide": 20,
+    "ema_lente": 50,
+    "rsi_periode": 14,
+    "rsi_max_achat": 70,    # Au-dessus : pas d'achat sur tendance
+    "rsi_surchauffe": 75,   # Au-dessus : ATTENDRE, score remis à 0
+    "rsi_survente": 30,     # En-dessous : ACHAT (DIP)
+    "atr_periode": 14,
+    "mult_sl": 2,           # Stop Loss = Prix - 2 x ATR
+    "mult_tp": 3,           # Take Profit = Prix + 3 x ATR
+    "score_tendance": 2,
+    "score_cross": 3,
+    "score_breakout": 1,
+    "score_dip": 2,
+}
+
+# Règles de analyze_market_structure (indicateurs.py, bougies journalières)
+PARAMS_STRUCTURE = {
+    "rsi_survente": 30,       # En-dessous : +2 (rebond)
+    "rsi_surachat": 70,       # Au-dessus : -2 (danger)
+    "rsi_haussier": 50,       # Entre les deux et au-dessus : +0.5
+    "mult_sl": 2,
+    "mult_tp": 3,
+    "seuil_achat_fort": 3.5,  # Score >= : ACHAT FORT
+    "seuil_neutre": 1.5,      # Score >= : NEUTRE / FAIBLE ACHAT
+}
+
+# --- PARAMÈTRES OPTIMISÉS (optimiseur.py) ---
+# parametres_strategie.json : {"h1": {...}, "structure": {...}}. Les clés absentes
+# gardent leur valeur historique ; le fichier est relu seulement s'il a changé.
+FICHIER_PARAMETRES = "parametres_strategie.json"
+PARAMS_DEFAUT = {"h1": PARAMS_H1, "structure": PARAMS_STRUCTURE}
+_PARAMETRES = [None, {}]  # [signature, contenu du fichier]
+
+def parametres_strategie(strategie="h1"):
+    """Paramètres utilisés par les bots : défauts + valeurs exportées par l'optimiseur"""
+    defaut = PARAMS_DEFAUT[strategie]
+    try:
+        st = os.stat(FICHIER_PARAMETRES)
+        signature = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return dict(defaut)
+    if signature != _PARAMETRES[0]:
+        try:
+            with open(FICHIER_PARAMETRES, "r") as f: contenu = json.load(f)
+        except (OSError, ValueError): contenu = {}
+        _PARAMETRES[:] = [signature, contenu]
+    exporte = _PARAMETRES[1].get(strategie) or {}
+    return {**defaut, **{k: v for k, v in exporte.items() if k in defaut}}
+
+# --- FENÊTRE DE CALCUL LIVE ---
+# Le bot recalcule les indicateurs sur une fenêtre glissante, le backtest sur tout l'historique.
+# Une EMA part de la 1re bougie de sa fenêtre : après k x span bougies, ce point de départ ne
+# pèse plus que ~e^(-2k). La fenêtre live et le préchauffage du backtest suivent donc les
+# paramètres exportés (une EMA 150 demande 3 fois plus d'historique qu'une EMA 50).
+FACTEUR_CHAUFFE = 3
+BOUGIES_PAR_SEANCE = {"60m": 7}  # Yahoo : 9h30 -> 16h, 7 bougies horaires par jour de bourse
+
+def bougies_chauffe(params=None):
+    """Bougies nécessaires pour que toutes les moyennes de la stratégie H1 soient stabilisées"""
+    p = {**PARAMS_H1, **(params or {})}
+    return FACTEUR_CHAUFFE * max(p["ema_rapide"], p["ema_lente"], p["rsi_periode"], p["atr_periode"])
+
+def periode_live_h1(params=None, interval="60m"):
+    """Période Yahoo ('Nd' = N jours de bourse) du scan live : au moins bougies_chauffe(params) bougies"""
+    jours = -(-bougies_chauffe(params) // BOUGIES_PAR_SEANCE[interval]) + 1 # +1 : séance en cours
+    return f"{max(jours, 10)}d"
+
+def _en_2d(x):
+    x = np.asarray(x, dtype=float)
+    return x[None, :] if x.ndim == 1 else x
+
+def _memo(cache, cle, calcul):
+    """Réutilise un indicateur déjà calculé sur le MÊME panel (optimiseur : 1 calcul par période)"""
+    if cache is None: return calcul()
+    if cle not in cache: cache[cle] = calcul()
+    return cache[cle]
+
+def _precedent(x):
+    return np.concatenate([np.full((x.shape[0], 1), np.nan), x[:, :-1]], axis=1)
+
+# --- MOYENNES EXPONENTIELLES ---
+def ema(x, span=None, alpha=None):
+    """ewm(span|alpha, adjust=False).mean() ligne par ligne (NaN gérés comme pandas)"""
+    x = _en_2d(x)
+    a = alpha if alpha is not None else 2 / (span + 1)
+    out = np.full_like(x, np.nan)
+    if x.shape[1] == 0: return out
+
+    valeur = x[:, 0].copy()
+    poids = np.ones(x.shape[0])
+    out[:, 0] = valeur
+    for t in range(1, x.shape[1]):
+        cur = x[:, t]
+        obs = ~np.isnan(cur)
+        demarre = ~np.isnan(valeur)
+
+        poids = np.where(demarre, poids * (1 - a), poids)
+        maj = demarre & obs & (valeur != cur)
+        with np.errstate(invalid="ignore"):
+            valeur = np.where(maj, (poids * valeur + a * cur) / (poids + a), valeur)
+        poids = np.where(demarre & obs, 1.0, poids)
+        valeur = np.where(~demarre & obs, cur, valeur)
+        out[:, t] = valeur
+    return out
+
+# --- FENÊTRES GLISSANTES ---
+def _somme_fenetre(x, n):
+    """Somme sur n bougies (NaN si la fenêtre est incomplète), colonnes alignées à droite"""
+    L = x.shape[1] - n + 1
+    s = x[:, 0:L].copy()
+    for k in range(1, n): s += x[:, k:k + L]
+    return s
+
+def moyenne_glissante(x, n):
+    """rolling(n).mean()"""
+    x = _en_2d(x)
+    out = np.full_like(x, np.nan)
+    if x.shape[1] >= n: out[:, n - 1:] = _somme_fenetre(x, n) / n
+    return out
+
+def ecart_type_glissant(x, n):
+    """rolling(n).std() (ddof=1), calcul en deux passes pour rester précis"""
+    x = _en_2d(x)
+    out = np.full_like(x, np.nan)
+    if x.shape[1] < n: return out
+    L = x.shape[1] - n + 1
+    moyenne = _somme_fenetre(x, n) / n
+    var = (x[:, 0:L] - moyenne) ** 2
+    for k in range(1, n): var += (x[:, k:k + L] - moyenne) ** 2
+    out[:, n - 1:] = np.sqrt(var / (n - 1))
+    return out
+
+# --- INDICATEURS ---
+def rsi_wilder(close, periode=14):
+    close = _en_2d(close)
+    delta = np.diff(close, axis=1, prepend=np.nan)
+    with np.errstate(invalid="ignore"):
+        gain = ema(np.where(delta > 0, delta, 0.0), alpha=1 / periode)
+        perte = ema(np.where(delta < 0, -delta, 0.0), alpha=1 / periode)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = gain / perte
+        return 100 - (100 / (1 + rs))
+
+def atr(high, low, close, periode=14, vrai_range=True):
+    """vrai_range=True : True Range (indicateurs.py) / False : High-Low (finance_agents.py)"""
+    high, low, close = _en_2d(high), _en_2d(low), _en_2d(close)
+    tr = high - low
+    if vrai_range:
+        prev = np.concatenate([np.full((close.shape[0], 1), np.nan), close[:, :-1]], axis=1)
+        tr = np.fmax(tr, np.fmax(np.abs(high - prev), np.abs(low - prev)))
+    return moyenne_glissante(tr, periode)
+
+def macd(close, rapide=12, lente=26, signal=9):
+    ligne = ema(close, span=rapide) - ema(close, span=lente)
+    return ligne, ema(ligne, span=signal)
+
+def bollinger(close, periode=20, nb_ecarts=2):
+    sma = moyenne_glissante(close, periode)
+    std = ecart_type_glissant(close, periode)
+    return sma, std, sma + std * nb_ecarts, sma - std * nb_ecarts
+
+def calculer_panel(high, low, close):
+    """Tous les indicateurs pour N tickers d'un coup (mêmes noms que les colonnes pandas)"""
+    close = _en_2d(close)
+    res = {f"EMA_{s}": ema(close, span=s) for s in (12, 20, 26, 50, 200)}
+    res["RSI"] = rsi_wilder(close, 14)
+    res["MACD"], res["MACD_signal"] = macd(close)
+    res["SMA_20"], res["STD_20"], res["BB_Upper"], res["BB_Lower"] = bollinger(close)
+    res["ATR"] = atr(high, low, close, 14, vrai_range=True)
+    res["ATR_HL"] = atr(high, low, close, 14, vrai_range=False)
+    return res
+
+# ==============================================================================
+# PANEL DE PRIX
+# ==============================================================================
+def construire_panel(frames):
+    """
+    {ticker: DataFrame OHLC} -> (tickers, high, low, close) en 2D.
+    Chaque historique est aligné à DROITE (dernière bougie = dernière colonne),
+    les historiques plus courts sont complétés par des NaN à gauche.
+    """
+    tickers = [t for t, df in frames.items() if df is not None and not df.empty]
+    T = max((len(frames[t]) for t in tickers), default=0)
+    panel = {c: np.full((len(tickers), T), np.nan) for c in ("High", "Low", "Close")}
+    for i, t in enumerate(tickers):
+        df = frames[t]
+        for c in panel: panel[c][i, T - len(df):] = df[c].to_numpy(dtype=float)
+    return tickers, panel["High"], panel["Low"], panel["Close"]
+
+# ==============================================================================
+# SCORE HYBRIDE H1 POUR N TICKERS (même logique que agent_financier_yahoo_pro)
+# ==============================================================================
+def signaux_h1(high, low, close, params=None, cache=None):
+    """
+    Version tableau de la logique hybride, évaluée à CHAQUE bougie.
+    Renvoie en 2D : code, score, atr_hl, rsi, puis les masques des 5 règles
+    (tendance, cross, breakout, surchauffe, dip).
+    code : 0=NEUTRE, 1=ACHAT, 2=ACHAT FORT, 3=ATTENDRE, 4=ACHAT (DIP)
+    cache : dict optionnel pour réutiliser les indicateurs entre plusieurs appels sur le même panel
+    """
+    p = {**PARAMS_H1, **(params or {})}
+    high, low, close = _en_2d(high), _en_2d(low), _en_2d(close)
+    e_rapide = _memo(cache, ("ema", p["ema_rapide"]), lambda: ema(close, span=p["ema_rapide"]))
+    e_lente = _memo(cache, ("ema", p["ema_lente"]), lambda: ema(close, span=p["ema_lente"]))
+    rsi = _memo(cache, ("rsi", p["rsi_periode"]), lambda: rsi_wilder(close, p["rsi_periode"]))
+    atr_hl = _memo(cache, ("atr_hl", p["atr_periode"]), lambda: atr(high, low, close, p["atr_periode"], vrai_range=False))
+    prec = _precedent
+
+    with np.errstate(invalid="ignore"):
+        tendance = close > e_lente
+        cross = (e_rapide > e_lente) & (prec(e_rapide) <= prec(e_lente))
+        breakout = tendance & (prec(close) <= prec(e_lente))
+        surchauffe = rsi > p["rsi_surchauffe"]
+        dip = rsi < p["rsi_survente"]
+
+        code = np.where(tendance & (rsi < p["rsi_max_achat"]), 1, 0)
+        code = np.where(cross, 2, code)
+        code = np.where(surchauffe, 3, code)
+        code = np.where(dip, 4, code)
+
+    score = (p["score_tendance"] * tendance + p["score_cross"] * cross
+             + p["score_breakout"] * breakout).astype(float)
+    score = np.where(surchauffe, 0.0, score)
+    score = score + p["score_dip"] * dip
+    return code, score, atr_hl, rsi, tendance, cross, breakout, surchauffe, dip
+
+# ==============================================================================
+# SCORE "STRUCTURE DE MARCHÉ" POUR N TICKERS (même logique que analyze_market_structure)
+# ==============================================================================
+def signaux_structure(high, low, close, params=None, cache=None):
+    """
+    Score de analyze_market_structure à CHAQUE bougie (EMA 50/200, RSI, Bollinger, MACD).
+    Renvoie en 2D : score, atr (True Range)
+    """
+    p = {**PARAMS_STRUCTURE, **(params or {})}
+    high, low, close = _en_2d(high), _en_2d(low), _en_2d(close)
+    ema_50 = _memo(cache, ("ema", 50), lambda: ema(close, span=50))
+    ema_200 = _memo(cache, ("ema", 200), lambda: ema(close, span=200))
+    rsi = _memo(cache, ("rsi", 14), lambda: rsi_wilder(close, 14))
+    bb_bas = _memo(cache, ("bollinger_bas", 20), lambda: bollinger(close, 20, 2)[3])
+    ligne, signal = _memo(cache, ("macd",), lambda: macd(close))
+    atr_tr = _memo(cache, ("atr", 14), lambda: atr(high, low, close, 14, vrai_range=True))
+
+    with np.errstate(invalid="ignore"):
+        # 1. Tendance de fond
+        au_dessus = close > ema_200
+        score = np.where(au_dessus, np.where(ema_50 > ema_200, 2.0, 1.0), 0.0)
+        # 2. RSI
+        zone = (rsi > p["rsi_survente"]) & (rsi < p["rsi_surachat"])
+        score += np.where(zone & (rsi > p["rsi_haussier"]), 0.5, 0.0)
+        score += np.where(~zone & (rsi <= p["rsi_survente"]), 2.0, 0.0)
+        score -= np.where(~zone & (rsi >= p["rsi_surachat"]), 2.0, 0.0)
+        # 3. Bollinger basse
+        score += np.where(close < bb_bas, 1.0, 0.0)
+        # 4. MACD (croisement récent ou simplement positif)
+        positif = ligne > signal
+        croisement = positif & (_precedent(ligne) <= _precedent(signal))
+        score += np.where(croisement, 1.5, np.where(positif, 0.5, 0.0))
+    return score, atr_tr
+
+LIBELLES_SIGNAL = ["NEUTRE", "ACHAT", "ACHAT FORT", "ATTENDRE", "ACHAT (DIP)"]
+
+def scorer_h1_batch(tickers, high, low, close, params=None):
+    """Renvoie {ticker: dict identique à agent_financier_yahoo_pro} pour tout le panel"""
+    p = {**PARAMS_H1, **(params or {})}
+    close = _en_2d(close)
+    code, score, atr_hl, rsi, tendance, cross, breakout, surchauffe, dip = signaux_h1(high, low, close, p)
+
+    resultats = {}
+    nb_valides = (~np.isnan(close)).sum(axis=1)
+    for i, ticker in enumerate(tickers):
+        if nb_valides[i] < 2:
+            resultats[ticker] = {"success": False}
+            continue
+
+        prix = float(close[i, -1])
+        a = float(atr_hl[i, -1]) if not np.isnan(atr_hl[i, -1]) else prix * 0.02
+
+        reasons = []
+        if tendance[i, -1]:
+            reasons.append("Tendance Haussière (Prix > EMA50)")
+            if not rsi[i, -1] < p["rsi_max_achat"]: reasons.append("Mais RSI trop haut")
+        if cross[i, -1]: reasons.append("⚡ GOLDEN CROSS (Signal Puissant)")
+        if breakout[i, -1]: reasons.append("Breakout EMA50")
+        if surchauffe[i, -1]: reasons.append("⛔ Surchauffe RSI")
+        if dip[i, -1]: reasons.append("💎 Survente extrême")
+
+        s = float(score[i, -1])
+        resultats[ticker] = {
+            "success": True,
+            "signal": LIBELLES_SIGNAL[code[i, -1]],
+            "score": int(s) if s.is_integer() else s,
+            "prix": prix,
+            "stop_loss": prix - (p["mult_sl"] * a),
+            "take_profit": prix + (p["mult_tp"] * a), # Ratio 1.5
+            "rsi": float(rsi[i, -1]),
+            "reasons": reasons
+        }
+    return resultats
+
+def scorer_h1(df, params=None):
+    """Version 1 ticker (DataFrame OHLC) du score hybride"""
+    _, high, low, close = construire_panel({"_": df})
+    return scorer_h1_batch(["_"], high, low, close, params)["_"]
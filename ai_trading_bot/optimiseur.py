@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import random
+import argparse
+import itertools
+import numpy as np
+from datetime import datetime
+from multiprocessing import Pool, shared_memory
+from backtest import backtester_panel, charger_panel, statistiques, trier_trades, INTERVALLES, PERIODES
+from noyaux_indicateurs import PARAMS_DEFAUT, FICHIER_PARAMETRES
+from portfolio_manager import ecrire_json_atomique
+
+# ==============================================================================
+# OPTIMISEUR DES SEUILS DE STRATÉGIE (grille ou tirage aléatoire)
+# ==============================================================================
+# Toutes les combinaisons sont évaluées par le backtest vectorisé sur le MÊME panel
+# de prix. Le panel est chargé une fois, copié dans un bloc de mémoire partagée, et
+# chaque processus du pool y accède sans copie (rien n'est picklé par tâche à part
+# le dict de paramètres). Chaque processus garde aussi un cache des indicateurs
+# (EMA, RSI, ATR par période) : ils ne sont calculés qu'une fois par valeur testée.
+# Le classement se fait sur la performance cumulée, le win rate ou le drawdown,
+# et la meilleure configuration est exportée dans parametres_strategie.json,
+# relu automatiquement par les bots (noyaux_indicateurs.parametres_strategie).
+
+# Valeurs testées par paramètre (les autres gardent leur valeur par défaut)
+# Une EMA lente plus longue est possible en live : le bot télécharge alors plus de bougies
+# (noyaux_indicateurs.periode_live_h1) et le backtest attend d'autant plus avant d'entrer.
+ESPACES = {
+    "h1": {
+        "ema_rapide": [10, 15, 20, 30],
+        "ema_lente": [50, 100, 150],
+        "rsi_max_achat": [65, 70, 75],
+        "rsi_surchauffe": [75, 80, 85],
+        "rsi_survente": [25, 30, 35],
+        "mult_sl": [1.5, 2, 2.5, 3],
+        "mult_tp": [2, 3, 4, 5],
+    },
+    "structure": {
+        "rsi_survente": [25, 30, 35],
+        "rsi_surachat": [65, 70, 75, 80],
+        "mult_sl": [1.5, 2, 2.5, 3],
+        "mult_tp": [2, 3, 4, 5],
+        "seuil_achat_fort": [2.5, 3, 3.5, 4, 4.5],
+    },
+}
+
+# Critères de classement : clé de tri (le plus petit = le meilleur)
+CRITERES = {
+    "rendement": lambda s: (-s["performance_cumulee"], -s["win_rate"], s["max_drawdown"]),
+    "win_rate": lambda s: (-s["win_rate"], -s["performance_cumulee"], s["max_drawdown"]),
+    "drawdown": lambda s: (s["max_drawdown"], -s["performance_cumulee"], -s["win_rate"]),
+}
+MIN_TRADES = 20  # En dessous, une config n'est pas classée (résultat dû au hasard)
+
+# --- ÉCHANTILLONNAGE DES COMBINAISONS ---
+def combinaisons(espace, nb_aleatoires=None, graine=0):
+    """Grille complète, ou nb_aleatoires combinaisons tirées sans remise dans la grille"""
+    cles = list(espace)
+    total = int(np.prod([len(espace[c]) for c in cles]))
+    if nb_aleatoires is None or nb_aleatoires >= total:
+        return [dict(zip(cles, valeurs)) for valeurs in itertools.product(*(espace[c] for c in cles))]
+    tirage = random.Random(graine).sample(range(total), nb_aleatoires)
+    resultat = []
+    for n in tirage:
+        combo = {}
+        for c in reversed(cles): # Décodage de l'indice dans la grille (base mixte)
+            n, i = divmod(n, len(espace[c]))
+            combo[c] = espace[c][i]
+        resultat.append({c: combo[c] for c in cles})
+    return resultat
+
+# --- PANEL EN MÉMOIRE PARTAGÉE ---
+_PANEL = {}  # Dans chaque processus : vues numpy sur le bloc partagé + cache d'indicateurs
+
+def _partager(high, low, close):
+    """Copie High/Low/Close dans UN bloc de mémoire partagée -> (bloc, description)"""
+    tableaux = {"high": high, "low": low, "close": close}
+    bloc = shared_memory.SharedMemory(create=True, size=sum(a.nbytes for a in tableaux.values()))
+    description, decalage = [], 0
+    for nom, a in tableaux.items():
+        vue = np.ndarray(a.shape, dtype=np.float64, buffer=bloc.buf, offset=decalage)
+        vue[:] = a
+        description.append((nom, a.shape, decalage))
+        decalage += a.nbytes
+    return bloc, description
+
+def _initialiser_processus(nom_bloc, description, tickers, strategie):
+    bloc = shared_memory.SharedMemory(name=nom_bloc)
+    _PANEL.update(bloc=bloc, tickers=tickers, strategie=strategie, cache={})
+    for nom, forme, decalage in description:
+        _PANEL[nom] = np.ndarray(forme, dtype=np.float64, buffer=bloc.buf, offset=decalage)
+
+def _evaluer(params):
+    trades = backtester_panel(_PANEL["tickers"], _PANEL["high"], _PANEL["low"], _PANEL["close"],
+                              params, strategie=_PANEL["strategie"], cache=_PANEL["cache"])
+    return params, statistiques(trier_trades(trades))
+
+def evaluer_combinaisons(tickers, high, low, close, liste_params, strategie="h1", nb_processus=None):
+    """Backtest de chaque combinaison sur le panel partagé -> [(params, stats)] dans l'ordre"""
+    bloc, description = _partager(high, low, close)
+    try:
+        with Pool(nb_processus, initializer=_initialiser_processus,
+                  initargs=(bloc.name, description, tickers, strategie)) as pool:
+            # Tâches groupées : le cache d'indicateurs d'un processus sert à plusieurs combinaisons
+            taille = max(1, len(liste_params) // (4 * (nb_processus or os.cpu_count() or 1)))
+            return pool.map(_evaluer, liste_params, chunksize=taille)
+    finally:
+        bloc.close()
+        bloc.unlink()
+
+# --- CLASSEMENT & EXPORT ---
+def classer(resultats, critere="rendement", min_trades=MIN_TRADES):
+    valides = [(p, s) for p, s in resultats if s["nb_trades"] >= min_trades]
+    return sorted(valides, key=lambda r: CRITERES[critere](r[1]))
+
+def exporter_meilleure(classement, strategie, critere, fichier=FICHIER_PARAMETRES):
+    """Écrit la meilleure config dans parametres_strategie.json (les autres stratégies sont conservées)"""
+    if not classement: return None
+    params, stats = classement[0]
+    try:
+        with open(fichier, "r") as f: contenu = json.load(f)
+    except (OSError, ValueError): contenu = {}
+    contenu[strategie] = {**PARAMS_DEFAUT[strategie], **params}
+    contenu.setdefault("_meta", {})[strategie] = {
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "critere": critere,
+        "stats": stats,
+    }
+    ecrire_json_atomique(fichier, contenu)
+    return contenu[strategie]
+
+def optimiser(tickers, strategie="h1", period=None, interval=None, nb_aleatoires=None,
+              critere="rendement", nb_processus=None, exporter=True):
+    """Charge le panel, évalue les combinaisons, classe et exporte la meilleure"""
+    noms, _, high, low, close = charger_panel(tickers, period or PERIODES[strategie], interval or INTERVALLES[strategie])
+    liste_params = combinaisons(ESPACES[strategie], nb_aleatoires)
+    print(f"\n🔬 Optimisation {strategie.upper()} : {len(liste_params)} combinaisons x {len(noms)} tickers x {close.shape[1]} bougies")
+
+    debut = time.time()
+    resultats = evaluer_combinaisons(noms, high, low, close, liste_params, strategie, nb_processus)
+    classement = classer(resultats, critere)
+    print(f"   ⏱️ {time.time() - debut:.1f}s ({len(classement)} configs classées sur {len(resultats)})")
+
+    if exporter and classement:
+        exporter_meilleure(classement, strategie, critere)
+        print(f"   💾 Meilleure config exportée dans {FICHIER_PARAMETRES}")
+    return classement
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Optimisation des seuils de stratégie")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--strategie", choices=list(ESPACES), default="h1")
+    parser.add_argument("--period", default=None)
+    parser.add_argument("--interval", default=None)
+    parser.add_argument("--aleatoire", type=int, default=None, help="Nb de combinaisons tirées au hasard (défaut : grille complète)")
+    parser.add_argument("--critere", choices=list(CRITERES), default="rendement")
+    parser.add_argument("--processus", type=int, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--sans-export", action="store_true")
+    args = parser.parse_args()
+
+    classement = optimiser(args.tickers, args.strategie, args.period, args.interval, args.aleatoire,
+                           args.critere, args.processus, not args.sans_export)
+
+    print(f"\n🏆 TOP {args.top} ({args.critere})")
+    for params, stats in classement[:args.top]:
+        print(f"   📈 {stats['performance_cumulee']:8.2f}% | 🎯 {stats['win_rate']:5.1f}% | "
+              f"📉 DD {stats['max_drawdown']:6.2f}% | 🔢 {stats['nb_trades']:5d} | {params}")
@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from metriques import enregistrer
+
+# ==============================================================================
+# PIPELINE DE SCAN CONCURRENT
+# ==============================================================================
+# Les candidats sont analysés en parallèle (un thread par candidat), mais chaque
+# appel réseau passe par etape() qui :
+#   - limite le nombre d'appels simultanés PAR BACKEND (Grok / Yahoo)
+#   - coupe l'attente au bout du timeout de l'étape (le candidat est abandonné)
+# Les décisions (achat, doublons, MAX_POSITIONS) se prennent sous VERROU_PORTEFEUILLE.
+
+NB_WORKERS = 8  # Candidats traités en même temps
+
+# Appels simultanés autorisés par backend
+LIMITES_BACKENDS = {
+    "grok": 4,
+    "yahoo": 3,
+}
+
+# Timeout (secondes) par étape du pipeline
+TIMEOUTS_ETAPES = {
+    "agent_analyste": 60,
+    "agent_analyste_batch": 120,
+    "agent_detecteur_organique": 60,
+    "agent_financier_yahoo_pro": 30,
+    "analyse_moyen_terme": 30,
+}
+TIMEOUT_DEFAUT = 60
+
+# Protège la lecture "portefeuille plein ?" + l'écriture du trade (et les listes de doublons)
+VERROU_PORTEFEUILLE = threading.RLock()
+
+_SEMAPHORES = {b: threading.BoundedSemaphore(n) for b, n in LIMITES_BACKENDS.items()}
+# Assez de threads pour que chaque appel autorisé par les sémaphores démarre tout de suite
+_EXECUTEUR_IO = ThreadPoolExecutor(max_workers=sum(LIMITES_BACKENDS.values()), thread_name_prefix="io")
+
+def etape(backend, fonction, *args, timeout=None):
+    """
+    Appelle fonction(*args) sous la limite du backend.
+    Renvoie None en cas de timeout ou d'erreur (comme les agents eux-mêmes).
+    """
+    nom = fonction.__name__
+    timeout = timeout or TIMEOUTS_ETAPES.get(nom, TIMEOUT_DEFAUT)
+    semaphore = _SEMAPHORES[backend]
+
+    semaphore.acquire()
+    try:
+        future = _EXECUTEUR_IO.submit(fonction, *args)
+    except Exception:
+        semaphore.release()
+        raise
+    # La place n'est libérée qu'à la VRAIE fin de l'appel (même abandonné après timeout)
+    future.add_done_callback(lambda f: semaphore.release())
+
+    try:
+        return future.result(timeout=timeout)
+    except FuturesTimeout:
+        print(f"      ⏱️ {nom}({args[0] if args else ''}) > {timeout}s. Étape abandonnée.")
+        # L'appel lui-même sera mesuré à sa vraie fin ; ici on compte l'abandon
+        enregistrer(f"timeout_{nom}", timeout, args[0] if args and isinstance(args[0], str) else None, erreur=True)
+        return None
+    except Exception as e:
+        print(f"      ❌ {nom}({args[0] if args else ''}) : {e}")
+        return None
+
+def lancer_en_parallele(cibles, traiter_candidat, nb_workers=NB_WORKERS):
+    """Applique traiter_candidat(ticker) à toutes les cibles en parallèle (résultats dans l'ordre)"""
+    cibles = list(dict.fromkeys(cibles)) # Dédoublonnage, ordre conservé
+    resultats = []
+    with ThreadPoolExecutor(max_workers=nb_workers, thread_name_prefix="scan") as pool:
+        futures = [pool.submit(traiter_candidat, ticker) for ticker in cibles]
+        for ticker, future in zip(cibles, futures):
+            try:
+                resultats.append(future.result())
+            except Exception as e:
+                print(f"\n❌ Erreur candidat {ticker} : {e}")
+                resultats.append(None)
+    return resultats
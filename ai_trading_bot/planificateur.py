@@ -0,0 +1,130 @@
+import time
+import asyncio
+
+# ==============================================================================
+# PLANIFICATEUR ASYNCIO (boucle principale des bots)
+# ==============================================================================
+# Chaque tâche (surveillance SL/TP, Telegram, scan, equity) tourne dans sa propre
+# coroutine avec son intervalle : un scan de 5 minutes ne retarde plus les sorties.
+# Les fonctions restent synchrones (requests, yfinance...) : elles sont exécutées
+# dans un thread via asyncio.to_thread, la boucle ne fait que les cadencer.
+#   - intervalle : cadence fixe (les exécutions manquées sont sautées, pas rattrapées)
+#   - delai_max  : au-delà, l'exécution est signalée "en retard" (un thread ne peut pas
+#                  être tué : on attend sa fin avant de relancer la même tâche)
+#   - métriques  : retard au démarrage (lag), durée, dépassements, échecs
+SEUIL_ALERTE_RETARD = 5  # secondes de lag avant d'afficher un avertissement
+
+class Tache:
+    def __init__(self, nom, fonction, intervalle, delai_max=None, immediat=True):
+        self.nom = nom
+        self.fonction = fonction
+        self.intervalle = intervalle
+        self.delai_max = delai_max
+        self.immediat = immediat
+        # Métriques
+        self.executions = 0
+        self.echecs = 0
+        self.depassements = 0
+        self.retard_max = 0.0
+        self.retard_total = 0.0
+        self.derniere_duree = None
+        self.duree_max = 0.0
+        self.derniere_fin = None
+
+    def metriques(self):
+        return {
+            "executions": self.executions,
+            "echecs": self.echecs,
+            "depassements": self.depassements,
+            "retard_moyen": self.retard_total / self.executions if self.executions else 0.0,
+            "retard_max": self.retard_max,
+            "derniere_duree": self.derniere_duree,
+            "duree_max": self.duree_max,
+            "derniere_fin": self.derniere_fin,
+        }
+
+class Planificateur:
+    def __init__(self):
+        self.taches = []
+        self._arret = None
+        self._boucle = None
+
+    def ajouter(self, nom, fonction, intervalle, delai_max=None, immediat=True):
+        """Enregistre fonction() toutes les `intervalle` secondes (1re exécution tout de suite si immediat)"""
+        self.taches.append(Tache(nom, fonction, intervalle, delai_max, immediat))
+
+    async def _executer_tache(self, tache):
+        boucle = asyncio.get_running_loop()
+        prochain = boucle.time() + (0 if tache.immediat else tache.intervalle)
+        while True:
+            await asyncio.sleep(max(0.0, prochain - boucle.time()))
+
+            debut = boucle.time()
+            retard = debut - prochain
+            tache.retard_total += retard
+            tache.retard_max = max(tache.retard_max, retard)
+            if retard > SEUIL_ALERTE_RETARD:
+                print(f"\n⏱️ Tâche '{tache.nom}' démarrée avec {retard:.1f}s de retard.")
+
+            execution = asyncio.ensure_future(asyncio.to_thread(tache.fonction))
+            try:
+                # shield : en cas de dépassement on arrête d'attendre, pas le thread
+                await asyncio.wait_for(asyncio.shield(execution), timeout=tache.delai_max)
+            except asyncio.TimeoutError:
+                tache.depassements += 1
+                print(f"\n⏱️ Tâche '{tache.nom}' > {tache.delai_max}s (délai dépassé), fin attendue avant relance.")
+                try: await execution
+                except Exception: pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                tache.echecs += 1
+                print(f"\n❌ Erreur tâche '{tache.nom}' : {e}")
+
+            fin = boucle.time()
+            tache.executions += 1
+            tache.derniere_duree = fin - debut
+            tache.duree_max = max(tache.duree_max, tache.derniere_duree)
+            tache.derniere_fin = time.time()
+
+            # Cadence fixe ; si l'exécution a débordé sur la suivante, on repart de maintenant
+            prochain += tache.intervalle
+            if prochain < fin: prochain = fin
+
+    async def executer(self, duree=None):
+        """Lance toutes les tâches jusqu'à arreter() (ou `duree` secondes), puis les annule"""
+        self._boucle = asyncio.get_running_loop()
+        self._arret = asyncio.Event()
+        coroutines = [asyncio.create_task(self._executer_tache(t), name=t.nom) for t in self.taches]
+        try:
+            if duree is None: await self._arret.wait()
+            else:
+                try: await asyncio.wait_for(self._arret.wait(), timeout=duree)
+                except asyncio.TimeoutError: pass
+        finally:
+            for c in coroutines: c.cancel()
+            await asyncio.gather(*coroutines, return_exceptions=True)
+
+    def arreter(self):
+        """Demande l'arrêt (utilisable depuis n'importe quel thread)"""
+        if self._boucle is not None and self._arret is not None:
+            self._boucle.call_soon_threadsafe(self._arret.set)
+
+    def metriques(self):
+        return {t.nom: t.metriques() for t in self.taches}
+
+    def rapport(self):
+        lignes = ["📊 Tâches planifiées :"]
+        for nom, m in self.metriques().items():
+            duree = f"{m['derniere_duree']:.1f}s" if m['derniere_duree'] is not None else "-"
+            lignes.append(f"   • {nom} : {m['executions']} exéc. | lag moy {m['retard_moyen']:.2f}s / max {m['retard_max']:.2f}s"
+                          f" | durée {duree} (max {m['duree_max']:.1f}s) | ⏱️ {m['depassements']} | ❌ {m['echecs']}")
+        return "\n".join(lignes)
+
+    def lancer(self):
+        """Point d'entrée bloquant des bots (Ctrl+C = arrêt propre)"""
+        try:
+            asyncio.run(self.executer())
+        except KeyboardInterrupt:
+            print("\n🛑 Arrêt manuel. Attente de la fin des tâches en cours...")
+        print(self.rapport())
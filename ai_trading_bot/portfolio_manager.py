@@ -1,107 +1,270 @@
-import json
-import os
-from datetime import datetime
-
-FICHIER_PORTFOLIO = "portfolio.json"
-FICHIER_HISTORIQUE = "trades_history.json"
-
-# --- GESTION DU PORTEFEUILLE ACTIF ---
-def charger_portfolio():
-    if not os.path.exists(FICHIER_PORTFOLIO): return {}
-    try:
-        with open(FICHIER_PORTFOLIO, "r") as f: return json.load(f)
-    except: return {}
-
-def sauvegarder_trade(ticker, data_trade):
-    portfolio = charger_portfolio()
-    # On ajoute la date d'entrée si elle n'existe pas
-    if "date_entry" not in data_trade:
-        data_trade["date_entry"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-    
-    portfolio[ticker] = data_trade
-    with open(FICHIER_PORTFOLIO, "w") as f: json.dump(portfolio, f, indent=4)
-    print(f"   💾 {ticker} sauvegardé dans le portefeuille.")
-
-def supprimer_trade(ticker):
-    portfolio = charger_portfolio()
-    if ticker in portfolio:
-        del portfolio[ticker]
-        with open(FICHIER_PORTFOLIO, "w") as f: json.dump(portfolio, f, indent=4)
-
-# --- NOUVEAU : GESTION DE L'HISTORIQUE (P&L) ---
-
-def archiver_trade_termine(ticker, data_trade, prix_sortie, raison):
-    """
-    Déplace un trade fini vers l'historique et calcule le profit
-    """
-    historique = []
-    if os.path.exists(FICHIER_HISTORIQUE):
-        try:
-            with open(FICHIER_HISTORIQUE, "r") as f: historique = json.load(f)
-        except: pass
-    
-    prix_entree = data_trade['entry_price']
-    # Calcul du profit en % : ((Sortie - Entrée) / Entrée) * 100
-    profit_percent = ((prix_sortie - prix_entree) / prix_entree) * 100
-    
-    entree_historique = {
-        "ticker": ticker,
-        "entry_price": prix_entree,
-        "exit_price": prix_sortie,
-        "profit_percent": round(profit_percent, 2),
-        "date_entry": data_trade.get("date_entry", "?"),
-        "date_exit": datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "reason": raison # "TAKE PROFIT" ou "STOP LOSS"
-    }
-    
-    historique.append(entree_historique)
-    
-    with open(FICHIER_HISTORIQUE, "w") as f:
-        json.dump(historique, f, indent=4)
-    
-    print(f"   📜 Trade {ticker} archivé (P&L: {profit_percent:.2f}%)")
-
-def generer_rapport_performance():
-    """Calcule les stats globales"""
-    if not os.path.exists(FICHIER_HISTORIQUE):
-        return "📉 Aucun historique de trade pour le moment."
-    
-    try:
-        with open(FICHIER_HISTORIQUE, "r") as f: historique = json.load(f)
-    except: return "⚠️ Erreur lecture historique."
-
-    if not historique: return "📉 Historique vide."
-
-    total_trades = len(historique)
-    wins = 0
-    losses = 0
-    total_percent_gain = 0
-    
-    details_str = ""
-
-    # On parcourt les 5 derniers trades pour le détail
-    for trade in historique[-5:]:
-        icon = "✅" if trade['profit_percent'] > 0 else "❌"
-        details_str += f"{icon} {trade['ticker']}: {trade['profit_percent']}%\n"
-
-    # Calcul des totaux
-    for trade in historique:
-        p = trade['profit_percent']
-        total_percent_gain += p
-        if p > 0: wins += 1
-        else: losses += 1
-    
-    win_rate = (wins / total_trades) * 100
-    
-    rapport = (
-        f"📊 <b>RAPPORT DE PERFORMANCE</b>\n"
-        f"---------------------------\n"
-        f"🔢 Total Trades : {total_trades}\n"
-        f"🏆 Gagnés : {wins} | 🗑️ Perdus : {losses}\n"
-        f"🎯 <b>Win Rate : {win_rate:.1f}%</b>\n"
-        f"📈 <b>Performance cumulée : {total_percent_gain:.2f}%</b>\n"
-        f"---------------------------\n"
-        f"🕒 <i>Derniers trades :</i>\n"
-        f"{details_str}"
-    )
+import json
+import os
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from metriques import instrumenter, mesurer
+
+FICHIER_PORTFOLIO = "portfolio.json"
+FICHIER_HISTORIQUE = "trades_history.json"
+
+# --- STOCKAGE TRANSACTIONNEL ---
+# Lectures : cache en mémoire, invalidé dès que le fichier change sur disque
+#            (signature inode + taille + date de modif) -> 1 simple stat() par lecture.
+# Écritures : verrou inter-processus (fichier .lock) + relecture + écriture atomique
+#            (fichier temporaire puis rename) -> plus de positions perdues ni de JSON tronqué.
+DELAI_VERROU = 10       # Attente max du verrou (secondes)
+VERROU_PERIME = 30      # Un verrou plus vieux que ça est considéré abandonné (crash)
+
+_VERROU_LOCAL = threading.RLock()
+_CACHE = [None, {}]  # [signature, portfolio] remplacés d'un bloc (lecture sûre entre threads)
+
+def _signature(chemin):
+    try:
+        st = os.stat(chemin)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    except OSError:
+        return None
+
+@contextmanager
+def verrou_fichier(chemin):
+    """Verrou exclusif entre processus (bots + dashboard), portable Windows/Linux"""
+    fichier_verrou = chemin + ".lock"
+    debut = time.time()
+    with _VERROU_LOCAL:
+        while True:
+            try:
+                fd = os.open(fichier_verrou, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(fichier_verrou) > VERROU_PERIME:
+                        os.remove(fichier_verrou)
+                        continue
+                except OSError: continue
+                if time.time() - debut > DELAI_VERROU:
+                    raise TimeoutError(f"Verrou {fichier_verrou} indisponible")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            try: os.remove(fichier_verrou)
+            except OSError: pass
+
+def ecrire_json_atomique(chemin, data):
+    tmp = f"{chemin}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, chemin)
+
+def _lire_portfolio():
+    """Lecture via le cache mémoire (relit le disque uniquement si le fichier a changé)"""
+    signature = _signature(FICHIER_PORTFOLIO)
+    if signature is None: return {}
+    cache_signature, cache_portfolio = _CACHE
+    if signature == cache_signature: return cache_portfolio
+    try:
+        with mesurer("portfolio_lecture"):
+            with open(FICHIER_PORTFOLIO, "r") as f: portfolio = json.load(f)
+    except: return {}
+    _CACHE[:] = [signature, portfolio]
+    return portfolio
+
+def _ecrire_portfolio(portfolio):
+    with mesurer("portfolio_ecriture"):
+        ecrire_json_atomique(FICHIER_PORTFOLIO, portfolio)
+    _CACHE[:] = [_signature(FICHIER_PORTFOLIO), {t: dict(d) for t, d in portfolio.items()}]
+
+# --- GESTION DU PORTEFEUILLE ACTIF ---
+def charger_portfolio():
+    # Copie : l'appelant peut modifier le résultat sans toucher au cache
+    return {t: dict(d) for t, d in _lire_portfolio().items()}
+
+def sauvegarder_trade(ticker, data_trade):
+    # On ajoute la date d'entrée si elle n'existe pas
+    if "date_entry" not in data_trade:
+        data_trade["date_entry"] = datetime.now().strftime("%Y-%m-%d %H:%M")
+    
+    with verrou_fichier(FICHIER_PORTFOLIO):
+        portfolio = charger_portfolio()
+        portfolio[ticker] = data_trade
+        _ecrire_portfolio(portfolio)
+    print(f"   💾 {ticker} sauvegardé dans le portefeuille.")
+
+def supprimer_trade(ticker):
+    with verrou_fichier(FICHIER_PORTFOLIO):
+        portfolio = charger_portfolio()
+        if ticker in portfolio:
+            del portfolio[ticker]
+            _ecrire_portfolio(portfolio)
+
+# --- NOUVEAU : GESTION DE L'HISTORIQUE (P&L) ---
+# Journal en ajout seul (table SQLite) : archiver un trade = 1 INSERT, quelle que soit
+# la taille de l'historique. Index par date de sortie et par ticker pour les lectures
+# partielles. L'ancien trades_history.json est importé une fois puis renommé en .migre.
+
+# Le P&L réalisé total est tenu à jour dans la table agregats, dans la MÊME transaction
+# que l'INSERT du trade : le lire ne coûte qu'une requête, quelle que soit la taille de l'historique.
+FICHIER_BASE_HISTORIQUE = "historique.db"
+COLONNES_HISTORIQUE = ["ticker", "entry_price", "exit_price", "profit_percent",
+                       "date_entry", "date_exit", "reason", "profit_loss_amount"]
+_HISTORIQUE_MIGRE = False
+
+@contextmanager
+def _connexion_historique():
+    conn = sqlite3.connect(FICHIER_BASE_HISTORIQUE, timeout=10)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS trades (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, ticker TEXT, entry_price REAL, exit_price REAL,
+            profit_percent REAL, date_entry TEXT, date_exit TEXT, reason TEXT, profit_loss_amount REAL)""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_date ON trades(date_exit)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_ticker ON trades(ticker, date_exit)")
+        conn.execute("CREATE TABLE IF NOT EXISTS agregats (cle TEXT PRIMARY KEY, valeur REAL, nb INTEGER)")
+        with conn:
+            # Base créée avant l'agrégat : on le calcule une fois depuis les trades
+            if conn.execute("SELECT 1 FROM agregats WHERE cle = 'pnl_realise'").fetchone() is None:
+                _reconstruire_pnl(conn)
+        with conn: yield conn
+    finally:
+        conn.close()
+
+# Gain d'un trade en $ : profit_loss_amount s'il est renseigné, sinon Sortie - Entrée (1 action)
+SQL_GAIN = "COALESCE(profit_loss_amount, exit_price - entry_price, 0)"
+
+def _gain(trade):
+    if trade.get("profit_loss_amount") is not None: return float(trade["profit_loss_amount"])
+    if trade.get("exit_price") is not None and trade.get("entry_price") is not None:
+        return float(trade["exit_price"]) - float(trade["entry_price"])
+    return 0.0
+
+def _reconstruire_pnl(conn):
+    total, nb = conn.execute(f"SELECT COALESCE(SUM({SQL_GAIN}), 0), COUNT(*) FROM trades").fetchone()
+    conn.execute("INSERT OR REPLACE INTO agregats VALUES ('pnl_realise', ?, ?)", (total, nb))
+
+def _inserer(conn, trade):
+    conn.execute(f"INSERT INTO trades ({', '.join(COLONNES_HISTORIQUE)}) VALUES ({', '.join('?' * len(COLONNES_HISTORIQUE))})",
+                 [trade.get(c) for c in COLONNES_HISTORIQUE])
+    conn.execute("UPDATE agregats SET valeur = valeur + ?, nb = nb + 1 WHERE cle = 'pnl_realise'", (_gain(trade),))
+
+def reconstruire_pnl_realise():
+    """Recalcule l'agrégat depuis tout l'historique (après une modification manuelle de la base)"""
+    migrer_historique_json()
+    with _connexion_historique() as conn:
+        _reconstruire_pnl(conn)
+    return pnl_realise()
+
+def pnl_realise():
+    """P&L réalisé total en $ (agrégat tenu à jour à chaque trade archivé)"""
+    migrer_historique_json()
+    with _connexion_historique() as conn:
+        ligne = conn.execute("SELECT valeur FROM agregats WHERE cle = 'pnl_realise'").fetchone()
+    return float(ligne[0]) if ligne else 0.0
+
+def migrer_historique_json():
+    """Import unique de l'ancien trades_history.json dans le journal"""
+    global _HISTORIQUE_MIGRE
+    if _HISTORIQUE_MIGRE: return
+    if os.path.exists(FICHIER_HISTORIQUE):
+        with verrou_fichier(FICHIER_HISTORIQUE):
+            if os.path.exists(FICHIER_HISTORIQUE): # Un autre processus a pu migrer entre temps
+                try:
+                    with open(FICHIER_HISTORIQUE, "r") as f: historique = json.load(f)
+                except: historique = []
+                # La migration est notée dans la MÊME transaction que les INSERT : un arrêt
+                # avant le renommage ne ré-importe pas (ni ne double) l'historique au démarrage suivant
+                with _connexion_historique() as conn:
+                    deja_migre = conn.execute("SELECT 1 FROM agregats WHERE cle = 'migration_json'").fetchone()
+                    if not deja_migre:
+                        for trade in historique: _inserer(conn, trade)
+                        conn.execute("INSERT INTO agregats VALUES ('migration_json', NULL, ?)", (len(historique),))
+                os.replace(FICHIER_HISTORIQUE, FICHIER_HISTORIQUE + ".migre")
+                if not deja_migre: print(f"   📜 {len(historique)} trades migrés vers {FICHIER_BASE_HISTORIQUE}")
+    _HISTORIQUE_MIGRE = True
+
+@instrumenter("historique_lecture")
+def charger_historique(depuis=None, jusqu_a=None, ticker=None, derniers=None):
+    """
+    Lit l'historique (ordre chronologique) sans tout parser :
+    depuis / jusqu_a = bornes sur date_exit ("YYYY-MM-DD HH:MM"), ticker = filtre,
+    derniers = uniquement les N trades les plus récents.
+    """
+    migrer_historique_json()
+    conditions, params = [], []
+    if depuis: conditions.append("date_exit >= ?"); params.append(depuis)
+    if jusqu_a: conditions.append("date_exit <= ?"); params.append(jusqu_a)
+    if ticker: conditions.append("ticker = ?"); params.append(ticker)
+    requete = "SELECT * FROM trades"
+    if conditions: requete += " WHERE " + " AND ".join(conditions)
+    requete += " ORDER BY id DESC"
+    if derniers: requete += f" LIMIT {int(derniers)}"
+
+    with _connexion_historique() as conn:
+        lignes = conn.execute(requete, params).fetchall()
+    return [{c: l[c] for c in COLONNES_HISTORIQUE if l[c] is not None} for l in reversed(lignes)]
+
+@instrumenter("historique_ecriture")
+def archiver_trade_termine(ticker, data_trade, prix_sortie, raison):
+    """
+    Déplace un trade fini vers l'historique et calcule le profit
+    """
+    migrer_historique_json()
+    prix_entree = data_trade['entry_price']
+    # Calcul du profit en % : ((Sortie - Entrée) / Entrée) * 100
+    profit_percent = ((prix_sortie - prix_entree) / prix_entree) * 100
+    
+    entree_historique = {
+        "ticker": ticker,
+        "entry_price": prix_entree,
+        "exit_price": prix_sortie,
+        "profit_percent": round(profit_percent, 2),
+        "date_entry": data_trade.get("date_entry", "?"),
+        "date_exit": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "reason": raison # "TAKE PROFIT" ou "STOP LOSS"
+    }
+    
+    with _connexion_historique() as conn:
+        _inserer(conn, entree_historique)
+    
+    print(f"   📜 Trade {ticker} archivé (P&L: {profit_percent:.2f}%)")
+
+def generer_rapport_performance():
+    """Calcule les stats globales"""
+    try:
+        migrer_historique_json()
+        with _connexion_historique() as conn:
+            total_trades, wins, total_percent_gain = conn.execute(
+                "SELECT COUNT(*), SUM(profit_percent > 0), SUM(profit_percent) FROM trades").fetchone()
+    except: return "⚠️ Erreur lecture historique."
+
+    if not total_trades: return "📉 Aucun historique de trade pour le moment."
+
+    losses = total_trades - wins
+    
+    details_str = ""
+
+    # On parcourt les 5 derniers trades pour le détail
+    for trade in charger_historique(derniers=5):
+        icon = "✅" if trade['profit_percent'] > 0 else "❌"
+        details_str += f"{icon} {trade['ticker']}: {trade['profit_percent']}%\n"
+
+    win_rate = (wins / total_trades) * 100
+    
+    rapport = (
+        f"📊 <b>RAPPORT DE PERFORMANCE</b>\n"
+        f"---------------------------\n"
+        f"🔢 Total Trades : {total_trades}\n"
+        f"🏆 Gagnés : {wins} | 🗑️ Perdus : {losses}\n"
+        f"🎯 <b>Win Rate : {win_rate:.1f}%</b>\n"
+        f"📈 <b>Performance cumulée : {total_percent_gain:.2f}%</b>\n"
+        f"---------------------------\n"
+        f"🕒 <i>Derniers trades :</i>\n"
+        f"{details_str}"
+    )
     return rapport
\ No newline at end of file
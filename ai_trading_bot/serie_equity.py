@@ -0,0 +1,120 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# COURBE DE PERFORMANCE : STOCKAGE SÉRIE TEMPORELLE + SOUS-ÉCHANTILLONNAGE
+# ==============================================================================
+# Les points d'equity (un toutes les 30 min, pour toujours) sont rangés dans une table
+# SQLite compacte (horodatage entier en clé primaire, WITHOUT ROWID) au lieu d'un CSV
+# qui grossit sans fin. L'ancien equity_log.csv est importé une fois puis renommé en .migre.
+# - LecteurEquity garde en mémoire les points déjà lus : à chaque rafraîchissement,
+#   seuls les points plus récents que le dernier connu sont lus.
+# - lttb() réduit une série à n points en gardant sa forme (pics et creux),
+#   pour que le navigateur n'ait pas à dessiner des dizaines de milliers de points.
+
+FICHIER_BASE_EQUITY = "historique.db"   # Même base que le journal des trades
+FICHIER_EQUITY = "equity_log.csv"       # Ancien format (migré)
+COLONNES_EQUITY = ["Date", "Total_PNL", "Realise", "Latent"]
+_EQUITY_MIGREE = False
+
+@contextmanager
+def _connexion():
+    conn = sqlite3.connect(FICHIER_BASE_EQUITY, timeout=10)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS equity (
+            ts INTEGER PRIMARY KEY, total REAL, realise REAL, latent REAL) WITHOUT ROWID""")
+        with conn: yield conn
+    finally:
+        conn.close()
+
+def migrer_equity_csv():
+    """Import unique de l'ancien equity_log.csv dans la table equity"""
+    global _EQUITY_MIGREE
+    if _EQUITY_MIGREE: return
+    if os.path.exists(FICHIER_EQUITY):
+        try:
+            df = pd.read_csv(FICHIER_EQUITY)
+            ts = pd.to_datetime(df["Date"], errors="coerce")
+            df = df[ts.notna()]
+            secondes = ((ts[ts.notna()] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)).tolist()
+            lignes = zip(secondes, df["Total_PNL"], df["Realise"], df["Latent"])
+            with _connexion() as conn:
+                conn.executemany("INSERT OR REPLACE INTO equity VALUES (?, ?, ?, ?)", lignes)
+            os.replace(FICHIER_EQUITY, FICHIER_EQUITY + ".migre")
+            print(f"   📈 {len(df)} points d'equity migrés vers {FICHIER_BASE_EQUITY}")
+        except Exception as e:
+            print(f"⚠️ Migration {FICHIER_EQUITY} impossible : {e}")
+            return
+    _EQUITY_MIGREE = True
+
+def enregistrer_point(total, realise, latent, horodatage=None):
+    """Ajoute un point à la courbe (horodatage = heure locale, en secondes, comme le CSV d'origine)"""
+    migrer_equity_csv()
+    if horodatage is None:
+        horodatage = int(pd.Timestamp.now().timestamp()) # Heure locale "naïve", relue telle quelle par charger_equity
+    with _connexion() as conn:
+        conn.execute("INSERT OR REPLACE INTO equity VALUES (?, ?, ?, ?)",
+                     (int(horodatage), float(total), float(realise), float(latent)))
+
+def charger_equity(apres=None):
+    """Points de la courbe (DataFrame Date/Total_PNL/Realise/Latent), ceux d'après `apres` (secondes) si donné"""
+    migrer_equity_csv()
+    requete, params = "SELECT ts, total, realise, latent FROM equity", ()
+    if apres is not None: requete, params = requete + " WHERE ts > ?", (int(apres),)
+    with _connexion() as conn:
+        lignes = conn.execute(requete + " ORDER BY ts", params).fetchall()
+    df = pd.DataFrame(lignes, columns=["ts", "Total_PNL", "Realise", "Latent"])
+    df.insert(0, "Date", pd.to_datetime(df.pop("ts"), unit="s"))
+    return df
+
+class LecteurEquity:
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.df = pd.DataFrame(columns=COLONNES_EQUITY)
+        self.dernier = None   # Horodatage (s) du dernier point lu
+
+    def lire(self):
+        """Toute la courbe, en ne lisant dans la base que les points ajoutés depuis le dernier appel"""
+        with self._verrou:
+            nouveau = charger_equity(self.dernier)
+            if not nouveau.empty:
+                self.df = pd.concat([self.df, nouveau], ignore_index=True) if len(self.df) else nouveau
+                self.dernier = int(nouveau["Date"].iloc[-1].timestamp())
+            return self.df
+
+def lttb(x, y, n):
+    """
+    Largest-Triangle-Three-Buckets : renvoie les INDICES des n points à garder.
+    Le premier et le dernier point sont toujours conservés.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    taille = len(x)
+    if n >= taille or n < 3: return np.arange(taille)
+
+    indices = np.empty(n, dtype=int)
+    indices[0], indices[-1] = 0, taille - 1
+    # Bornes des n-2 seaux intermédiaires
+    bornes = np.linspace(1, taille - 1, n - 1).astype(int)
+    a = 0
+    for i in range(n - 2):
+        debut, fin = bornes[i], bornes[i + 1]
+        # Point moyen du seau suivant (le dernier point pour le dernier seau)
+        s_debut, s_fin = bornes[i + 1], bornes[i + 2] if i + 2 < len(bornes) else taille
+        moy_x, moy_y = x[s_debut:s_fin].mean(), y[s_debut:s_fin].mean()
+        # Point du seau courant qui forme le plus grand triangle avec a et le point moyen
+        aires = np.abs((x[a] - moy_x) * (y[debut:fin] - y[a]) - (x[a] - x[debut:fin]) * (moy_y - y[a]))
+        a = debut + int(np.argmax(aires))
+        indices[i + 1] = a
+    return indices
+
+def reduire(df, n, colonne_x="Date", colonne_y="Total_PNL"):
+    """Sous-échantillonnage LTTB d'un DataFrame (inchangé s'il a déjà <= n lignes)"""
+    if len(df) <= n: return df
+    x = ((pd.to_datetime(df[colonne_x]) - pd.Timestamp(0)) / pd.Timedelta(seconds=1)).to_numpy()
+    return df.iloc[lttb(x, df[colonne_y].to_numpy(), n)]
@@ -0,0 +1,334 @@
+import os
+import sys
+import time
+import heapq
+import zlib
+import json
+import argparse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+import ai_agent
+import ml_manager
+import finance_agents
+import portfolio_manager
+import serie_equity
+import entrainement_bot
+from donnees_marche import telecharger_ohlcv, debut_periode, _decouper
+
+# ==============================================================================
+# SIMULATION ACCÉLÉRÉE DU BOT FULL-AUTO (HORLOGE VIRTUELLE)
+# ==============================================================================
+# Rejoue la logique INCHANGÉE de entrainement_bot (surveiller_positions, execution_automatique,
+# update_equity_curve, mode observateur à MAX_POSITIONS) sur des bougies enregistrées :
+#   - les tâches gardent leurs intervalles (10 s, 30 min...) mais sur une horloge virtuelle,
+#     qui saute directement à l'échéance suivante : un mois se rejoue en quelques minutes ;
+#   - Yahoo -> bougies en cache (une bougie n'est visible qu'une fois CLÔTURÉE : pas de futur) ;
+#   - Grok -> réponses enregistrées (JSON) ou simulées à partir du marché au temps virtuel
+#     (demander_grok est remplacé : pas d'appel réseau, donc pas de cache Grok) ;
+#   - Telegram -> journal telegram_simulation.log ;
+#   - ré-entraînement IA -> synchrone, après DELAI_DEBOUNCE secondes VIRTUELLES.
+# Les artefacts (portfolio.json, historique.db avec trades et equity, ml_dataset.csv, modeles/)
+# sont ceux de la production, écrits dans le dossier de simulation.
+# Une surveillance / un scan est sauté si ni le marché, ni le portefeuille, ni le modèle IA
+# n'ont changé depuis le précédent : il referait exactement la même chose.
+
+DUREES_BOUGIES = {"15m": 900, "30m": 1800, "60m": 3600, "1h": 3600, "1d": 86400}
+INTERVALLE_SIMULATION = "60m"
+PERIODE_SIMULATION = "1mo"
+DOSSIER_SIMULATION = "simulation"
+FICHIER_JOURNAL_TELEGRAM = "telegram_simulation.log"
+
+def _secondes(index):
+    """Index de bougies -> secondes epoch (un index sans fuseau est en heure locale, comme Yahoo en 1d)"""
+    if index.tz is None: index = index.tz_localize(datetime.now().astimezone().tzinfo)
+    return ((index.tz_convert("UTC") - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy()
+
+# --- HORLOGE ---
+class HorlogeVirtuelle:
+    def __init__(self, debut):
+        self.t = float(debut)
+
+    def maintenant(self):
+        """datetime local naïf, comme datetime.now()"""
+        return datetime.fromtimestamp(self.t)
+
+    def horodatage_local(self):
+        """Même convention que serie_equity (heure locale 'naïve' en secondes)"""
+        return int(pd.Timestamp(self.maintenant()).timestamp())
+
+def _classe_datetime(horloge):
+    """Sous-classe de datetime dont now() lit l'horloge virtuelle (remplace datetime dans les modules du bot)"""
+    class DatetimeVirtuel(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromtimestamp(horloge.t, tz)
+    return DatetimeVirtuel
+
+# --- MARCHÉ REJOUÉ ---
+class MarcheRejoue:
+    def __init__(self, frames, horloge, interval=INTERVALLE_SIMULATION):
+        self.horloge = horloge
+        self.interval = interval
+        self.frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+        duree = DUREES_BOUGIES.get(interval, 3600)
+        # Instant où chaque bougie est connue = son ouverture + sa durée
+        self.fins = {t: _secondes(df.index) + duree for t, df in self.frames.items()}
+        self._toutes_fins = np.sort(np.concatenate(list(self.fins.values()))) if self.fins else np.array([])
+
+    @property
+    def tickers(self):
+        return list(self.frames)
+
+    def bornes(self):
+        return self._toutes_fins[0], self._toutes_fins[-1]
+
+    def version(self):
+        """Change dès qu'une nouvelle bougie (n'importe quel ticker) devient visible"""
+        return int(np.searchsorted(self._toutes_fins, self.horloge.t, side="right"))
+
+    def _visibles(self, ticker):
+        if ticker not in self.frames: return None
+        n = int(np.searchsorted(self.fins[ticker], self.horloge.t, side="right"))
+        return self.frames[ticker].iloc[:n]
+
+    def ohlcv(self, ticker, period="1y", interval=None):
+        """Remplace telecharger_ohlcv : bougies clôturées au temps virtuel, sur la période demandée"""
+        df = self._visibles(ticker)
+        if df is None or df.empty: return pd.DataFrame()
+        maintenant = pd.Timestamp(self.horloge.t, unit="s", tz="UTC")
+        if df.index.tz is not None: maintenant = maintenant.tz_convert(df.index.tz)
+        else: maintenant = pd.Timestamp(self.horloge.maintenant())
+        return _decouper(df, debut_periode(period, df.index.tz, maintenant))
+
+    def ohlcv_batch(self, tickers, period="1y", interval=None):
+        return {t: self.ohlcv(t, period, interval) for t in tickers}
+
+    def cotations(self, tickers):
+        """Remplace source_cotations_yahoo : dernier Close connu de chaque ticker"""
+        prix = {}
+        for ticker in tickers:
+            df = self._visibles(ticker)
+            if df is not None and not df.empty: prix[ticker] = float(df["Close"].iloc[-1])
+        return prix
+
+# --- GROK SIMULÉ ---
+class GrokSimule:
+    """
+    Remplace ai_agent.demander_grok. Réponses enregistrées {agent: {ticker: réponse}} si fournies,
+    sinon tirées du marché au temps virtuel (déterministes : même rejeu = mêmes décisions) :
+      éclaireur = plus forts mouvements récents, diversification = tickers les plus calmes,
+      analyste = sentiment suivant la variation récente, détecteur = notes stables par ticker.
+    """
+    def __init__(self, marche, reponses=None, taille_liste=10, fenetre=7):
+        self.marche = marche
+        self.reponses = reponses or {}
+        self.taille_liste = taille_liste
+        self.fenetre = fenetre
+        self.nb_appels = {}
+
+    def _variation(self, ticker):
+        df = self.marche._visibles(ticker)
+        if df is None or len(df) <= self.fenetre: return None
+        close = df["Close"].to_numpy()[-self.fenetre - 1:]
+        return close[-1] / close[0] - 1, np.std(np.diff(np.log(close)))
+
+    def _classement(self, cle, inverse):
+        mesures = {t: self._variation(t) for t in self.marche.tickers}
+        mesures = {t: m for t, m in mesures.items() if m is not None}
+        return sorted(mesures, key=lambda t: cle(mesures[t]), reverse=inverse)[:self.taille_liste]
+
+    def _analyse(self, ticker):
+        mesure = self._variation(ticker)
+        variation = mesure[0] if mesure else 0.0
+        return {
+            "spam_ratio": 0.1,
+            "sentiment_score": round(float(np.tanh(variation * 20)), 2),
+            "volume_score": 0.5,
+            "sujet_principal": f"Mouvement récent de {ticker}",
+        }
+
+    def _detecteur(self, ticker):
+        notes = [4 + zlib.crc32(f"{ticker}|{i}".encode()) % 6 for i in range(3)]
+        return {"note_chaos": notes[0], "note_contexte": notes[1], "note_interaction": notes[2],
+                "type_foule": "Mixte", "explication": "Simulation"}
+
+    def __call__(self, agent, ticker, prompt, role="user", temperature=0.2):
+        self.nb_appels[agent] = self.nb_appels.get(agent, 0) + 1
+        enregistree = self.reponses.get(agent, {}).get(ticker)
+        if enregistree is not None:
+            return enregistree if isinstance(enregistree, str) else json.dumps(enregistree)
+
+        if agent == "agent_eclaireur":
+            reponse = {"liste_tickers": self._classement(lambda m: abs(m[0]), True)}
+        elif agent == "agent_chasseur_diversification":
+            reponse = {"liste_tickers": self._classement(lambda m: m[1], False)}
+        elif agent == "agent_analyste_batch":
+            reponse = {t: self._analyse(t) for t in ticker.split(",") if t}
+        elif agent == "agent_detecteur_organique":
+            reponse = self._detecteur(ticker)
+        else:
+            reponse = self._analyse(ticker)
+        return json.dumps(reponse)
+
+# --- BRANCHEMENT SUR LES MODULES DU BOT ---
+class Simulation:
+    def __init__(self, marche, horloge, grok):
+        self.marche = marche
+        self.horloge = horloge
+        self.grok = grok
+        self.messages = []            # (date virtuelle, texte) envoyés "sur Telegram"
+        self.entrainement_demande = None
+        self._sauvegardes = []
+
+    def _remplacer(self, module, nom, valeur):
+        self._sauvegardes.append((module, nom, getattr(module, nom)))
+        setattr(module, nom, valeur)
+
+    def _telegram(self, message):
+        self.messages.append((self.horloge.maintenant().strftime("%Y-%m-%d %H:%M"), message))
+
+    def _demander_entrainement(self):
+        self.entrainement_demande = self.horloge.t
+
+    def _enregistrer_point(self, total, realise, latent):
+        serie_equity.enregistrer_point(total, realise, latent, self.horloge.horodatage_local())
+
+    def __enter__(self):
+        DatetimeVirtuel = _classe_datetime(self.horloge)
+        for module in (entrainement_bot, portfolio_manager, ml_manager):
+            self._remplacer(module, "datetime", DatetimeVirtuel)
+        self._remplacer(ai_agent, "demander_grok", self.grok)
+        self._remplacer(finance_agents, "telecharger_ohlcv", self.marche.ohlcv)
+        self._remplacer(finance_agents, "telecharger_ohlcv_batch", self.marche.ohlcv_batch)
+        self._remplacer(entrainement_bot, "source_cotations_yahoo", self.marche.cotations)
+        self._remplacer(entrainement_bot, "envoyer_alerte_telegram", self._telegram)
+        self._remplacer(entrainement_bot, "enregistrer_point", self._enregistrer_point)
+        self._remplacer(ml_manager, "demander_entrainement", self._demander_entrainement)
+        return self
+
+    def __exit__(self, *exc):
+        for module, nom, valeur in reversed(self._sauvegardes): setattr(module, nom, valeur)
+        self._sauvegardes.clear()
+
+    def entrainer_si_du(self):
+        """Équivalent synchrone du thread de ml_manager (debounce en temps virtuel)"""
+        if self.entrainement_demande is not None and self.horloge.t - self.entrainement_demande >= ml_manager.DELAI_DEBOUNCE:
+            self.entrainement_demande = None
+            ml_manager.entrainer_modele()
+
+# --- BOUCLE VIRTUELLE ---
+def simuler(marche, debut, fin, grok=None, afficher=print):
+    """
+    Déroule les tâches de entrainement_bot de debut à fin (secondes epoch) sur l'horloge du marché.
+    Renvoie les compteurs de la simulation.
+    """
+    horloge = marche.horloge
+    horloge.t = debut
+    grok = grok or GrokSimule(marche)
+    taches = [
+        ("surveillance", lambda: entrainement_bot.surveiller_positions(source=marche.cotations), entrainement_bot.INTERVALLE_SURVEILLANCE),
+        ("scan", entrainement_bot.execution_automatique, entrainement_bot.INTERVALLE_SCAN),
+        ("equity", entrainement_bot.update_equity_curve, entrainement_bot.INTERVALLE_EQUITY),
+    ]
+    # Ce qui détermine le résultat d'une surveillance / d'un scan
+    etats = {
+        "surveillance": lambda: (marche.version(), portfolio_manager._signature(portfolio_manager.FICHIER_PORTFOLIO)),
+        "scan": lambda: (marche.version(), portfolio_manager._signature(portfolio_manager.FICHIER_PORTFOLIO),
+                         ml_manager._signature_modele()),
+    }
+    compteurs = {nom: {"executions": 0, "sautees": 0, "echecs": 0} for nom, _, _ in taches}
+    derniers_etats = {}
+    file = [(debut, ordre) for ordre in range(len(taches))]
+    heapq.heapify(file)
+    jour = None
+
+    with Simulation(marche, horloge, grok) as simulation:
+        while file:
+            t, ordre = heapq.heappop(file)
+            if t > fin: break
+            horloge.t = t
+            simulation.entrainer_si_du()
+            nom, fonction, intervalle = taches[ordre]
+            heapq.heappush(file, (t + intervalle, ordre))
+
+            if nom in etats:
+                etat = etats[nom]()
+                if derniers_etats.get(nom) == etat:
+                    compteurs[nom]["sautees"] += 1
+                    continue
+            try:
+                fonction()
+                compteurs[nom]["executions"] += 1
+            except Exception as e:
+                compteurs[nom]["echecs"] += 1
+                afficher(f"❌ [{horloge.maintenant():%Y-%m-%d %H:%M}] Erreur tâche '{nom}' : {e}")
+            if nom in etats: derniers_etats[nom] = etats[nom]()
+
+            if horloge.maintenant().date() != jour:
+                jour = horloge.maintenant().date()
+                afficher(f"📅 {jour} | positions : {len(portfolio_manager.charger_portfolio())}"
+                         f" | P&L réalisé : {portfolio_manager.pnl_realise():.2f}$")
+
+        with open(FICHIER_JOURNAL_TELEGRAM, "w", encoding="utf-8") as f:
+            for date, message in simulation.messages: f.write(f"[{date}]\n{message}\n\n")
+
+    return {"taches": compteurs, "appels_grok": dict(grok.nb_appels), "messages_telegram": len(simulation.messages)}
+
+def charger_marche(tickers, period=PERIODE_SIMULATION, interval=INTERVALLE_SIMULATION):
+    """Bougies enregistrées (cache disque de donnees_marche, téléchargées si absentes)"""
+    frames = {}
+    for ticker in tickers:
+        try:
+            frames[ticker] = telecharger_ohlcv(ticker, period=period, interval=interval)
+        except Exception as e:
+            print(f"❌ Erreur données {ticker}: {e}")
+    return frames
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rejoue le bot full-auto sur des bougies enregistrées (horloge virtuelle)")
+    parser.add_argument("tickers", nargs="+", help="Univers proposé par le faux Grok")
+    parser.add_argument("--period", default=PERIODE_SIMULATION)
+    parser.add_argument("--interval", default=INTERVALLE_SIMULATION)
+    parser.add_argument("--debut", help="Date de début (défaut : première bougie + 10 jours de chauffe)")
+    parser.add_argument("--fin", help="Date de fin (défaut : dernière bougie)")
+    parser.add_argument("--reponses", help="Réponses Grok enregistrées : JSON {agent: {ticker: réponse}}")
+    parser.add_argument("--dossier", default=DOSSIER_SIMULATION, help="Dossier des artefacts (doit être vide)")
+    parser.add_argument("--verbeux", action="store_true", help="Affiche aussi les logs du bot")
+    args = parser.parse_args()
+
+    frames = charger_marche(args.tickers, args.period, args.interval)
+    reponses = None
+    if args.reponses:
+        with open(args.reponses) as f: reponses = json.load(f)
+
+    os.makedirs(args.dossier, exist_ok=True)
+    if os.listdir(args.dossier): sys.exit(f"⛔ {args.dossier} n'est pas vide (les artefacts d'une autre simulation seraient mélangés).")
+    os.chdir(args.dossier)
+
+    horloge = HorlogeVirtuelle(0)
+    marche = MarcheRejoue(frames, horloge, args.interval)
+    if not marche.tickers: sys.exit("⛔ Aucune bougie disponible.")
+    premiere, derniere = marche.bornes()
+    debut = pd.Timestamp(args.debut).timestamp() if args.debut else premiere + 10 * 86400
+    fin = pd.Timestamp(args.fin).timestamp() if args.fin else derniere
+
+    print(f"🎬 Simulation {datetime.fromtimestamp(debut):%Y-%m-%d %H:%M} -> {datetime.fromtimestamp(fin):%Y-%m-%d %H:%M}"
+          f" ({len(marche.tickers)} tickers, bougies {args.interval})")
+    chrono = time.time()
+    sortie = sys.stdout
+    if not args.verbeux: sys.stdout = open(os.devnull, "w", encoding="utf-8")
+    try:
+        resultat = simuler(marche, debut, fin, GrokSimule(marche, reponses), afficher=lambda m: print(m, file=sortie))
+    finally:
+        if sys.stdout is not sortie: sys.stdout.close()
+        sys.stdout = sortie
+    duree = time.time() - chrono
+
+    print(f"\n🏁 {(fin - debut) / 86400:.1f} jours simulés en {duree:.1f}s (x{(fin - debut) / max(duree, 1e-9):,.0f})")
+    for nom, c in resultat["taches"].items():
+        print(f"   • {nom} : {c['executions']} exéc. | {c['sautees']} sautées (rien de nouveau) | ❌ {c['echecs']}")
+    print(f"   🗣️ Appels Grok simulés : {resultat['appels_grok']} | ✉️ Messages : {resultat['messages_telegram']}")
+    print(portfolio_manager.generer_rapport_performance())
+    print(f"💾 Artefacts dans {os.getcwd()}")
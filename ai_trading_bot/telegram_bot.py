@@ -1,51 +1,150 @@
-import os
-import requests
-from dotenv import load_dotenv
-
-# Charge les clés depuis le .env
-load_dotenv()
-TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
-
-# Variable globale interne au module pour suivre la lecture
-DERNIER_UPDATE_ID = 0
-
-def envoyer_alerte_telegram(message):
-    """Envoie un message simple"""
-    if not TELEGRAM_TOKEN: return
-    
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": TELEGRAM_CHAT_ID, 
-        "text": message, 
-        "parse_mode": "HTML"
-    }
-    
-    try:
-        requests.post(url, data=payload)
-    except Exception as e:
-        print(f"❌ Erreur Telegram: {e}")
-
-def lire_ordres_telegram():
-    """Lit les derniers messages (ACHAT/NON)"""
-    global DERNIER_UPDATE_ID
-    if not TELEGRAM_TOKEN: return []
-    
-    url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/getUpdates"
-    params = {"offset": DERNIER_UPDATE_ID + 1, "timeout": 5}
-    
-    try:
-        resp = requests.get(url, params=params).json()
-        if not resp.get("ok"): return []
-
-        resultats = resp.get("result", [])
-        ordres = []
-        
-        for update in resultats:
-            DERNIER_UPDATE_ID = update["update_id"]
-            # On vérifie qu'il y a bien du texte
-            if "message" in update and "text" in update["message"]:
-                texte = update["message"]["text"].upper().strip()
-                ordres.append(texte)
-        return ordres
-    except: return []
\ No newline at end of file
+import os
+import time
+import queue
+import atexit
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from metriques import mesurer
+
+# Charge les clés depuis le .env
+load_dotenv()
+TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
+TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+# Adresse de la Bot API (un faux serveur local pour les tests / benchmarks)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+
+# ==============================================================================
+# CLIENT TELEGRAM NON BLOQUANT
+# ==============================================================================
+# - Une session HTTP partagée (connexions gardées ouvertes) avec timeouts.
+# - Envoi : envoyer_alerte_telegram() ne fait que déposer le message dans une file ;
+#   un thread l'envoie en respectant la limite de Telegram (~1 message/s par chat)
+#   et regroupe les rafales (ex : plusieurs ventes dans le même tick = 1 seul message).
+#   En cas de 429, on attend le retry_after demandé par Telegram puis on réessaie.
+# - Réception : un thread fait le long-polling getUpdates et remplit une file ;
+#   lire_ordres_telegram() vide cette file sans jamais attendre le réseau.
+INTERVALLE_MIN_ENVOI = 1.0   # Secondes entre deux envois au même chat
+DELAI_REGROUPEMENT = 1.0     # Fenêtre pendant laquelle les messages sont fusionnés
+TAILLE_MAX_MESSAGE = 4096    # Limite Telegram
+SEPARATEUR = "\n\n"
+DELAI_LONG_POLLING = 25      # timeout de getUpdates côté Telegram
+TIMEOUT_HTTP = 10            # Timeout réseau des envois
+ESSAIS_MAX = 5
+
+# Variable globale interne au module pour suivre la lecture
+DERNIER_UPDATE_ID = 0
+
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
+_ENVOIS = queue.Queue()
+_ORDRES = queue.Queue()
+_THREADS = {}
+_VERROU_THREADS = threading.Lock()
+
+def _url(methode):
+    return f"{TELEGRAM_API_URL}/bot{TELEGRAM_TOKEN}/{methode}"
+
+def _demarrer(nom, cible):
+    with _VERROU_THREADS:
+        thread = _THREADS.get(nom)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=cible, name=f"telegram_{nom}", daemon=True)
+            _THREADS[nom] = thread
+            thread.start()
+
+# --- ENVOI ---
+def _regrouper(premier):
+    """Fusionne le 1er message avec ceux arrivés pendant DELAI_REGROUPEMENT (sans dépasser 4096 car.)"""
+    messages = [premier]
+    limite = time.monotonic() + DELAI_REGROUPEMENT
+    while True:
+        reste = limite - time.monotonic()
+        if reste <= 0: break
+        try: messages.append(_ENVOIS.get(timeout=reste))
+        except queue.Empty: break
+
+    lots, courant = [], ""
+    for m in messages:
+        if courant and len(courant) + len(SEPARATEUR) + len(m) > TAILLE_MAX_MESSAGE:
+            lots.append(courant)
+            courant = m
+        else:
+            courant = courant + SEPARATEUR + m if courant else m
+    lots.append(courant)
+    return lots, len(messages)
+
+def _poster(texte):
+    """Un envoi avec gestion du 429 (retry_after) ; renvoie True si Telegram l'a accepté"""
+    payload = {"chat_id": TELEGRAM_CHAT_ID, "text": texte, "parse_mode": "HTML"}
+    for essai in range(ESSAIS_MAX):
+        try:
+            with mesurer("telegram_envoi"):
+                resp = _SESSION.post(_url("sendMessage"), data=payload, timeout=TIMEOUT_HTTP)
+            if resp.status_code == 429:
+                attente = resp.json().get("parameters", {}).get("retry_after", 1)
+                print(f"⏳ Telegram : limite atteinte, nouvel essai dans {attente}s")
+                time.sleep(attente)
+                continue
+            return resp.ok
+        except Exception as e:
+            print(f"❌ Erreur Telegram: {e}")
+            time.sleep(min(2 ** essai, 30))
+    return False
+
+def _boucle_envoi():
+    dernier_envoi = 0.0
+    while True:
+        lots, nb_messages = _regrouper(_ENVOIS.get())
+        for texte in lots:
+            attente = dernier_envoi + INTERVALLE_MIN_ENVOI - time.monotonic()
+            if attente > 0: time.sleep(attente)
+            _poster(texte)
+            dernier_envoi = time.monotonic()
+        for _ in range(nb_messages): _ENVOIS.task_done()
+
+def envoyer_alerte_telegram(message):
+    """Envoie un message simple (mis en file, ne bloque pas l'appelant)"""
+    if not TELEGRAM_TOKEN: return
+    _demarrer("envoi", _boucle_envoi)
+    _ENVOIS.put(message)
+
+def vider_envois(timeout=10):
+    """Attend que la file d'envoi soit vide (arrêt du bot, tests)"""
+    fin = time.monotonic() + timeout
+    while _ENVOIS.unfinished_tasks and time.monotonic() < fin: time.sleep(0.05)
+    return not _ENVOIS.unfinished_tasks
+
+atexit.register(vider_envois, 5)
+
+# --- RÉCEPTION ---
+def _boucle_reception():
+    global DERNIER_UPDATE_ID
+    while True:
+        try:
+            params = {"offset": DERNIER_UPDATE_ID + 1, "timeout": DELAI_LONG_POLLING}
+            with mesurer("telegram_reception"): # Inclut l'attente du long-polling
+                resp = _SESSION.get(_url("getUpdates"), params=params, timeout=DELAI_LONG_POLLING + TIMEOUT_HTTP).json()
+            if not resp.get("ok"):
+                time.sleep(resp.get("parameters", {}).get("retry_after", 5))
+                continue
+            for update in resp.get("result", []):
+                DERNIER_UPDATE_ID = update["update_id"]
+                # On vérifie qu'il y a bien du texte
+                if "message" in update and "text" in update["message"]:
+                    _ORDRES.put(update["message"]["text"].upper().strip())
+        except Exception as e:
+            print(f"⚠️ Réception Telegram : {e}")
+            time.sleep(5)
+
+def lire_ordres_telegram():
+    """Lit les derniers messages (ACHAT/NON) reçus par le thread de réception, sans attendre"""
+    if not TELEGRAM_TOKEN: return []
+    _demarrer("reception", _boucle_reception)
+    ordres = []
+    while True:
+        try: ordres.append(_ORDRES.get_nowait())
+        except queue.Empty: return ordres